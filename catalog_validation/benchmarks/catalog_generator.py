@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import typing
+import yaml
+
+
+# Leaf questions using a reference are round-robined between these, covering both cheap references and ones
+# which are expensive to normalise like definitions/port
+REF_QUESTIONS = {
+    'definitions/timezone': {'type': 'string', 'default': 'America/Los_Angeles'},
+    'definitions/nodeIP': {'type': 'string'},
+    'definitions/interface': {'type': 'string', 'default': ''},
+    'definitions/port': {'type': 'int', 'default': 9000, 'min': 9000, 'max': 65534},
+}
+
+
+class CatalogOptions(typing.NamedTuple):
+    trains: int = 2
+    apps: int = 20
+    versions: int = 3
+    questions: int = 10
+    depth: int = 2
+    breadth: int = 4
+    ref_ratio: float = 0.1
+    readme_size: int = 4096
+    git: bool = True
+    seed: int = 0
+
+
+def get_question(name: str, depth: int, breadth: int, refs: typing.Callable[[], typing.Optional[str]]) -> dict:
+    # refs decides if a question should be using a reference and which one
+    ref = refs()
+    if ref:
+        schema = {**REF_QUESTIONS[ref], '$ref': [ref]}
+    elif depth <= 0:
+        schema = {
+            'type': 'string',
+            'default': f'{name}0',
+            'enum': [{'value': f'{name}{i}', 'description': f'{name} option {i}'} for i in range(3)],
+        }
+    else:
+        schema = {
+            'type': 'dict',
+            'attrs': [get_question(f'{name}_{i}', depth - 1, breadth, refs) for i in range(breadth)],
+        }
+
+    return {
+        'variable': name,
+        'label': f'{name} label',
+        'description': f'Description of {name} which is usually a sentence or two long to explain the option',
+        'schema': schema,
+    }
+
+
+def get_questions(options: CatalogOptions, rand: random.Random) -> dict:
+    ref_cycle = itertools.cycle(REF_QUESTIONS)
+
+    def refs():
+        return next(ref_cycle) if rand.random() < options.ref_ratio else None
+
+    return {
+        'groups': [{'name': 'Configuration', 'description': 'Configure application'}],
+        'questions': [
+            {
+                **get_question(f'question{i}', options.depth, options.breadth, refs),
+                'group': 'Configuration',
+            } for i in range(options.questions)
+        ],
+    }
+
+
+def get_readme(name: str, size: int) -> str:
+    paragraph = f'{name} is an application used for benchmarking, this paragraph is repeated to inflate the readme.\n\n'
+    readme = f'# {name}\n\n## Introduction\n\n'
+    return readme + paragraph * max((size - len(readme)) // len(paragraph), 0)
+
+
+def write_yaml(path: str, data: typing.Any) -> None:
+    with open(path, 'w') as f:
+        f.write(yaml.safe_dump(data))
+
+
+def generate_app(app_path: str, app_name: str, options: CatalogOptions, rand: random.Random) -> None:
+    os.makedirs(app_path)
+    write_yaml(os.path.join(app_path, 'item.yaml'), {
+        'categories': ['benchmark'],
+        'icon_url': f'https://example.com/{app_name}.png',
+        'tags': ['benchmark', app_name],
+        'screenshots': [],
+    })
+    for version_index in range(options.versions):
+        version = f'1.0.{version_index}'
+        version_path = os.path.join(app_path, version)
+        os.makedirs(os.path.join(version_path, 'templates'))
+        write_yaml(os.path.join(version_path, 'Chart.yaml'), {
+            'apiVersion': 'v2',
+            'name': app_name,
+            'version': version,
+            'appVersion': '1.0.0',
+            'description': f'{app_name} benchmark application',
+            'home': f'https://example.com/{app_name}',
+            'sources': [f'https://example.com/{app_name}'],
+            'maintainers': [{'name': 'truenas', 'email': 'dev@ixsystems.com'}],
+        })
+        write_yaml(os.path.join(version_path, 'questions.yaml'), get_questions(options, rand))
+        write_yaml(os.path.join(version_path, 'ix_values.yaml'), {'image': {'repository': app_name, 'tag': version}})
+        with open(os.path.join(version_path, 'README.md'), 'w') as f:
+            f.write(get_readme(app_name, options.readme_size))
+        with open(os.path.join(version_path, 'app-readme.md'), 'w') as f:
+            f.write(get_readme(app_name, options.readme_size // 4))
+        with open(os.path.join(version_path, 'templates', 'deployment.yaml'), 'w') as f:
+            f.write('{{ include "common.deployment" . }}\n')
+
+
+def generate_catalog(catalog_path: str, options: typing.Optional[CatalogOptions] = None) -> None:
+    # Generates a catalog which passes validation, catalog.json/app_versions.json files are not generated
+    # and can be generated by updating the catalog
+    options = options or CatalogOptions()
+    rand = random.Random(options.seed)
+    os.makedirs(catalog_path, exist_ok=True)
+    for train_index in range(options.trains):
+        train_name = 'charts' if train_index == 0 else f'train{train_index}'
+        for app_index in range(options.apps):
+            app_name = f'app{app_index}'
+            generate_app(os.path.join(catalog_path, train_name, app_name), app_name, options, rand)
+
+    if options.git:
+        # Last update dates of items are retrieved from git
+        for cmd in (
+            ['git', 'init', '-q'],
+            ['git', 'add', '.'],
+            ['git', '-c', 'user.name=benchmark', '-c', 'user.email=benchmark@localhost', 'commit', '-q', '-m', 'init'],
+        ):
+            subprocess.run(cmd, cwd=catalog_path, check=True, capture_output=True)
+
+
+def add_catalog_options_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = CatalogOptions()
+    parser.add_argument('--trains', type=int, default=defaults.trains, help='Number of trains')
+    parser.add_argument('--apps', type=int, default=defaults.apps, help='Number of apps in each train')
+    parser.add_argument('--versions', type=int, default=defaults.versions, help='Number of versions of each app')
+    parser.add_argument('--questions', type=int, default=defaults.questions, help='Top level questions of a version')
+    parser.add_argument('--depth', type=int, default=defaults.depth, help='Depth of each question tree')
+    parser.add_argument('--breadth', type=int, default=defaults.breadth, help='Attributes of each dict question')
+    parser.add_argument(
+        '--ref-ratio', type=float, default=defaults.ref_ratio, help='Ratio of questions using a $ref (0 - 1)'
+    )
+    parser.add_argument('--readme-size', type=int, default=defaults.readme_size, help='Size of README.md in bytes')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def get_catalog_options(args: argparse.Namespace) -> CatalogOptions:
+    return CatalogOptions(**{k: getattr(args, k) for k in CatalogOptions._fields if hasattr(args, k)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic catalog')
+    parser.add_argument('--path', help='Path where catalog should be generated', required=True)
+    parser.add_argument('--no-git', action='store_false', dest='git', help='Do not initialize a git repository')
+    add_catalog_options_arguments(parser)
+    args = parser.parse_args()
+
+    options = get_catalog_options(args)
+    generate_catalog(args.path, options)
+    print(f'Generated catalog at {args.path!r} with {json.dumps(options._asdict())}')
+
+
+if __name__ == '__main__':
+    main()
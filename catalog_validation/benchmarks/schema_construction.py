@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+import argparse
+import statistics
+import time
+
+from catalog_validation.schema.variable import Variable
+
+from .catalog_generator import get_question
+
+
+def count_nodes(question: dict) -> int:
+    return 1 + sum(count_nodes(attr) for attr in question['schema'].get('attrs', []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark building schema objects of a questions tree')
+    # Defaults generate a tree of ~5k questions
+    parser.add_argument('--questions', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--breadth', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    questions = [get_question(f'question{i}', args.depth, args.breadth, lambda: None) for i in range(args.questions)]
+    print(f'Building schema of {sum(count_nodes(q) for q in questions)} questions {args.iterations} time(s)')
+    timings = []
+    for i in range(args.iterations):
+        start = time.perf_counter()
+        for question in questions:
+            Variable(question)
+        timings.append(time.perf_counter() - start)
+
+    print(f'best {min(timings):.4f}s mean {statistics.mean(timings):.4f}s')
+
+
+if __name__ == '__main__':
+    main()
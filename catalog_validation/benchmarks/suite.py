@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import typing
+
+from catalog_validation import markdown_utils
+from catalog_validation.items.catalog import get_items_in_trains, retrieve_train_names, retrieve_trains_data
+from catalog_validation.items.catalog_shards import load_catalog_trains
+from catalog_validation.items.items_util import get_default_questions_context, get_item_details
+from catalog_validation.items.questions_utils import normalise_questions
+from catalog_validation.items.transport import BLOB_TRANSPORT, SHARED_MEMORY_TRANSPORT
+from catalog_validation.scheduling import estimate_item_cost, estimate_version_cost
+from catalog_validation.scripts.catalog_update import update_catalog_file
+from catalog_validation.utils import CACHED_CATALOG_FILE_NAME, CATALOG_MANIFEST_FILE_NAME
+from catalog_validation.validation import validate_catalog
+from catalog_validation.yaml_utils import get_yaml_backend, safe_yaml_load
+
+from .catalog_generator import add_catalog_options_arguments, generate_catalog, get_catalog_options
+
+
+RESULTS_FORMAT_VERSION = 1
+# Benchmarks which would otherwise only measure in-process caches warmed up by their first iteration
+COLD_CACHE_BENCHMARKS = {'get_item_details'}
+
+
+def get_heaviest_item(catalog_path: str) -> str:
+    items = get_items_in_trains(retrieve_train_names(catalog_path), catalog_path)
+    return max(
+        (os.path.join(catalog_path, train, item_key.removesuffix(f'_{train}')) for item_key, train in items.items()),
+        key=estimate_item_cost,
+    )
+
+
+def get_benchmarks(catalog_path: str, jobs: typing.Optional[int] = None) -> typing.Dict[str, typing.Callable]:
+    # Returns callable to time for each benchmark, setup which should not be timed is done beforehand
+    trains = retrieve_train_names(catalog_path)
+    items = get_items_in_trains(trains, catalog_path)
+    item_path = get_heaviest_item(catalog_path)
+    questions_context = get_default_questions_context()
+    version_path = max(
+        (os.path.join(item_path, v) for v in os.listdir(item_path) if os.path.isdir(os.path.join(item_path, v))),
+        key=estimate_version_cost,
+    )
+    with open(os.path.join(version_path, 'questions.yaml'), 'r') as f:
+        questions = safe_yaml_load(f.read())
+
+    def normalise():
+        normalise_questions({'schema': copy.deepcopy(questions)}, questions_context)
+
+    def load_catalog_json():
+        with open(os.path.join(catalog_path, CACHED_CATALOG_FILE_NAME), 'r') as f:
+            json.loads(f.read())
+
+    return {
+        'update_catalog_file': lambda: update_catalog_file(catalog_path, jobs=jobs),
+        'validate_catalog': lambda: validate_catalog(catalog_path, jobs=jobs),
+        'retrieve_trains_data': lambda: retrieve_trains_data(
+            items, catalog_path, [], trains, questions_context=questions_context, jobs=jobs,
+        ),
+        # Same as above, however workers send back item details as compact blobs instead of pickled dicts
+        'retrieve_trains_data_blob': lambda: retrieve_trains_data(
+            items, catalog_path, [], trains, questions_context=questions_context, jobs=jobs, transport=BLOB_TRANSPORT,
+        ),
+        'retrieve_trains_data_shm': lambda: retrieve_trains_data(
+            items, catalog_path, [], trains, questions_context=questions_context, jobs=jobs,
+            transport=SHARED_MEMORY_TRANSPORT,
+        ),
+        'get_item_details': lambda: get_item_details(item_path, questions_context, {'retrieve_versions': True}),
+        'normalise_questions': normalise,
+        # What consumers following a single train load from catalog.json vs its shard
+        'load_catalog_json': load_catalog_json,
+        'load_catalog_train_shard': lambda: load_catalog_trains(catalog_path, trains[:1]),
+    }
+
+
+def clear_caches() -> None:
+    # Normalised questions are only kept for a single get_item_details call, rendered markdown is kept by the process
+    with markdown_utils.RENDERED_MARKDOWN_LOCK:
+        markdown_utils.RENDERED_MARKDOWN.clear()
+
+
+def time_benchmark(func: typing.Callable, iterations: int, setup: typing.Optional[typing.Callable] = None) -> dict:
+    timings = []
+    for i in range(iterations):
+        if setup:
+            setup()
+        # Functions like update_catalog_file print their progress which we do not want to interleave with results
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+    return {
+        'iterations': iterations,
+        'min': min(timings),
+        'mean': statistics.mean(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+    }
+
+
+def run_benchmarks(
+    catalog_path: str, iterations: int, benchmarks: typing.Optional[list] = None, jobs: typing.Optional[int] = None,
+) -> dict:
+    results = {}
+    if not all(os.path.exists(os.path.join(catalog_path, f)) for f in (
+        CACHED_CATALOG_FILE_NAME, CATALOG_MANIFEST_FILE_NAME
+    )):
+        # validate_catalog requires catalog.json to be present and loading benchmarks require shards
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_catalog_file(catalog_path, jobs=jobs, shards=True)
+
+    for name, func in get_benchmarks(catalog_path, jobs).items():
+        if benchmarks and name not in benchmarks:
+            continue
+        results[name] = time_benchmark(func, iterations, clear_caches if name in COLD_CACHE_BENCHMARKS else None)
+        print(f'{name:<28} best {results[name]["min"]:.4f}s mean {results[name]["mean"]:.4f}s', file=sys.stderr)
+    return results
+
+
+def compare_results(results: dict, baseline: dict, threshold: float) -> typing.List[str]:
+    # Returns names of benchmarks which have regressed, i.e their best time is slower than the baseline's best
+    # time by more than threshold (ratio)
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = result['min'] / baseline[name]['min']
+        regressed = ratio > 1 + threshold
+        print(
+            f'{name:<28} baseline {baseline[name]["min"]:.4f}s current {result["min"]:.4f}s '
+            f'({ratio:.2f}x){" REGRESSED" if regressed else ""}', file=sys.stderr,
+        )
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hot paths of catalog validation/update')
+    parser.add_argument(
+        '--catalog-path', help='Benchmark against an existing catalog instead of generating a synthetic one'
+    )
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--benchmark', action='append', dest='benchmarks', help='Only run specified benchmark(s)')
+    parser.add_argument('--jobs', type=int, help='Number of worker processes to use')
+    parser.add_argument('--output', help='Write results as json to specified file (defaults to stdout)')
+    parser.add_argument('--baseline', help='Compare results against results json of a previous run')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1, help='Allowed slowdown ratio against baseline before failing'
+    )
+    add_catalog_options_arguments(parser)
+    args = parser.parse_args()
+
+    catalog_options = get_catalog_options(args)
+    with contextlib.ExitStack() as stack:
+        catalog_path = os.path.join(tempfile.mkdtemp(prefix='catalog_benchmark_'), 'catalog')
+        stack.callback(shutil.rmtree, os.path.dirname(catalog_path), True)
+        if args.catalog_path:
+            # We work on a copy as updating the catalog is one of the benchmarks
+            shutil.copytree(args.catalog_path, catalog_path, symlinks=True)
+        else:
+            generate_catalog(catalog_path, catalog_options)
+
+        results = {
+            'version': RESULTS_FORMAT_VERSION,
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'yaml_backend': get_yaml_backend(),
+            },
+            'catalog': args.catalog_path or catalog_options._asdict(),
+            'results': run_benchmarks(catalog_path, args.iterations, args.benchmarks, args.jobs),
+        }
+
+    output = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.loads(f.read())
+        if baseline.get('catalog') != results['catalog']:
+            print(
+                'Baseline was generated against a different catalog, comparison may not be meaningful', file=sys.stderr
+            )
+        if compare_results(results['results'], baseline['results'], args.threshold):
+            exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+import argparse
+import statistics
+import time
+import yaml
+
+from catalog_validation.yaml_utils import get_yaml_backend, safe_yaml_load
+
+
+def get_question(name: str, depth: int, breadth: int) -> dict:
+    if depth <= 0:
+        return {
+            'variable': name,
+            'label': f'{name} label',
+            'description': f'Description of {name} which is usually a sentence or two long to explain the option',
+            'schema': {
+                'type': 'string',
+                'default': 'value',
+                'enum': [{'value': f'{name}{i}', 'description': f'{name} option {i}'} for i in range(3)],
+                'show_if': [['enabled', '=', True]],
+            },
+        }
+
+    return {
+        'variable': name,
+        'label': f'{name} label',
+        'group': 'Configuration',
+        'schema': {
+            'type': 'dict',
+            'attrs': [get_question(f'{name}_{i}', depth - 1, breadth) for i in range(breadth)],
+        },
+    }
+
+
+def generate_questions_yaml(questions: int = 20, depth: int = 2, breadth: int = 4) -> str:
+    # Defaults produce a questions.yaml of ~6k lines which is in line with the bigger apps we have
+    return yaml.safe_dump({
+        'groups': [{'name': 'Configuration', 'description': 'Configure application'}],
+        'questions': [get_question(f'question{i}', depth, breadth) for i in range(questions)],
+    })
+
+
+def time_loader(loader, content: str, iterations: int) -> list:
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        loader(content)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare yaml backends when loading questions.yaml')
+    parser.add_argument('--questions-file', help='Path to questions.yaml to use instead of a generated one')
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.questions_file:
+        with open(args.questions_file, 'r') as f:
+            content = f.read()
+    else:
+        content = generate_questions_yaml()
+
+    print(f'Loading {len(content.splitlines())} lines ({len(content)} bytes) {args.iterations} time(s)')
+    results = {'python': time_loader(yaml.safe_load, content, args.iterations)}
+    if get_yaml_backend() != 'python':
+        results[get_yaml_backend()] = time_loader(safe_yaml_load, content, args.iterations)
+    else:
+        print('libyaml is not available, only python backend will be benchmarked')
+
+    for backend, timings in results.items():
+        print(f'{backend:>8}: best {min(timings):.4f}s mean {statistics.mean(timings):.4f}s')
+    if len(results) > 1:
+        print(f' speedup: {min(results["python"]) / min(results[get_yaml_backend()]):.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 import os
-import yaml
 
 from catalog_validation.items.utils import DEVELOPMENT_DIR
+from catalog_validation.yaml_utils import safe_yaml_load
 from jsonschema import validate as json_schema_validate
 from semantic_version import Version
 
@@ -25,7 +25,7 @@ REQUIRED_VERSIONS_SCHEMA = {
 def get_app_version(app_path: str) -> str:
     # This assumes that file exists and version is specified and is good
     with open(os.path.join(app_path, 'Chart.yaml'), 'r') as f:
-        return yaml.safe_load(f.read())['version']
+        return safe_yaml_load(f.read())['version']
 
 
 def get_ci_development_directory(catalog_path: str) -> str:
@@ -38,7 +38,7 @@ def get_to_keep_versions(app_dir_path: str) -> list:
         return []
 
     with open(required_version_path, 'r') as f:
-        data = yaml.safe_load(f.read())
+        data = safe_yaml_load(f.read())
         json_schema_validate(data, REQUIRED_VERSIONS_SCHEMA)
     return data
 
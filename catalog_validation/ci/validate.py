@@ -1,9 +1,13 @@
+import concurrent.futures
 import os
-import yaml
 
+from catalog_validation.documents import DocumentLoader
 from catalog_validation.exceptions import ValidationErrors
 from catalog_validation.validation import validate_catalog_item_version, validate_chart_version
+from catalog_validation.workers import get_max_workers
+from catalog_validation.yaml_utils import YAMLError
 from jsonschema import ValidationError as JsonValidationError
+from typing import List, Optional, Tuple
 
 from .utils import (
     get_app_version, get_ci_development_directory, REQUIRED_METADATA_FILES, version_has_been_bumped,
@@ -11,55 +15,61 @@ from .utils import (
 )
 
 
-def validate_dev_directory_structure(catalog_path: str, to_check_apps: dict) -> None:
-    verrors = ValidationErrors()
+def validate_dev_directory_structure(catalog_path: str, to_check_apps: dict, jobs: Optional[int] = None) -> None:
     dev_directory = get_ci_development_directory(catalog_path)
     if not os.path.exists(dev_directory):
         return
 
+    apps = []
     for train_name in filter(
         lambda name: name in to_check_apps and os.path.isdir(os.path.join(dev_directory, name)),
         os.listdir(dev_directory)
     ):
-        validate_train(
-            catalog_path, os.path.join(dev_directory, train_name), f'dev.{train_name}', to_check_apps[train_name]
-        )
-    verrors.check()
+        apps.extend(get_train_apps(
+            os.path.join(dev_directory, train_name), f'dev.{train_name}', to_check_apps[train_name]
+        ))
 
+    with concurrent.futures.ProcessPoolExecutor(max_workers=get_max_workers(len(apps), jobs)) as exc:
+        # Apps are validated in parallel but we still raise errors of the first app (in the order we would have
+        # validated them serially) which fails validation
+        for future in [exc.submit(validate_dev_app, catalog_path, *app) for app in apps]:
+            future.result()
 
-def validate_train(catalog_path: str, train_path: str, schema: str, to_check_apps: list) -> None:
-    verrors = ValidationErrors()
-    train_name = os.path.basename(train_path)
-    for app_name in filter(
-        lambda name: os.path.isdir(os.path.join(train_path, name)), os.listdir(train_path)
-    ):
-        if app_name not in to_check_apps:
-            continue
 
-        app_path = os.path.join(train_path, app_name)
-        try:
-            validate_app(app_path, f'{schema}.{app_name}')
-        except ValidationErrors as ve:
-            verrors.extend(ve)
-        else:
-            published_train_app_path = os.path.join(catalog_path, train_name, app_name)
-            if not os.path.exists(published_train_app_path):
-                # The application is new and we are good
-                continue
+def get_train_apps(train_path: str, schema: str, to_check_apps: list) -> List[Tuple[str, str]]:
+    return [
+        (os.path.join(train_path, app_name), f'{schema}.{app_name}') for app_name in filter(
+            lambda name: os.path.isdir(os.path.join(train_path, name)), os.listdir(train_path)
+        ) if app_name in to_check_apps
+    ]
 
-            if not version_has_been_bumped(published_train_app_path, get_app_version(app_path)):
-                verrors.add(
-                    f'{schema}.{app_name}.version',
-                    'Version must be bumped as app has been changed but version has not been updated'
-                )
 
-        verrors.check()
+def validate_dev_app(catalog_path: str, app_path: str, schema: str) -> None:
+    verrors = ValidationErrors()
+    app_path = app_path.rstrip('/')
+    train_name, app_name = os.path.basename(os.path.dirname(app_path)), os.path.basename(app_path)
+    try:
+        validate_app(app_path, schema)
+    except ValidationErrors as ve:
+        verrors.extend(ve)
+    else:
+        published_train_app_path = os.path.join(catalog_path, train_name, app_name)
+        if os.path.exists(published_train_app_path) and not version_has_been_bumped(
+            published_train_app_path, get_app_version(app_path)
+        ):
+            # If the application is new we are good, otherwise it's version must have been bumped
+            verrors.add(
+                f'{schema}.version',
+                'Version must be bumped as app has been changed but version has not been updated'
+            )
+
+    verrors.check()
 
 
 def validate_keep_versions(app_dir_path: str, schema: str, verrors: ValidationErrors) -> ValidationErrors:
     try:
         get_to_keep_versions(app_dir_path)
-    except yaml.YAMLError:
+    except YAMLError:
         verrors.add(f'{schema}.{REQUIRED_VERSIONS_SCHEMA}', 'Invalid yaml format')
     except JsonValidationError:
         verrors.add(
@@ -77,11 +87,14 @@ def validate_upgrate_strategy(app_path, schema, verrors):
 def validate_app(app_dir_path: str, schema: str) -> None:
     app_name = os.path.basename(app_dir_path)
     chart_version_path = os.path.join(app_dir_path, 'Chart.yaml')
-    verrors = validate_chart_version(ValidationErrors(), chart_version_path, schema, app_name)
+    documents = DocumentLoader()
+    verrors = validate_chart_version(ValidationErrors(), chart_version_path, schema, app_name, documents=documents)
     validate_keep_versions(app_dir_path, app_name, verrors)
     verrors.check()
 
-    validate_catalog_item_version(app_dir_path, schema, get_app_version(app_dir_path), app_name, True)
+    validate_catalog_item_version(
+        app_dir_path, schema, get_app_version(app_dir_path), app_name, True, documents=documents
+    )
 
     required_files = set(REQUIRED_METADATA_FILES)
     available_files = set(
@@ -0,0 +1,45 @@
+import hashlib
+import typing
+
+from .profiling import timed
+from .yaml_utils import safe_yaml_load
+
+
+class DocumentLoader:
+
+    # Files of a catalog item/version are read by both validation and the code retrieving item details.
+    # A loader is shared between them so that each file is read and parsed only once and the parsed
+    # object (or the error raised while parsing it) is handed over to whoever asks for it next.
+
+    def __init__(self):
+        self.documents = {}
+        self.digests = {}
+        # Walks of questions.yaml files done while validating them keyed by path, see QuestionsWalk
+        self.questions_walks = {}
+
+    def load(self, path: str, parser: typing.Callable[[str], typing.Any]) -> typing.Any:
+        key = (path, parser)
+        if key not in self.documents:
+            with open(path, 'r') as f:
+                content = f.read()
+            self.digests[path] = hashlib.sha256(content.encode()).hexdigest()
+            try:
+                with timed(f'parse.{getattr(parser, "__name__", "document")}'):
+                    self.documents[key] = (parser(content), None)
+            except Exception as e:
+                self.documents[key] = (None, e)
+
+        document, error = self.documents[key]
+        if error:
+            raise error
+        return document
+
+    def get_digest(self, path: str) -> str:
+        # Digest of the contents of the file, file is read if it has not been loaded yet
+        if path not in self.digests:
+            with open(path, 'r') as f:
+                self.digests[path] = hashlib.sha256(f.read().encode()).hexdigest()
+        return self.digests[path]
+
+    def load_yaml(self, path: str) -> typing.Any:
+        return self.load(path, safe_yaml_load)
@@ -19,47 +19,105 @@ class ValidationError(ValidationException):
         self.errmsg = errmsg
         self.errno = errno
 
+    def __reduce__(self):
+        return self.__class__, (self.attribute, self.errmsg, self.errno)
+
     def __str__(self):
         return f'[{self.get_error_name()}] {self.attribute}: {self.errmsg}'
 
 
+class ValidationErrorRecord:
+
+    # Catalogs with a lot of broken versions can have thousands of errors which are sent back from worker
+    # processes. Exceptions always get a __dict__, so ValidationErrors keeps its errors as these slotted records
+    # which have the same attributes as ValidationError and are pickled as a tuple of their values.
+
+    __slots__ = ('attribute', 'errmsg', 'errno')
+
+    def __init__(self, attribute, errmsg, errno=errno.EFAULT):
+        self.attribute = attribute
+        self.errmsg = errmsg
+        self.errno = errno
+
+    def __reduce__(self):
+        return self.__class__, (self.attribute, self.errmsg, self.errno)
+
+    get_error_name = ValidationError.get_error_name
+    __str__ = ValidationError.__str__
+
+
 class ValidationErrors(ValidationException):
     def __init__(self, errors=None):
         self.errors = errors or []
 
+    @property
+    def errors(self):
+        # Callers can modify errors directly, so attributes are indexed again when they are checked next
+        self._attributes = None
+        return self._errors
+
+    @errors.setter
+    def errors(self, errors):
+        self._errors = [
+            e if isinstance(e, ValidationErrorRecord) else ValidationErrorRecord(e.attribute, e.errmsg, e.errno)
+            for e in errors
+        ]
+        self._attributes = None
+
+    def __reduce__(self):
+        return self.__class__, (self._errors,)
+
+    def _append(self, record):
+        self._errors.append(record)
+        if self._attributes is not None:
+            self._attributes.add(record.attribute)
+
     def add(self, attribute, errmsg, errno=errno.EINVAL):
-        self.errors.append(ValidationError(attribute, errmsg, errno))
+        self._append(ValidationErrorRecord(attribute, errmsg, errno))
 
     def add_validation_error(self, validation_error):
-        self.errors.append(validation_error)
+        self._append(ValidationErrorRecord(validation_error.attribute, validation_error.errmsg, validation_error.errno))
 
     def add_child(self, attribute, child):
-        for e in child.errors:
-            self.add(f"{attribute}.{e.attribute}", e.errmsg, e.errno)
+        # Errors of child are moved here under attribute
+        for e in child._errors:
+            e.attribute = f'{attribute}.{e.attribute}'
+        child._attributes = None
+        self.extend(child)
 
     def check(self):
         if self:
             raise self
 
     def extend(self, errors):
-        for e in errors.errors:
-            self.add(e.attribute, e.errmsg, e.errno)
+        # Errors are moved here instead of being copied, so errors being extended with are left empty
+        if errors is self:
+            return
+        if self._errors:
+            self._errors.extend(errors._errors)
+            if self._attributes is not None:
+                self._attributes.update(e.attribute for e in errors._errors)
+        else:
+            self._errors, self._attributes = errors._errors, errors._attributes
+        errors._errors, errors._attributes = [], None
 
     def __iter__(self):
-        for e in self.errors:
+        for e in self._errors:
             yield e.attribute, e.errmsg, e.errno
 
     def __bool__(self):
-        return bool(self.errors)
+        return bool(self._errors)
 
     def __str__(self):
         output = ''
-        for e in self.errors:
+        for e in self._errors:
             output += str(e) + '\n'
         return output
 
     def __contains__(self, item):
-        return item in [e.attribute for e in self.errors]
+        if self._attributes is None:
+            self._attributes = {e.attribute for e in self._errors}
+        return item in self._attributes
 
 
 class CatalogDoesNotExist(ValidationException):
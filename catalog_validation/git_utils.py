@@ -7,6 +7,7 @@ from collections import defaultdict
 
 from .ci.utils import OPTIONAL_METADATA_FILES
 from .exceptions import CatalogDoesNotExist
+from .utils import CACHED_VERSION_FILE_NAME
 
 
 def get_changed_apps(catalog_path: str, base_branch: str = 'master') -> dict:
@@ -40,3 +41,29 @@ def get_changed_apps(catalog_path: str, base_branch: str = 'master') -> dict:
             to_check_apps[train_name].append(app_name)
 
     return to_check_apps
+
+
+def get_changed_catalog_items(catalog_path: str, ref: str) -> dict:
+    # Returns train -> set of item names which have any file changed/added/removed since `ref` including
+    # changes which have not been committed yet
+    if not os.path.exists(catalog_path):
+        raise CatalogDoesNotExist(catalog_path)
+
+    changed_files = []
+    for cmd in (
+        ['git', '-C', catalog_path, '--no-pager', 'diff', '--name-only', '--relative', '-z', ref],
+        ['git', '-C', catalog_path, 'ls-files', '--others', '--exclude-standard', '-z'],
+    ):
+        cp = subprocess.run(cmd, capture_output=True, check=True)
+        changed_files.extend(filter(bool, cp.stdout.decode().split('\0')))
+
+    changed_items = defaultdict(set)
+    for file_path in changed_files:
+        path_components = file_path.split('/')
+        # Changes to files generated by catalog update itself do not mean that the item has changed
+        if len(path_components) < 3 or path_components[-1] == CACHED_VERSION_FILE_NAME:
+            continue
+
+        changed_items[path_components[0]].add(path_components[1])
+
+    return changed_items
@@ -0,0 +1,93 @@
+import collections.abc
+import hashlib
+import json
+import typing
+
+from catalog_validation.utils import DEDUPLICATED_VERSIONS_FORMAT, VERSION_BLOB_FIELDS
+
+
+# Kept versions of an app usually have identical schema/readmes etc, so in deduplicated app_versions.json
+# these are stored once in `blobs` keyed by sha256 digest of their contents and versions refer to them
+# with {"$blob": digest} i.e
+# {
+#     "format_version": 2,
+#     "versions": {"1.0.1": {"healthy": true, ..., "schema": {"$blob": "8c2e..."}}, ...},
+#     "blobs": {"8c2e...": {"groups": [...], "questions": [...]}, ...}
+# }
+BLOB_REF_KEY = '$blob'
+
+
+def get_blob_digest(value: typing.Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def is_blob_ref(value: typing.Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value
+
+
+def is_deduplicated(versions_data: typing.Any) -> bool:
+    return isinstance(versions_data, dict) and versions_data.get('format_version') == DEDUPLICATED_VERSIONS_FORMAT
+
+
+def deduplicate_versions(versions: dict) -> dict:
+    blobs = {}
+    deduplicated = {}
+    for version, version_data in versions.items():
+        deduplicated[version] = version_data = dict(version_data)
+        for field in filter(lambda f: version_data.get(f) is not None, VERSION_BLOB_FIELDS):
+            digest = get_blob_digest(version_data[field])
+            blobs.setdefault(digest, version_data[field])
+            version_data[field] = {BLOB_REF_KEY: digest}
+
+    return {'format_version': DEDUPLICATED_VERSIONS_FORMAT, 'versions': deduplicated, 'blobs': blobs}
+
+
+class LazyVersion(collections.abc.Mapping):
+
+    # Details of a version in deduplicated app_versions.json with blobs only being looked up when accessed.
+    # Blobs are shared between versions, so values must not be modified.
+
+    __slots__ = ('version_data', 'blobs')
+
+    def __init__(self, version_data: dict, blobs: dict):
+        self.version_data = version_data
+        self.blobs = blobs
+
+    def __getitem__(self, key):
+        value = self.version_data[key]
+        # Raises KeyError with the digest if blob does not exist
+        return self.blobs[value[BLOB_REF_KEY]] if is_blob_ref(value) else value
+
+    def __iter__(self):
+        return iter(self.version_data)
+
+    def __len__(self):
+        return len(self.version_data)
+
+
+class LazyVersions(collections.abc.Mapping):
+
+    __slots__ = ('versions', 'blobs')
+
+    def __init__(self, versions_data: dict):
+        self.versions = versions_data['versions']
+        self.blobs = versions_data['blobs']
+
+    def __getitem__(self, version):
+        return LazyVersion(self.versions[version], self.blobs)
+
+    def __iter__(self):
+        return iter(self.versions)
+
+    def __len__(self):
+        return len(self.versions)
+
+
+def get_versions(versions_data: dict) -> typing.Mapping[str, typing.Mapping]:
+    # Returns versions of app_versions.json contents regardless of the format they were written in
+    return LazyVersions(versions_data) if is_deduplicated(versions_data) else versions_data
+
+
+def resolve_versions(versions_data: dict) -> dict:
+    # Returns versions in the format app_versions.json would have without deduplication
+    return {version: dict(version_data) for version, version_data in get_versions(versions_data).items()}
@@ -1,20 +1,37 @@
-import concurrent.futures
+import contextlib
 import functools
 import os
 import typing
-import yaml
 
 from jsonschema import validate as json_schema_validate, ValidationError as JsonValidationError
 
+from catalog_validation.profiling import timed
+from catalog_validation.scheduling import (
+    CostTracker, estimate_item_cost, get_process_pool, run_longest_first, Task,
+)
+from catalog_validation.utils import CATALOG_DB_FILE_NAME
+from catalog_validation.workers import get_chunksize, get_max_workers
+from catalog_validation.yaml_utils import safe_yaml_load, YAMLError
+
+from .catalog_db import connect_catalog_db, get_scale_version_key
 from .items_util import get_item_details, get_default_questions_context
-from .utils import RECOMMENDED_APPS_FILENAME, RECOMMENDED_APPS_SCHEMA, valid_train
+from .questions_utils import get_context_fingerprint, NormalisedQuestionsCache
+from .transport import decode, PICKLE_TRANSPORT, release, run_encoded
+from .utils import get_last_updated_dates, RECOMMENDED_APPS_FILENAME, RECOMMENDED_APPS_SCHEMA, valid_train
 
 
-def item_details(items: dict, location: str, questions_context: typing.Optional[dict], item_key: str) -> dict:
+def item_details(
+    items: dict, location: str, questions_context: typing.Optional[dict], item_key: str,
+    last_updated_dates: typing.Optional[dict] = None, options: typing.Optional[dict] = None,
+) -> dict:
     train = items[item_key]
     item = item_key.removesuffix(f'_{train}')
     item_location = os.path.join(location, train, item)
-    return get_item_details(item_location, questions_context, {'retrieve_versions': True})
+    return get_item_details(item_location, questions_context, {
+        **(options or {}),
+        'retrieve_versions': True,
+        'last_updated_dates': last_updated_dates,
+    })
 
 
 def retrieve_train_names(location: str, all_trains=True, trains_filter=None) -> list:
@@ -38,36 +55,87 @@ def get_items_in_trains(trains_to_traverse: list, catalog_location: str) -> dict
     return items
 
 
+def retrieve_items_data(
+    items: dict, catalog_location: str, questions_context: typing.Optional[dict] = None,
+    options: typing.Optional[dict] = None, jobs: typing.Optional[int] = None,
+    cost_tracker: typing.Optional[CostTracker] = None, transport: str = PICKLE_TRANSPORT,
+) -> typing.Iterator[typing.Tuple[str, str, dict]]:
+    # Yields (train, item, item details) of each item as soon as its details have been retrieved so that
+    # consumers do not have to wait for (and keep in memory) details of all the items. Most expensive items
+    # are retrieved first, so items are yielded in no particular order.
+    # options are passed to get_item_details for each item along with fingerprint of questions context
+    # transport specifies how workers send item details back, see transport module for details
+    questions_context = questions_context or get_default_questions_context()
+    # Questions context is the same for all versions, so it is fingerprinted once for memoising their normalisation.
+    # Each worker gets its own copy of the cache which is released along with the pool once we are done.
+    options = {
+        **(options or {}), 'questions_context_fingerprint': get_context_fingerprint(questions_context),
+        'normalised_questions_cache': NormalisedQuestionsCache(),
+    }
+    # We retrieve last update timestamps of all items/versions in one go instead of each worker querying git
+    # for every item/version directory separately
+    last_updated_dates = get_last_updated_dates(catalog_location)
+    tasks = []
+    with timed('scan'):
+        for item_key, train in items.items():
+            item = item_key.removesuffix(f'_{train}')
+            tasks.append(Task(
+                item_key, f'{train}.{item}', estimate_item_cost(os.path.join(catalog_location, train, item)),
+                (item_key,),
+            ))
+
+    max_workers = get_max_workers(len(items), jobs)
+    # Everything except the item key is the same for all the items, so it is installed in each worker only once
+    # instead of being sent along with every chunk of items
+    with get_process_pool(max_workers, functools.partial(run_encoded, transport, functools.partial(
+        item_details, items, catalog_location, questions_context, last_updated_dates=last_updated_dates,
+        options=options,
+    ))) as exc:
+        results = run_longest_first(exc, None, tasks, get_chunksize(len(items), max_workers), cost_tracker)
+        try:
+            for item_key, item_info, error in results:
+                if error:
+                    raise error
+
+                train = items[item_key]
+                # Item details are only decoded when they are consumed
+                yield train, item_key.removesuffix(f'_{train}'), decode(item_info, transport)
+        finally:
+            # If we did not consume all the results, we make sure that resources held by them are released
+            for item_key, item_info, error in results:
+                if not error:
+                    release(item_info, transport)
+
+
 def retrieve_trains_data(
     items: dict, catalog_location: str, preferred_trains: list,
-    trains_to_traverse: list, job: typing.Any = None, questions_context: typing.Optional[dict] = None
+    trains_to_traverse: list, job: typing.Any = None, questions_context: typing.Optional[dict] = None,
+    options: typing.Optional[dict] = None, jobs: typing.Optional[int] = None,
+    cost_tracker: typing.Optional[CostTracker] = None, transport: str = PICKLE_TRANSPORT,
 ) -> typing.Tuple[dict, set]:
-    questions_context = questions_context or get_default_questions_context()
     trains = {
         'charts': {},
         'test': {},
         **{k: {} for k in trains_to_traverse},
     }
+    # Items are retrieved in no particular order, so we reserve their place beforehand to have the same order
+    # of items in each train regardless of how long it took to retrieve them
+    for item_key, train in items.items():
+        trains[train][item_key.removesuffix(f'_{train}')] = None
     unhealthy_apps = set()
 
     total_items = len(items)
-    with concurrent.futures.ProcessPoolExecutor(max_workers=(5 if total_items > 10 else 2)) as exc:
-        for index, result in enumerate(zip(items, exc.map(
-            functools.partial(item_details, items, catalog_location, questions_context),
-            items, chunksize=(10 if total_items > 10 else 5)
-        ))):
-            item_key = result[0]
-            item_info = result[1]
-            train = items[item_key]
-            item = item_key.removesuffix(f'_{train}')
-            if job:
-                job.set_progress(
-                    int((index / total_items) * 80) + 10,
-                    f'Retrieved information of {item!r} item from {train!r} train'
-                )
-            trains[train][item] = item_info
-            if train in preferred_trains and not trains[train][item]['healthy']:
-                unhealthy_apps.add(f'{item} ({train} train)')
+    for index, (train, item, item_info) in enumerate(
+        retrieve_items_data(items, catalog_location, questions_context, options, jobs, cost_tracker, transport)
+    ):
+        if job:
+            job.set_progress(
+                int((index / total_items) * 80) + 10,
+                f'Retrieved information of {item!r} item from {train!r} train'
+            )
+        trains[train][item] = item_info
+        if train in preferred_trains and not trains[train][item]['healthy']:
+            unhealthy_apps.add(f'{item} ({train} train)')
 
     return trains, unhealthy_apps
 
@@ -75,9 +143,71 @@ def retrieve_trains_data(
 def retrieve_recommended_apps(catalog_location: str) -> typing.Dict[str, list]:
     try:
         with open(os.path.join(catalog_location, RECOMMENDED_APPS_FILENAME), 'r') as f:
-            data = yaml.safe_load(f.read())
+            data = safe_yaml_load(f.read())
             json_schema_validate(data, RECOMMENDED_APPS_SCHEMA)
-    except (FileNotFoundError, JsonValidationError, yaml.YAMLError):
+    except (FileNotFoundError, JsonValidationError, YAMLError):
         return {}
     else:
         return data
+
+
+# Following query catalog.db written by catalog_update with --sqlite so that consumers do not have to load
+# catalog.json/app_versions.json files to answer them
+
+VERSION_COLUMNS = (
+    'version', 'human_version', 'app_version', 'healthy', 'supported', 'healthy_error', 'last_update', 'location',
+    'min_scale_version', 'max_scale_version',
+)
+
+
+def get_latest_healthy_version(catalog_location: str, train: str, item: str) -> typing.Optional[dict]:
+    with contextlib.closing(connect_catalog_db(os.path.join(catalog_location, CATALOG_DB_FILE_NAME))) as db:
+        version = db.execute(
+            f'SELECT v.id, {", ".join(f"v.{c}" for c in VERSION_COLUMNS)} FROM versions v '
+            'JOIN items i ON i.id = v.item_id JOIN trains t ON t.id = i.train_id '
+            'WHERE t.name = ? AND i.name = ? AND v.healthy ORDER BY v.rank LIMIT 1', (train, item)
+        ).fetchone()
+        if version is None:
+            return None
+
+        return {
+            **{c: version[c] for c in VERSION_COLUMNS},
+            'healthy': bool(version['healthy']),
+            'supported': bool(version['supported']),
+            'required_features': [
+                row['feature'] for row in db.execute(
+                    'SELECT feature FROM version_features WHERE version_id = ?', (version['id'],)
+                )
+            ],
+        }
+
+
+def get_items_in_category(catalog_location: str, category: str) -> typing.List[dict]:
+    with contextlib.closing(connect_catalog_db(os.path.join(catalog_location, CATALOG_DB_FILE_NAME))) as db:
+        return [
+            dict(row) for row in db.execute(
+                'SELECT t.name AS train, i.name AS name, i.latest_version AS latest_version FROM item_categories c '
+                'JOIN items i ON i.id = c.item_id JOIN trains t ON t.id = i.train_id WHERE c.category = ? '
+                'ORDER BY t.name, i.name', (category,)
+            )
+        ]
+
+
+def get_items_supported_on_scale_version(catalog_location: str, scale_version: str) -> typing.List[dict]:
+    # Returns items having a healthy version which can be installed on `scale_version` along with the newest
+    # such version of each item
+    scale_version_key = get_scale_version_key(scale_version)
+    if scale_version_key is None:
+        raise ValueError(f'{scale_version!r} is not a valid scale version')
+
+    with contextlib.closing(connect_catalog_db(os.path.join(catalog_location, CATALOG_DB_FILE_NAME))) as db:
+        # sqlite returns values of the row having the minimum rank for bare columns when MIN() is used
+        return [
+            {'train': row['train'], 'name': row['name'], 'version': row['version']} for row in db.execute(
+                'SELECT t.name AS train, i.name AS name, v.version AS version, MIN(v.rank) FROM versions v '
+                'JOIN items i ON i.id = v.item_id JOIN trains t ON t.id = i.train_id WHERE v.healthy '
+                'AND (v.min_scale_version_key IS NULL OR v.min_scale_version_key <= ?) '
+                'AND (v.max_scale_version_key IS NULL OR v.max_scale_version_key >= ?) '
+                'GROUP BY v.item_id ORDER BY t.name, i.name', (scale_version_key, scale_version_key)
+            )
+        ]
@@ -0,0 +1,192 @@
+import contextlib
+import json
+import os
+import pathlib
+import sqlite3
+import tempfile
+import typing
+
+from catalog_validation.utils import CATALOG_DB_FILE_NAME, CACHED_VERSION_FILE_NAME, RE_VERSION_PATTERN
+
+from .app_versions import get_versions
+
+
+# Bumped whenever tables below change so that consumers can tell if they are able to query the database
+CATALOG_DB_VERSION = 1
+CATALOG_DB_TABLES = '''
+CREATE TABLE trains (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY,
+    train_id INTEGER NOT NULL REFERENCES trains(id),
+    name TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    healthy INTEGER NOT NULL,
+    healthy_error TEXT,
+    recommended INTEGER NOT NULL,
+    latest_version TEXT,
+    latest_app_version TEXT,
+    latest_human_version TEXT,
+    last_update TEXT,
+    location TEXT,
+    icon_url TEXT,
+    home TEXT
+);
+CREATE TABLE item_categories (
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    category TEXT NOT NULL
+);
+CREATE TABLE item_tags (
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    tag TEXT NOT NULL
+);
+CREATE TABLE versions (
+    id INTEGER PRIMARY KEY,
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    version TEXT NOT NULL,
+    -- Position of the version in the item's versions when sorted from newest to oldest
+    rank INTEGER NOT NULL,
+    human_version TEXT,
+    app_version TEXT,
+    healthy INTEGER NOT NULL,
+    supported INTEGER NOT NULL,
+    healthy_error TEXT,
+    last_update TEXT,
+    location TEXT,
+    min_scale_version TEXT,
+    max_scale_version TEXT,
+    -- Padded keys of scale versions which can be compared as strings, see get_scale_version_key()
+    min_scale_version_key TEXT,
+    max_scale_version_key TEXT
+);
+CREATE TABLE version_features (
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    feature TEXT NOT NULL
+);
+'''
+# Indexes are created once all the data has been inserted as that is faster than updating them for each row
+CATALOG_DB_INDEXES = '''
+CREATE UNIQUE INDEX items_train_name ON items(train_id, name);
+CREATE INDEX items_name ON items(name);
+CREATE INDEX item_categories_category ON item_categories(category, item_id);
+CREATE INDEX item_tags_tag ON item_tags(tag, item_id);
+CREATE UNIQUE INDEX versions_item_rank ON versions(item_id, rank);
+CREATE INDEX versions_scale_version ON versions(min_scale_version_key, max_scale_version_key);
+CREATE INDEX version_features_version ON version_features(version_id);
+CREATE INDEX version_features_feature ON version_features(feature);
+'''
+
+
+def get_scale_version_key(version: typing.Optional[str]) -> typing.Optional[str]:
+    # Components of XX.XX(.X)* part of the version are zero padded so that keys compare like the versions do,
+    # i.e "0024.0004" < "0024.0004.0001" < "0024.0010"
+    if not isinstance(version, str) or not (match := RE_VERSION_PATTERN.search(version)):
+        return None
+    return '.'.join(f'{int(component):04d}' for component in match.group(1).split('.'))
+
+
+def connect_catalog_db(path: str) -> sqlite3.Connection:
+    # Catalog database is opened read only as it is only ever written by catalog_update
+    connection = sqlite3.connect(f'{pathlib.Path(path).resolve().as_uri()}?mode=ro', uri=True)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def load_versions(location: str, train: str, item: str) -> typing.Mapping[str, typing.Mapping]:
+    try:
+        with open(os.path.join(location, train, item, CACHED_VERSION_FILE_NAME), 'r') as f:
+            versions = json.loads(f.read())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return get_versions(versions) if isinstance(versions, dict) else {}
+
+
+class CatalogDatabaseWriter:
+
+    # Writes catalog.db sqlite database of a catalog as details of each item are added. Database is written
+    # to a temporary file in the catalog and only replaces existing database once commit() is called.
+
+    def __init__(self, location: str):
+        self.location = location
+        self.connection = None
+        self.tmp_path = None
+        self.train_ids = {}
+
+    def __enter__(self):
+        fd, self.tmp_path = tempfile.mkstemp(prefix='.catalog_db_', dir=self.location)
+        os.close(fd)
+        self.connection = sqlite3.connect(self.tmp_path)
+        # Nothing needs to survive a crash as the file is thrown away if we do not get to commit it
+        self.connection.executescript('PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;')
+        self.connection.executescript(CATALOG_DB_TABLES)
+        self.connection.execute(f'PRAGMA user_version = {CATALOG_DB_VERSION}')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.connection:
+            self.connection.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.tmp_path)
+
+    @property
+    def db_file_path(self) -> str:
+        return os.path.join(self.location, CATALOG_DB_FILE_NAME)
+
+    def get_train_id(self, train: str) -> int:
+        if train not in self.train_ids:
+            self.train_ids[train] = self.connection.execute('INSERT INTO trains (name) VALUES (?)', (train,)).lastrowid
+        return self.train_ids[train]
+
+    def add_item(self, train: str, item: str, item_data: dict, versions: typing.Mapping) -> None:
+        item_id = self.connection.execute(
+            'INSERT INTO items (train_id, name, title, description, healthy, healthy_error, recommended, '
+            'latest_version, latest_app_version, latest_human_version, last_update, location, icon_url, home) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+                self.get_train_id(train), item, item_data.get('title'), item_data.get('description'),
+                bool(item_data.get('healthy')), item_data.get('healthy_error'), bool(item_data.get('recommended')),
+                item_data.get('latest_version'), item_data.get('latest_app_version'),
+                item_data.get('latest_human_version'), item_data.get('last_update'), item_data.get('location'),
+                item_data.get('icon_url'), item_data.get('home'),
+            )
+        ).lastrowid
+        self.connection.executemany(
+            'INSERT INTO item_categories (item_id, category) VALUES (?, ?)',
+            ((item_id, category) for category in item_data.get('categories') or [])
+        )
+        self.connection.executemany(
+            'INSERT INTO item_tags (item_id, tag) VALUES (?, ?)',
+            ((item_id, tag) for tag in item_data.get('tags') or [])
+        )
+
+        # Versions are sorted from newest to oldest when item details are retrieved
+        for rank, (version, version_data) in enumerate(versions.items()):
+            chart_metadata = version_data.get('chart_metadata') or {}
+            annotations = chart_metadata.get('annotations') or {}
+            min_scale_version, max_scale_version = (
+                annotations.get(k) for k in ('min_scale_version', 'max_scale_version')
+            )
+            version_id = self.connection.execute(
+                'INSERT INTO versions (item_id, version, rank, human_version, app_version, healthy, supported, '
+                'healthy_error, last_update, location, min_scale_version, max_scale_version, '
+                'min_scale_version_key, max_scale_version_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+                    item_id, version, rank, version_data.get('human_version'), chart_metadata.get('appVersion'),
+                    bool(version_data.get('healthy')), bool(version_data.get('supported')),
+                    version_data.get('healthy_error'), version_data.get('last_update'), version_data.get('location'),
+                    min_scale_version, max_scale_version, get_scale_version_key(min_scale_version),
+                    get_scale_version_key(max_scale_version),
+                )
+            ).lastrowid
+            self.connection.executemany(
+                'INSERT INTO version_features (version_id, feature) VALUES (?, ?)',
+                ((version_id, feature) for feature in version_data.get('required_features') or [])
+            )
+
+    def commit(self) -> None:
+        self.connection.executescript(CATALOG_DB_INDEXES)
+        self.connection.commit()
+        self.connection.close()
+        self.connection = None
+        os.replace(self.tmp_path, self.db_file_path)
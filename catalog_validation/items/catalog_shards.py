@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import typing
+
+from catalog_validation.utils import CACHED_CATALOG_FILE_NAME, CATALOG_MANIFEST_FILE_NAME, CATALOG_SHARDS_DIR
+
+
+# Bumped whenever layout of the manifest/shards changes so that consumers can tell if they are able to read them
+CATALOG_MANIFEST_VERSION = 1
+
+
+def get_shard_path(train: str) -> str:
+    # Paths of shards in the manifest are relative to the catalog location
+    return os.path.join(CATALOG_SHARDS_DIR, f'{train}.json')
+
+
+def get_file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_catalog_manifest(location: str) -> typing.Optional[dict]:
+    try:
+        with open(os.path.join(location, CATALOG_MANIFEST_FILE_NAME), 'r') as f:
+            manifest = json.loads(f.read())
+    except (OSError, json.JSONDecodeError):
+        return None
+    return manifest if isinstance(manifest, dict) and manifest.get('version') == CATALOG_MANIFEST_VERSION else None
+
+
+def load_catalog_trains(location: str, trains: typing.Optional[list] = None, verify: bool = True) -> dict:
+    # Returns catalog data of specified trains (all trains if not specified) in the same format as catalog.json,
+    # only shards of specified trains are read. Catalogs which do not have a manifest fall back to catalog.json.
+    # Raises ValueError if a shard does not match its size/digest in the manifest or is not valid json.
+    manifest = get_catalog_manifest(location)
+    if manifest is None:
+        with open(os.path.join(location, CACHED_CATALOG_FILE_NAME), 'r') as f:
+            catalog_data = json.loads(f.read())
+        return {k: v for k, v in catalog_data.items() if trains is None or k in trains}
+
+    catalog_data = {}
+    for train, shard in manifest['trains'].items():
+        if trains is not None and train not in trains:
+            continue
+
+        with open(os.path.join(location, shard['path']), 'rb') as f:
+            contents = f.read()
+        if verify and (len(contents) != shard['size'] or hashlib.sha256(contents).hexdigest() != shard['sha256']):
+            raise ValueError(f'Shard of {train!r} train does not match catalog manifest')
+        catalog_data.update(json.loads(contents))
+    return catalog_data
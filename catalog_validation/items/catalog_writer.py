@@ -0,0 +1,161 @@
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import typing
+
+from catalog_validation.utils import (
+    CACHED_CATALOG_FILE_NAME, CACHED_VERSION_FILE_NAME, CATALOG_MANIFEST_FILE_NAME, CATALOG_SHARDS_DIR,
+)
+
+from .app_versions import deduplicate_versions
+from .catalog_shards import CATALOG_MANIFEST_VERSION, get_file_digest, get_shard_path
+
+
+class CatalogWriter:
+
+    # Writes catalog.json and app_versions.json files of a catalog as details of each item are retrieved, so
+    # that we never have to keep details of the complete catalog in memory. Nothing is written to the catalog
+    # itself until commit() is called, till then everything is kept in a temporary directory in the catalog.
+    # With shards, catalog data of each train is also written to its own file along with a manifest of those
+    # files so that consumers can only load trains they are interested in, see catalog_shards module.
+    # With deduplicate_versions, app_versions.json files are written in the deduplicated format of app_versions module.
+
+    def __init__(
+        self, location: str, trains: typing.Dict[str, list], shards: bool = False, deduplicate_versions: bool = False,
+    ):
+        # trains maps each train to be written in catalog.json to the order its items should be written in
+        self.location = location
+        self.trains = trains
+        self.shards = shards
+        self.deduplicate_versions = deduplicate_versions
+        self.fragments = {train: {} for train in trains}
+        self.train_files = {}
+        self.versions_files = {}
+        self.tmp_dir = None
+
+    def __enter__(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='.catalog_update_', dir=self.location)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for f in self.train_files.values():
+            f.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @property
+    def catalog_file_path(self) -> str:
+        return os.path.join(self.location, CACHED_CATALOG_FILE_NAME)
+
+    @property
+    def manifest_file_path(self) -> str:
+        return os.path.join(self.location, CATALOG_MANIFEST_FILE_NAME)
+
+    @property
+    def versions_file_paths(self) -> typing.List[str]:
+        # Paths are returned in the order items are written in catalog.json
+        return [
+            self.versions_files[(train, item)][1] for train, items in self.trains.items()
+            for item in items if (train, item) in self.versions_files
+        ]
+
+    def add_item(self, train: str, item: str, item_data: dict, versions: typing.Optional[dict] = None) -> None:
+        # If versions are not specified, app_versions.json of the item is left untouched
+        if versions is not None:
+            tmp_versions_path = os.path.join(self.tmp_dir, f'{len(self.versions_files)}_{CACHED_VERSION_FILE_NAME}')
+            with open(tmp_versions_path, 'w') as f:
+                json.dump(deduplicate_versions(versions) if self.deduplicate_versions else versions, f, indent=4)
+            self.versions_files[(train, item)] = (
+                tmp_versions_path, os.path.join(self.location, train, item, CACHED_VERSION_FILE_NAME)
+            )
+
+        # We write item entry as it would be indented in catalog.json so that we can just copy it over
+        fragment = f'        {json.dumps(item)}: {json.dumps(item_data, indent=4)}'.replace('\n', '\n        ')
+        train_file = self.get_train_file(train)
+        self.fragments[train][item] = (train_file.tell(), train_file.write(fragment.encode()))
+
+    def get_train_file(self, train: str) -> typing.BinaryIO:
+        if train not in self.train_files:
+            self.train_files[train] = open(os.path.join(self.tmp_dir, f'{len(self.train_files)}_train'), 'w+b')
+        return self.train_files[train]
+
+    def write_catalog(self, f: typing.BinaryIO, trains: typing.Optional[list] = None) -> None:
+        # This writes exactly what json.dumps(catalog_data, indent=4) would have, if trains are specified
+        # catalog data only has those trains
+        trains = list(self.trains) if trains is None else trains
+        if not trains:
+            f.write(b'{}')
+            return
+
+        f.write(b'{\n')
+        for train_index, train in enumerate(trains):
+            f.write((',\n' if train_index else '').encode() + f'    {json.dumps(train)}: '.encode())
+            ordered_items = set(self.trains[train])
+            items = [i for i in self.trains[train] if i in self.fragments[train]] + [
+                i for i in self.fragments[train] if i not in ordered_items
+            ]
+            if not items:
+                f.write(b'{}')
+                continue
+
+            f.write(b'{\n')
+            train_file = self.train_files[train]
+            for item_index, item in enumerate(items):
+                offset, length = self.fragments[train][item]
+                train_file.seek(offset)
+                f.write((b',\n' if item_index else b'') + train_file.read(length))
+            f.write(b'\n    }')
+        f.write(b'\n}')
+
+    def write_shards(self) -> None:
+        # Shard of a train is catalog.json having only that train, so shards can be merged back into catalog data
+        os.makedirs(os.path.join(self.tmp_dir, CATALOG_SHARDS_DIR))
+        manifest = {'version': CATALOG_MANIFEST_VERSION, 'trains': {}}
+        for train in self.trains:
+            tmp_shard_path = os.path.join(self.tmp_dir, get_shard_path(train))
+            with open(tmp_shard_path, 'wb') as f:
+                self.write_catalog(f, [train])
+            manifest['trains'][train] = {
+                'path': get_shard_path(train),
+                'size': os.path.getsize(tmp_shard_path),
+                'sha256': get_file_digest(tmp_shard_path),
+            }
+
+        with open(os.path.join(self.tmp_dir, CATALOG_MANIFEST_FILE_NAME), 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+    def commit_shards(self) -> None:
+        shards_dir = os.path.join(self.location, CATALOG_SHARDS_DIR)
+        os.makedirs(shards_dir, exist_ok=True)
+        for train in self.trains:
+            os.replace(
+                os.path.join(self.tmp_dir, get_shard_path(train)), os.path.join(self.location, get_shard_path(train))
+            )
+
+        # Manifest is replaced last so that it never refers to shards which have not been written yet and
+        # shards of trains which no longer exist are only removed once the manifest does not refer to them
+        os.replace(os.path.join(self.tmp_dir, CATALOG_MANIFEST_FILE_NAME), self.manifest_file_path)
+        shard_names = {os.path.basename(get_shard_path(train)) for train in self.trains}
+        for name in filter(lambda n: n not in shard_names, os.listdir(shards_dir)):
+            os.unlink(os.path.join(shards_dir, name))
+
+    def commit(self) -> None:
+        tmp_catalog_path = os.path.join(self.tmp_dir, CACHED_CATALOG_FILE_NAME)
+        with open(tmp_catalog_path, 'wb') as f:
+            self.write_catalog(f)
+        if self.shards:
+            self.write_shards()
+        else:
+            # Shards of a previous update would no longer match catalog.json, readers fall back to catalog.json
+            # once the manifest is gone
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.manifest_file_path)
+
+        os.replace(tmp_catalog_path, self.catalog_file_path)
+        for tmp_versions_path, versions_path in self.versions_files.values():
+            os.replace(tmp_versions_path, versions_path)
+        if self.shards:
+            self.commit_shards()
+        else:
+            shutil.rmtree(os.path.join(self.location, CATALOG_SHARDS_DIR), ignore_errors=True)
@@ -1,19 +1,24 @@
-import markdown
 import os
 import typing
-import yaml
 
 from pkg_resources import parse_version
 
+from catalog_validation.documents import DocumentLoader
 from catalog_validation.exceptions import ValidationErrors
+from catalog_validation.markdown_utils import get_markdown_renderer
+from catalog_validation.profiling import profiled
+from catalog_validation.yaml_utils import safe_yaml_load
 
 from .features import version_supported
-from .questions_utils import normalise_questions
+from .questions_utils import get_required_features, normalise_questions_memoised, NormalisedQuestionsCache
 from .utils import get_last_updated_date
 from .validate_utils import validate_item, validate_item_version
 
 
 ITEM_KEYS = ['icon_url']
+# Keys of version details which callers can choose to retrieve with `fields` option, by default all of them are
+# retrieved. Files of keys which have not been asked for are not parsed/rendered at all.
+VERSION_DETAILS_FIELDS = {'app_metadata', 'schema', 'app_readme', 'detailed_readme', 'changelog'}
 
 
 def get_item_details_base(retrieve_complete_item_keys: bool = True) -> dict:
@@ -51,17 +56,23 @@ def get_item_details(
 
     options = options or {}
     retrieve_versions = options.get('retrieve_versions', True)
+    # Versions of the item share normalised questions which are released once we are done with the item unless
+    # caller keeps a cache for its whole run
+    normalised_questions_cache = options.get('normalised_questions_cache')
+    if normalised_questions_cache is None:
+        normalised_questions_cache = NormalisedQuestionsCache()
     item_data = get_item_details_base()
     item_data.update({
         'location': item_location,
-        'last_update': get_last_updated_date(catalog_path, item_location),
+        'last_update': get_last_updated_date(catalog_path, item_location, options.get('last_updated_dates')),
         'name': item,
         'title': item.capitalize(),
     })
 
     schema = f'{train}.{item}'
+    documents = DocumentLoader()
     try:
-        validate_item(item_location, schema, False)
+        validate_item(item_location, schema, False, documents)
     except ValidationErrors as verrors:
         item_data['healthy_error'] = f'Following error(s) were found with {item!r}:\n'
         for verror in verrors:
@@ -75,7 +86,13 @@ def get_item_details(
     item_data.update(get_item_details_impl(item_location, schema, questions_context, {
         'retrieve_latest_version': not retrieve_versions,
         'default_values_callable': options.get('default_values_callable'),
-    }))
+        'last_updated_dates': options.get('last_updated_dates'),
+        'compact_port_enum': options.get('compact_port_enum'),
+        'markdown_cache_dir': options.get('markdown_cache_dir'),
+        'fields': options.get('fields'),
+        'questions_context_fingerprint': options.get('questions_context_fingerprint'),
+        'normalised_questions_cache': normalised_questions_cache,
+    }, documents))
     unhealthy_versions = []
     for k, v in sorted(item_data['versions'].items(), key=lambda v: parse_version(v[0]), reverse=True):
         if not v['healthy']:
@@ -83,7 +100,7 @@ def get_item_details(
         else:
             chart_metadata = v['chart_metadata']
             if not item_data['app_readme']:
-                item_data['app_readme'] = v['app_readme']
+                item_data['app_readme'] = v.get('app_readme')
             if not item_data['maintainers'] and chart_metadata.get('maintainers'):
                 item_data['maintainers'] = chart_metadata['maintainers']
             if not item_data['latest_version']:
@@ -115,7 +132,8 @@ def get_item_details(
 
 
 def get_item_details_impl(
-    item_path: str, schema: str, questions_context: typing.Optional[dict], options: typing.Optional[dict]
+    item_path: str, schema: str, questions_context: typing.Optional[dict], options: typing.Optional[dict],
+    documents: typing.Optional[DocumentLoader] = None,
 ) -> dict:
     # Each directory under item path represents a version of the item and we need to retrieve details
     # for each version available under the item
@@ -127,8 +145,7 @@ def get_item_details_impl(
         'tags': [],
         'versions': {},
     }
-    with open(os.path.join(item_path, 'item.yaml'), 'r') as f:
-        item_data.update(yaml.safe_load(f.read()))
+    item_data.update((documents or DocumentLoader()).load_yaml(os.path.join(item_path, 'item.yaml')))
 
     item_data.update({k: item_data.get(k) for k in ITEM_KEYS})
 
@@ -143,13 +160,15 @@ def get_item_details_impl(
             'supported': False,
             'healthy_error': None,
             'location': version_path,
-            'last_update': get_last_updated_date(catalog_path, version_path),
+            'last_update': get_last_updated_date(catalog_path, version_path, options.get('last_updated_dates')),
             'required_features': [],
             'human_version': version,
             'version': version,
         }
+        # Validation and retrieving version details share the loader so that version files are parsed only once
+        version_documents = DocumentLoader()
         try:
-            validate_item_version(version_details['location'], f'{schema}.{version}')
+            validate_item_version(version_details['location'], f'{schema}.{version}', version_documents)
         except ValidationErrors as verrors:
             version_details['healthy_error'] = f'Following error(s) were found with {schema}.{version!r}:\n'
             for verror in verrors:
@@ -160,7 +179,15 @@ def get_item_details_impl(
 
         version_details.update({
             'healthy': True,
-            **get_item_version_details(version_details['location'], questions_context)
+            **get_item_version_details(
+                version_details['location'], questions_context, {
+                    'compact_port_enum': options.get('compact_port_enum'),
+                    'markdown_cache_dir': options.get('markdown_cache_dir'),
+                    'fields': options.get('fields'),
+                    'questions_context_fingerprint': options.get('questions_context_fingerprint'),
+                    'normalised_questions_cache': options.get('normalised_questions_cache'),
+                }, version_documents,
+            )
         })
         if retrieve_latest_version:
             break
@@ -168,34 +195,55 @@ def get_item_details_impl(
     return item_data
 
 
+@profiled('get_item_version_details')
 def get_item_version_details(
-    version_path: str, questions_context: typing.Optional[dict], options: typing.Optional[dict] = None
+    version_path: str, questions_context: typing.Optional[dict], options: typing.Optional[dict] = None,
+    documents: typing.Optional[DocumentLoader] = None,
 ) -> dict:
+    options = options or {}
+    documents = documents or DocumentLoader()
+    render_markdown = get_markdown_renderer(options.get('markdown_cache_dir'))
+    # fields being None means that we retrieve everything
+    fields = VERSION_DETAILS_FIELDS if options.get('fields') is None else set(options['fields'])
+    # Default values are retrieved from normalised schema
+    normalise_schema = 'schema' in fields or bool(options.get('default_values_callable'))
     version_data = {'location': version_path, 'required_features': set()}
     for key, filename, parser in (
-        ('chart_metadata', 'Chart.yaml', yaml.safe_load),
-        ('app_metadata', 'metadata.yaml', yaml.safe_load),
-        ('schema', 'questions.yaml', yaml.safe_load),
-        ('app_readme', 'app-readme.md', markdown.markdown),
-        ('detailed_readme', 'README.md', markdown.markdown),
-        ('changelog', 'CHANGELOG.md', markdown.markdown),
+        ('chart_metadata', 'Chart.yaml', safe_yaml_load),
+        ('app_metadata', 'metadata.yaml', safe_yaml_load),
+        ('schema', 'questions.yaml', safe_yaml_load),
+        ('app_readme', 'app-readme.md', render_markdown),
+        ('detailed_readme', 'README.md', render_markdown),
+        ('changelog', 'CHANGELOG.md', render_markdown),
     ):
+        if key in VERSION_DETAILS_FIELDS and key not in fields and not (key == 'schema' and normalise_schema):
+            continue
         if os.path.exists(os.path.join(version_path, filename)):
-            with open(os.path.join(version_path, filename), 'r') as f:
-                version_data[key] = parser(f.read())
+            version_data[key] = documents.load(os.path.join(version_path, filename), parser)
         else:
             version_data[key] = None
 
-    # We will normalise questions now so that if they have any references, we render them accordingly
-    # like a field referring to available interfaces on the system
-    normalise_questions(version_data, questions_context or get_default_questions_context())
+    # When retrieving item details, questions.yaml has already been parsed and walked by validation sharing the loader
+    questions_path = os.path.join(version_path, 'questions.yaml')
+    questions_walk = documents.questions_walks.pop(questions_path, None)
+    if normalise_schema:
+        # We will normalise questions now so that if they have any references, we render them accordingly
+        # like a field referring to available interfaces on the system
+        normalise_questions_memoised(
+            version_data, documents.get_digest(questions_path), questions_context or get_default_questions_context(),
+            options, questions_walk,
+        )
+    else:
+        version_data['required_features'] = get_required_features(documents.load_yaml(questions_path), questions_walk)
 
     version_data.update({
         'supported': version_supported(version_data),
         'required_features': list(version_data['required_features']),
     })
-    if options and options.get('default_values_callable'):
+    if options.get('default_values_callable'):
         version_data['values'] = options['default_values_callable'](version_data)
+    if 'schema' not in fields:
+        version_data.pop('schema', None)
     chart_metadata = version_data['chart_metadata']
     if chart_metadata['name'] != 'ix-chart' and chart_metadata.get('appVersion'):
         version_data['human_version'] = f'{chart_metadata["appVersion"]}_{chart_metadata["version"]}'
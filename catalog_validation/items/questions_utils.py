@@ -1,11 +1,20 @@
-import itertools
+import collections
+import hashlib
+import pickle
+import typing
 
+from catalog_validation.profiling import profiled
+
+from .questions_walker import get_questions_walk, QuestionsWalk
 from .utils import ACL_QUESTION, IX_VOLUMES_ACL_QUESTION
 
 
 CUSTOM_PORTALS_KEY = 'iXPortals'
 CUSTOM_PORTALS_ENABLE_KEY = 'enableIXPortals'
 CUSTOM_PORTAL_GROUP_KEY = 'iXPortalsGroupName'
+PORT_ENUM_RANGE_KEY = 'enum_range'
+# Normalised schemas can be a couple of MBs each (e.g port enums), so caches are bounded by their pickled size
+NORMALISED_QUESTIONS_CACHE_MAX_SIZE = 64 * 1024 * 1024
 
 
 def get_custom_portal_question(group_name: str) -> dict:
@@ -88,29 +97,119 @@ def get_custom_portal_question(group_name: str) -> dict:
     }
 
 
-def normalise_questions(version_data: dict, context: dict) -> None:
-    version_data['required_features'] = set()
-    version_data['schema']['questions'].extend(
-        [
-            get_custom_portal_question(version_data['schema'][CUSTOM_PORTAL_GROUP_KEY])
-        ] if version_data['schema'].get(CUSTOM_PORTALS_ENABLE_KEY) else []
+def normalise_walked_questions(walk: QuestionsWalk, context: dict, options: typing.Optional[dict] = None) -> None:
+    # Schemas are normalised children first as normalising a schema can replace its children (e.g normalize/acl)
+    # which should not be normalised
+    for schema in walk.schemas:
+        normalise_question_schema(schema, context, options or {})
+
+
+@profiled('normalise_questions')
+def normalise_questions(
+    version_data: dict, context: dict, options: typing.Optional[dict] = None,
+    walk: typing.Optional[QuestionsWalk] = None,
+) -> None:
+    # If questions have already been walked (e.g while validating them), what was collected then is used instead
+    # of walking them again. Custom portal question is added by us, so it is walked on its own.
+    walks = [walk or get_questions_walk(version_data['schema']['questions'])]
+    if version_data['schema'].get(CUSTOM_PORTALS_ENABLE_KEY):
+        portal_question = get_custom_portal_question(version_data['schema'][CUSTOM_PORTAL_GROUP_KEY])
+        version_data['schema']['questions'].append(portal_question)
+        walks.append(get_questions_walk([portal_question]))
+
+    for questions_walk in walks:
+        normalise_walked_questions(questions_walk, context, options)
+    version_data['required_features'] = list(set().union(*(w.features for w in walks)))
+
+
+def get_context_fingerprint(context: dict) -> str:
+    return hashlib.sha256(pickle.dumps(sorted(context.items()))).hexdigest()
+
+
+class NormalisedQuestionsCache:
+
+    # Normalised questions keyed by (questions digest, context fingerprint, options affecting normalisation) so that
+    # identical questions.yaml of different versions are only normalised once. A cache only lives as long as the
+    # run it was created for (e.g retrieving details of an item or of a catalog) and least recently used entries
+    # are evicted once pickled schemas it keeps exceed max_size bytes.
+
+    def __init__(self, max_size: int = NORMALISED_QUESTIONS_CACHE_MAX_SIZE):
+        self.entries = collections.OrderedDict()
+        self.max_size = max_size
+        self.size = 0
+
+    def get(self, key: tuple) -> typing.Optional[tuple]:
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def add(self, key: tuple, schema: bytes, required_features: list) -> None:
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key)[0])
+        self.entries[key] = (schema, required_features)
+        self.size += len(schema)
+        while self.size > self.max_size:
+            self.size -= len(self.entries.popitem(last=False)[1][0])
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def normalise_questions_memoised(
+    version_data: dict, questions_digest: str, context: dict, options: typing.Optional[dict] = None,
+    walk: typing.Optional[QuestionsWalk] = None,
+) -> None:
+    # Same as normalise_questions, except that if questions having the same digest have already been normalised
+    # with the same context, a copy of them from `normalised_questions_cache` option is used instead of normalising
+    # them again. Questions are normalised every time if no cache is specified.
+    # Fingerprinting context pickles all of it (e.g unused ports), so callers normalising questions of many versions
+    # with the same context should compute it once and specify it with `questions_context_fingerprint` option
+    options = options or {}
+    cache = options.get('normalised_questions_cache')
+    if cache is None:
+        normalise_questions(version_data, context, options, walk)
+        return
+
+    key = (
+        questions_digest, options.get('questions_context_fingerprint') or get_context_fingerprint(context),
+        bool(options.get('compact_port_enum')),
     )
-    for question in version_data['schema']['questions']:
-        normalise_question(question, version_data, context)
-    version_data['required_features'] = list(version_data['required_features'])
+    cached = cache.get(key)
+    if cached is not None:
+        schema, required_features = cached
+        # Each version gets its own copy so that callers modifying it do not affect other versions
+        version_data.update({'schema': pickle.loads(schema), 'required_features': list(required_features)})
+        return
+
+    normalise_questions(version_data, context, options, walk)
+    cache.add(key, pickle.dumps(version_data['schema']), list(version_data['required_features']))
+
+
+def get_required_features(questions_data: dict, walk: typing.Optional[QuestionsWalk] = None) -> list:
+    # Returns features normalise_questions would have marked as required without normalising questions
+    required_features = set((walk or get_questions_walk(questions_data['questions'])).features)
+    if questions_data.get(CUSTOM_PORTALS_ENABLE_KEY):
+        required_features.update(
+            get_questions_walk([get_custom_portal_question(questions_data[CUSTOM_PORTAL_GROUP_KEY])]).features
+        )
+    return list(required_features)
 
 
-def normalise_question(question: dict, version_data: dict, context: dict) -> None:
-    schema = question['schema']
-    for attr in itertools.chain(*[schema.get(k, []) for k in ('attrs', 'items', 'subquestions')]):
-        normalise_question(attr, version_data, context)
+def normalise_question(
+    question: dict, version_data: dict, context: dict, options: typing.Optional[dict] = None
+) -> None:
+    walk = get_questions_walk([question], 'question')
+    normalise_walked_questions(walk, context, options)
+    version_data['required_features'].update(walk.features)
 
+
+def normalise_question_schema(schema: dict, context: dict, options: dict) -> None:
     if '$ref' not in schema:
         return
 
     data = {}
     for ref in schema['$ref']:
-        version_data['required_features'].add(ref)
         if ref == 'definitions/interface':
             data['enum'] = [
                 {'value': i, 'description': f'{i!r} Interface'} for i in context['nic_choices']
@@ -153,13 +252,25 @@ def normalise_question(question: dict, version_data: dict, context: dict) -> Non
             ]
         elif ref == 'definitions/port':
             data['enum'] = [{'value': None, 'description': 'No Port Selected'}] if schema.get('null') else []
-            data['enum'] += [
-                {'value': i, 'description': f'{i!r} Port'}
-                for i in filter(
-                    lambda p: schema.get('min', 9000) <= p <= schema.get('max', 65534),
-                    context['unused_ports']
-                )
-            ]
+            if options.get('compact_port_enum'):
+                # Instead of adding an enum entry for each unused port, we specify the range of ports and the
+                # ports in that range which are already in use. Consumers can use expand_port_enum to get the
+                # complete enum when/if they need it
+                start, end = schema.get('min', 9000), schema.get('max', 65534)
+                unused_ports = set(context['unused_ports'])
+                data[PORT_ENUM_RANGE_KEY] = {
+                    'start': start,
+                    'end': end,
+                    'exclude': [p for p in range(start, end + 1) if p not in unused_ports],
+                }
+            else:
+                data['enum'] += [
+                    {'value': i, 'description': f'{i!r} Port'}
+                    for i in filter(
+                        lambda p: schema.get('min', 9000) <= p <= schema.get('max', 65534),
+                        context['unused_ports']
+                    )
+                ]
         elif ref == 'normalize/acl':
             data['attrs'] = ACL_QUESTION
         elif ref == 'normalize/ixVolume':
@@ -184,3 +295,17 @@ def get_cert_ca_options(schema: dict, data: dict, default_entry: dict):
             'enum': [],
             'required': True,
         })
+
+
+def expand_port_enum(schema: dict) -> typing.Iterator[dict]:
+    # Lazily yields enum entries of a port schema which was normalised with compact_port_enum option
+    # in the same format they would have been added to the schema otherwise
+    yield from schema.get('enum') or []
+    if PORT_ENUM_RANGE_KEY not in schema:
+        return
+
+    port_range = schema[PORT_ENUM_RANGE_KEY]
+    exclude = set(port_range['exclude'])
+    for port in range(port_range['start'], port_range['end'] + 1):
+        if port not in exclude:
+            yield {'value': port, 'description': f'{port!r} Port'}
@@ -0,0 +1,169 @@
+import typing
+
+
+QUESTION_CHILDREN_KEYS = ('attrs', 'items', 'subquestions')
+# Markers for entries of the walk stack
+ENTER, ENTER_CHILDREN, LEAVE = range(3)
+
+
+class QuestionsVisitor:
+
+    # Visitors are notified of each question of a questions tree as it is walked by walk_question().
+    # enter() is called before children of a question are walked and leave() once all of them have been walked.
+    # Children of a question are only walked (and leave() called) if enter() of all visitors returns True.
+    # enter_children() is called before each group of children (e.g attrs) of a question is walked.
+
+    def enter(self, question: dict, path: str, parent: typing.Optional[dict]) -> bool:
+        return True
+
+    def enter_children(self, question: dict, path: str, key: str, children: list) -> None:
+        pass
+
+    def leave(self, question: dict, path: str) -> None:
+        pass
+
+
+def get_question_children(question: dict) -> typing.Iterator[typing.Tuple[str, list]]:
+    schema = question['schema']
+    for key in QUESTION_CHILDREN_KEYS:
+        yield key, schema.get(key) or []
+
+
+def walk_question(
+    question: dict, path: str, visitors: typing.List[QuestionsVisitor],
+    get_children: typing.Callable[[dict], typing.Iterable[typing.Tuple[str, list]]] = get_question_children,
+) -> None:
+    # Walks question and its children depth first, get_children returns (key, children) for each group of
+    # children of a question. Children are walked with path `{path}.schema.{key}.{index}`.
+    # This is iterative as question trees (e.g acl/ixVolume questions) can be deeply nested.
+    stack = [(ENTER, question, path, None)]
+    while stack:
+        action, question, path, extra = stack.pop()
+        if action == LEAVE:
+            for visitor in visitors:
+                visitor.leave(question, path)
+            continue
+        elif action == ENTER_CHILDREN:
+            for visitor in visitors:
+                visitor.enter_children(question, path, *extra)
+            continue
+
+        if not all([visitor.enter(question, path, extra) for visitor in visitors]):
+            continue
+
+        stack.append((LEAVE, question, path, None))
+        for key, children in reversed(list(get_children(question))):
+            stack.extend(
+                (ENTER, child, f'{path}.schema.{key}.{index}', question)
+                for index, child in reversed(list(enumerate(children)))
+            )
+            stack.append((ENTER_CHILDREN, question, path, (key, children)))
+
+
+def walk_questions(
+    questions: list, path: str, visitors: typing.List[QuestionsVisitor],
+    get_children: typing.Callable[[dict], typing.Iterable[typing.Tuple[str, list]]] = get_question_children,
+) -> None:
+    for index, question in enumerate(questions):
+        walk_question(question, f'{path}.{index}', visitors, get_children)
+
+
+def get_duplicate_variables(questions: list) -> typing.List[typing.Tuple[str, typing.Any]]:
+    # Returns (path relative to questions, variable) of questions and their subquestions which use a variable name
+    # already used by another one of them. Subquestions of a question which is itself a duplicate are not checked.
+    # Variable names which cannot be hashed (e.g lists) are reported when the question itself is validated,
+    # till then they are kept in a list so that duplicates are still reported like any other name
+    variables = set()
+    unhashable_variables = []
+    duplicates = []
+
+    def is_used(variable):
+        try:
+            return variable in variables
+        except TypeError:
+            return variable in unhashable_variables
+
+    def add(variable):
+        try:
+            variables.add(variable)
+        except TypeError:
+            unhashable_variables.append(variable)
+
+    for index, question in enumerate(questions):
+        if not isinstance(question, dict) or 'variable' not in question:
+            continue
+        if is_used(question['variable']):
+            duplicates.append((str(index), question['variable']))
+            continue
+
+        add(question['variable'])
+        sub_questions = question.get('subquestions')
+        for sub_index, sub_question in enumerate(sub_questions if isinstance(sub_questions, list) else []):
+            if not isinstance(sub_question, dict) or 'variable' not in sub_question:
+                continue
+            if is_used(sub_question['variable']):
+                duplicates.append((f'{index}.subquestions.{sub_index}', sub_question['variable']))
+            else:
+                add(sub_question['variable'])
+
+    return duplicates
+
+
+class QuestionsWalk(QuestionsVisitor):
+
+    # Collects everything validation and normalisation of a questions tree need from it, so that the tree is only
+    # walked once and both of them use what has been collected:
+    # duplicates - duplicate variables of each group of siblings keyed by path of the group i.e `questions` or
+    #   `{path}.schema.{key}` for children of a question
+    # groups - groups of top level questions keyed by their path
+    # features - features referenced by questions with $ref
+    # show_if - show_if filters keyed by path of the question
+    # schemas - schemas of questions in the order they were left i.e children come before their parents
+    # Children are walked regardless of type of their question, so validators decide which of them to validate.
+
+    def __init__(self):
+        self.duplicates = {}
+        self.groups = {}
+        self.features = set()
+        self.show_if = {}
+        self.schemas = []
+
+    def add_questions(self, questions: list, path: str) -> typing.List[typing.Tuple[str, typing.Any]]:
+        # Top level questions are siblings of each other without having a parent question
+        self.duplicates[path] = get_duplicate_variables(questions)
+        for index, question in enumerate(questions):
+            if isinstance(question, dict) and question.get('group'):
+                self.groups[f'{path}.{index}'] = question['group']
+        return self.duplicates[path]
+
+    def enter(self, question: dict, path: str, parent: typing.Optional[dict]) -> bool:
+        if not isinstance(question, dict) or not isinstance(question.get('schema'), dict):
+            return False
+
+        schema = question['schema']
+
+        if isinstance(schema.get('$ref'), list):
+            self.features.update(filter(lambda ref: isinstance(ref, str), schema['$ref']))
+        if 'show_if' in schema:
+            self.show_if[path] = schema['show_if']
+        return True
+
+    def enter_children(self, question: dict, path: str, key: str, children: list) -> None:
+        self.duplicates[f'{path}.schema.{key}'] = get_duplicate_variables(children)
+
+    def leave(self, question: dict, path: str) -> None:
+        self.schemas.append(question['schema'])
+
+    @staticmethod
+    def get_children(question: dict) -> typing.Iterator[typing.Tuple[str, list]]:
+        schema = question['schema']
+        for key in ('subquestions', 'items', 'attrs'):
+            if isinstance(schema.get(key), list):
+                yield key, schema[key]
+
+
+def get_questions_walk(questions: list, path: str = 'questions') -> QuestionsWalk:
+    walk = QuestionsWalk()
+    walk.add_questions(questions, path)
+    walk_questions(questions, path, [walk], walk.get_children)
+    return walk
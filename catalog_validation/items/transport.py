@@ -0,0 +1,63 @@
+import pickle
+import typing
+
+from multiprocessing import resource_tracker, shared_memory
+
+from catalog_validation.profiling import timed
+
+
+# How details of an item are sent from worker processes to the parent process:
+# pickle - item details are returned as is and are pickled/unpickled by the executor
+# blob - worker serialises item details to a single compact blob and parent decodes it when it consumes the item
+# shared_memory - same as blob, however the blob is placed in shared memory and only its name is sent to the parent
+PICKLE_TRANSPORT = 'pickle'
+BLOB_TRANSPORT = 'blob'
+SHARED_MEMORY_TRANSPORT = 'shared_memory'
+TRANSPORTS = (PICKLE_TRANSPORT, BLOB_TRANSPORT, SHARED_MEMORY_TRANSPORT)
+
+
+def encode(data: typing.Any, transport: str) -> typing.Any:
+    if transport == PICKLE_TRANSPORT:
+        return data
+
+    with timed('encode'):
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        if transport == BLOB_TRANSPORT:
+            return blob
+
+        shm = shared_memory.SharedMemory(create=True, size=max(len(blob), 1))
+        # Segment is unlinked by the process which decodes it, if the worker's resource tracker kept tracking it
+        # as well it would try unlinking it again (or before it has been decoded) once the worker exits
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        try:
+            shm.buf[:len(blob)] = blob
+        finally:
+            shm.close()
+        return shm.name, len(blob)
+
+
+def decode(data: typing.Any, transport: str) -> typing.Any:
+    if transport == PICKLE_TRANSPORT:
+        return data
+
+    with timed('decode'):
+        if transport == BLOB_TRANSPORT:
+            return pickle.loads(data)
+
+        name, size = data
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            return pickle.loads(shm.buf[:size])
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def release(data: typing.Any, transport: str) -> None:
+    # Frees resources held by encoded data which is not going to be decoded
+    if transport == SHARED_MEMORY_TRANSPORT:
+        decode(data, transport)
+
+
+def run_encoded(transport: str, func: typing.Callable, *args, **kwargs) -> typing.Any:
+    return encode(func(*args, **kwargs), transport)
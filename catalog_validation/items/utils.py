@@ -1,12 +1,14 @@
 import contextlib
 import os
+import re
 import subprocess
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
+from catalog_validation.profiling import profiled
 from catalog_validation.schema.migration_schema import MIGRATION_DIRS
-from catalog_validation.utils import VALID_TRAIN_REGEX
+from catalog_validation.utils import CATALOG_SHARDS_DIR, VALID_TRAIN_REGEX
 
 
 DEVELOPMENT_DIR = 'ix-dev'
@@ -20,7 +22,7 @@ RECOMMENDED_APPS_SCHEMA = {
         }
     },
 }
-TRAIN_IGNORE_DIRS = ['library', 'docs', DEVELOPMENT_DIR] + MIGRATION_DIRS
+TRAIN_IGNORE_DIRS = ['library', 'docs', DEVELOPMENT_DIR, CATALOG_SHARDS_DIR] + MIGRATION_DIRS
 
 
 ACL_QUESTION = [
@@ -224,7 +226,111 @@ def get_catalog_json_schema() -> dict:
     }
 
 
-def get_last_updated_date(repo_path: str, folder_path: str) -> Optional[str]:
+def get_changed_directories(files: Iterable[bytes]) -> set:
+    directories = set()
+    for file in files:
+        directory = os.path.dirname(os.fsdecode(file))
+        while directory and directory not in directories:
+            directories.add(directory)
+            directory = os.path.dirname(directory)
+    return directories
+
+
+def get_git_log_commits(repo_path: str) -> list:
+    # Returns (commit, timestamp, parents, directories changed against first parent) of each commit with
+    # children always coming before their parents
+    output = subprocess.check_output(
+        [
+            'git', 'log', '--topo-order', '--diff-merges=first-parent', '--name-only', '--no-renames', '--relative',
+            '-z', '--pretty=format:%x00%x00%H %ct %P',
+        ], cwd=repo_path, stderr=subprocess.DEVNULL,
+    )
+    # Each commit is prefixed with two NUL bytes and files are NUL terminated, as file names cannot be empty
+    # any run of two or more NUL bytes is where a commit starts
+    commits = []
+    for record in filter(bool, re.split(b'\0\0+', output)):
+        header, _, files = record.partition(b'\n')
+        commit, timestamp, *parents = header.decode().split()
+        commits.append((commit, int(timestamp), parents, get_changed_directories(filter(bool, files.split(b'\0')))))
+    return commits
+
+
+def get_merge_changed_directories(repo_path: str, merges: list) -> Dict[tuple, set]:
+    # Returns directories changed by each merge against each of its parents other than the first one
+    pairs = [(merge, parent) for merge, parents in merges for parent in parents[1:]]
+    if not pairs:
+        return {}
+
+    output = subprocess.check_output(
+        ['git', 'diff-tree', '--stdin', '-r', '--name-only', '--no-renames', '--relative', '-z', '--always'],
+        cwd=repo_path, stderr=subprocess.DEVNULL,
+        input=''.join(f'{parent} {merge}\n' for merge, parent in pairs).encode(),
+    )
+    # For each "<parent> <merge>" line, parent is printed followed by files it differs in from merge
+    changed_files = {pair: [] for pair in pairs}
+    index = -1
+    for entry in filter(bool, output.split(b'\0')):
+        if index + 1 < len(pairs) and entry == pairs[index + 1][1].encode():
+            index += 1
+        else:
+            changed_files[pairs[index]].append(entry)
+    return {pair: get_changed_directories(files) for pair, files in changed_files.items()}
+
+
+@profiled('git')
+def get_last_updated_dates(repo_path: str) -> Optional[Dict[str, int]]:
+    # Index of last commit timestamp for each directory in the repo, built from a single git log pass and a
+    # single git diff-tree for changes of merges against their other parents.
+    # "git log -n 1 <folder>" follows a single line of history for each folder, at a merge it only follows
+    # the first parent the merge has not changed the folder against and it reports the merge itself if the
+    # folder has been changed against all parents. We follow the same line of history for all folders at once
+    # walking commits from newest to oldest. Renames are reported as delete + add (--no-renames) as they
+    # change both folders.
+    with contextlib.suppress(Exception):
+        commits = get_git_log_commits(repo_path)
+        merge_changes = get_merge_changed_directories(
+            repo_path, [(commit, parents) for commit, _, parents, _ in commits if len(parents) > 1]
+        )
+        last_updated_dates = {}
+        # Folders whose line of history is currently at the commit, all folders start at the newest commit
+        pending = {commits[0][0]: set().union(*(c[3] for c in commits))} if commits else {}
+
+        def follow(commit, directories):
+            # Line of history of different folders can meet at a commit, smaller set is merged into the larger one
+            if commit in pending:
+                smaller, directories = sorted((pending[commit], directories), key=len)
+                directories.update(smaller)
+            pending[commit] = directories
+
+        for commit, timestamp, parents, changed in commits:
+            directories = pending.pop(commit, None)
+            if not directories:
+                continue
+
+            changed = {d for d in changed if d in directories}
+            directories.difference_update(changed)
+            if parents:
+                follow(parents[0], directories)
+            for parent in parents[1:]:
+                parent_changed = merge_changes[(commit, parent)]
+                follow(parent, {d for d in changed if d not in parent_changed})
+                changed.intersection_update(parent_changed)
+
+            last_updated_dates.update((d, timestamp) for d in changed)
+
+        return last_updated_dates
+
+
+@profiled('git')
+def get_last_updated_date(
+    repo_path: str, folder_path: str, last_updated_dates: Optional[Dict[str, int]] = None
+) -> Optional[str]:
+    if last_updated_dates is not None:
+        relative_path = os.path.relpath(folder_path, repo_path)
+        if relative_path.split(os.sep, 1)[0] != os.pardir:
+            timestamp = last_updated_dates.get(relative_path)
+            return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else None
+
     with contextlib.suppress(Exception):
         # We don't want to fail querying items if for whatever reason this fails
         output = subprocess.check_output(
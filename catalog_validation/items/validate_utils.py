@@ -1,9 +1,14 @@
+import typing
+
+from catalog_validation.documents import DocumentLoader
 from catalog_validation.validation import validate_catalog_item, validate_catalog_item_version
 
 
-def validate_item(path: str, schema: str, validate_versions: bool = True):
-    validate_catalog_item(path, schema, validate_versions)
+def validate_item(
+    path: str, schema: str, validate_versions: bool = True, documents: typing.Optional[DocumentLoader] = None
+):
+    validate_catalog_item(path, schema, validate_versions, documents=documents)
 
 
-def validate_item_version(path: str, schema: str):
-    validate_catalog_item_version(path, schema)
+def validate_item_version(path: str, schema: str, documents: typing.Optional[DocumentLoader] = None):
+    validate_catalog_item_version(path, schema, documents=documents)
@@ -0,0 +1,81 @@
+import collections
+import contextlib
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import typing
+
+import markdown
+
+from .profiling import timed
+
+
+# Rendered documents are keyed by hash of their content, so identical documents (e.g README.md of different
+# versions of an app) are only rendered once. Least recently used documents are evicted once we have more
+# than MARKDOWN_CACHE_SIZE rendered documents in memory.
+MARKDOWN_CACHE_SIZE = 512
+RENDERED_MARKDOWN = collections.OrderedDict()
+RENDERED_MARKDOWN_LOCK = threading.Lock()
+
+
+def get_markdown_cache_key(content: str) -> str:
+    # Rendered html depends on the version of markdown as well
+    return hashlib.sha256(f'{markdown.__version__}\0{content}'.encode()).hexdigest()
+
+
+def get_markdown_cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], f'{key}.html')
+
+
+def get_cached_markdown(cache_dir: str, key: str) -> typing.Optional[str]:
+    with contextlib.suppress(OSError):
+        with open(get_markdown_cache_path(cache_dir, key), 'r') as f:
+            return f.read()
+
+
+def cache_markdown(cache_dir: str, key: str, rendered: str) -> None:
+    cache_path = get_markdown_cache_path(cache_dir, key)
+    # We do not want to fail if for whatever reason we are not able to cache the rendered document. File is
+    # written to a temporary file first so that concurrent readers never see a partially written file.
+    with contextlib.suppress(OSError):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        f = tempfile.NamedTemporaryFile('w', dir=os.path.dirname(cache_path), delete=False)
+        try:
+            with f:
+                f.write(rendered)
+            # Temporary files are only readable by their owner, whereas cached documents should be readable by all
+            os.chmod(f.name, 0o644)
+            os.replace(f.name, cache_path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.unlink(f.name)
+            raise
+
+
+def render_markdown(content: str, cache_dir: typing.Optional[str] = None) -> str:
+    key = get_markdown_cache_key(content)
+    with RENDERED_MARKDOWN_LOCK:
+        if key in RENDERED_MARKDOWN:
+            RENDERED_MARKDOWN.move_to_end(key)
+            return RENDERED_MARKDOWN[key]
+
+    rendered = get_cached_markdown(cache_dir, key) if cache_dir else None
+    if rendered is None:
+        with timed('markdown'):
+            rendered = markdown.markdown(content)
+        if cache_dir:
+            cache_markdown(cache_dir, key, rendered)
+
+    with RENDERED_MARKDOWN_LOCK:
+        RENDERED_MARKDOWN[key] = rendered
+        if len(RENDERED_MARKDOWN) > MARKDOWN_CACHE_SIZE:
+            RENDERED_MARKDOWN.popitem(last=False)
+    return rendered
+
+
+@functools.cache
+def get_markdown_renderer(cache_dir: typing.Optional[str] = None) -> typing.Callable[[str], str]:
+    # Same renderer is returned for the same cache dir so that it can be used as a parser with DocumentLoader
+    return functools.partial(render_markdown, cache_dir=cache_dir) if cache_dir else render_markdown
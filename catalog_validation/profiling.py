@@ -0,0 +1,138 @@
+import argparse
+import contextlib
+import functools
+import json
+import time
+import typing
+
+from collections import defaultdict
+
+
+# Profile of the current process, profiling is disabled when this is None so that timing hooks cost next to nothing
+PROFILE = None
+
+
+class Profile:
+
+    # Keeps track of total time spent and number of calls of each phase and time taken by each item along with
+    # its phases. Phases can be nested, so time of a phase includes time of phases it contains.
+    # Counters keep track of other quantities, e.g bytes sent to worker processes.
+
+    def __init__(self):
+        self.phases = defaultdict(lambda: [0.0, 0])
+        self.counters = defaultdict(int)
+        self.items = {}
+        self.start = time.perf_counter()
+
+    def add_phase(self, phase: str, elapsed: float, count: int = 1) -> None:
+        self.phases[phase][0] += elapsed
+        self.phases[phase][1] += count
+
+    def add_counter(self, counter: str, value: int) -> None:
+        self.counters[counter] += value
+
+    def merge_phases(self, phases: dict) -> None:
+        for phase, (elapsed, count) in phases.items():
+            self.add_phase(phase, elapsed, count)
+
+    def add_item(self, name: str, elapsed: float, phases: dict) -> None:
+        # Timings of workers are aggregated here, an item can have multiple tasks (e.g validating its versions)
+        self.merge_phases(phases)
+        item = self.items.setdefault(name, {'total': 0.0, 'phases': defaultdict(float)})
+        item['total'] += elapsed
+        for phase, (phase_elapsed, count) in phases.items():
+            item['phases'][phase] += phase_elapsed
+
+    def report(self, slowest: int = 10) -> dict:
+        return {
+            'total': time.perf_counter() - self.start,
+            'phases': {
+                phase: {'total': elapsed, 'count': count}
+                for phase, (elapsed, count) in sorted(self.phases.items(), key=lambda p: p[1][0], reverse=True)
+            },
+            'counters': dict(self.counters),
+            'slowest_items': [
+                {'name': name, 'total': item['total'], 'phases': dict(item['phases'])}
+                for name, item in sorted(self.items.items(), key=lambda i: i[1]['total'], reverse=True)[:slowest]
+            ],
+        }
+
+    def print_report(self, slowest: int = 10) -> None:
+        report = self.report(slowest)
+        print(f'Total time: {report["total"]:.3f}s')
+        print(f'{"Phase":<40}{"Total (s)":>12}{"Calls":>10}')
+        for phase, timing in report['phases'].items():
+            print(f'{phase:<40}{timing["total"]:>12.3f}{timing["count"]:>10}')
+
+        for counter, value in report['counters'].items():
+            print(f'{counter:<40}{value:>12}')
+
+        print(f'\nSlowest {len(report["slowest_items"])} item(s)')
+        for item in report['slowest_items']:
+            phases = ', '.join(
+                f'{phase}: {elapsed:.3f}s'
+                for phase, elapsed in sorted(item['phases'].items(), key=lambda p: p[1], reverse=True)
+            )
+            print(f'{item["name"]:<40}{item["total"]:>12.3f}s\t{phases}')
+
+    def write_report(self, path: str, slowest: int = 10) -> None:
+        with open(path, 'w') as f:
+            f.write(json.dumps(self.report(slowest), indent=4))
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--profile', action='store_true', help='Report time spent in each phase and by each item')
+    parser.add_argument(
+        '--profile-output', help='Write profile report as json to specified file instead of printing it'
+    )
+    parser.add_argument('--profile-slowest', type=int, default=10, help='Number of slowest items to report')
+
+
+def report_profile(args: argparse.Namespace) -> None:
+    profile = stop_profiling()
+    if profile is None:
+        return
+    if args.profile_output:
+        profile.write_report(args.profile_output, args.profile_slowest)
+    else:
+        profile.print_report(args.profile_slowest)
+
+
+def start_profiling() -> Profile:
+    global PROFILE
+    PROFILE = Profile()
+    return PROFILE
+
+
+def stop_profiling() -> typing.Optional[Profile]:
+    global PROFILE
+    profile, PROFILE = PROFILE, None
+    return profile
+
+
+def get_profile() -> typing.Optional[Profile]:
+    return PROFILE
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> typing.Iterator[None]:
+    if PROFILE is None:
+        yield
+        return
+
+    profile = PROFILE
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(phase, time.perf_counter() - start)
+
+
+def profiled(phase: str) -> typing.Callable:
+    def decorator(func: typing.Callable) -> typing.Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
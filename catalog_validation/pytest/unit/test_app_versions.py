@@ -0,0 +1,114 @@
+import copy
+import pytest
+
+from catalog_validation.exceptions import ValidationErrors
+from catalog_validation.items.app_versions import (
+    deduplicate_versions, get_versions, is_deduplicated, LazyVersions, resolve_versions,
+)
+from catalog_validation.validation import validate_catalog_item_version_data
+
+
+def get_version(version, readme='<h1>Chia</h1>'):
+    return {
+        'healthy': True,
+        'supported': True,
+        'healthy_error': None,
+        'location': f'/mnt/catalog/charts/chia/{version}',
+        'last_update': '2023-10-10 10:10:10',
+        'required_features': ['definitions/timezone'],
+        'human_version': f'1.0.0_{version}',
+        'version': version,
+        'chart_metadata': {'name': 'chia', 'version': version, 'appVersion': '1.0.0'},
+        'app_metadata': None,
+        'schema': {
+            'groups': [{'name': 'Chia', 'description': 'Chia configuration'}],
+            'questions': [{'variable': 'timezone', 'schema': {'type': 'string'}}],
+        },
+        'app_readme': readme,
+        'detailed_readme': readme,
+        'changelog': None,
+    }
+
+
+VERSIONS = {
+    '1.0.2': get_version('1.0.2', '<h1>Chia 2</h1>'),
+    '1.0.1': get_version('1.0.1'),
+    '1.0.0': get_version('1.0.0'),
+}
+
+
+def test_deduplicate_versions():
+    deduplicated = deduplicate_versions(VERSIONS)
+    assert is_deduplicated(deduplicated)
+    assert not is_deduplicated(VERSIONS)
+    # schema and readmes are shared between versions, chart metadata differs for each version
+    assert len(deduplicated['blobs']) == 6
+    assert deduplicated['versions']['1.0.1']['schema'] == deduplicated['versions']['1.0.0']['schema']
+    assert deduplicated['versions']['1.0.1']['changelog'] is None
+    assert resolve_versions(deduplicated) == VERSIONS
+
+
+def test_get_versions():
+    versions = get_versions(deduplicate_versions(VERSIONS))
+    assert isinstance(versions, LazyVersions)
+    assert list(versions) == list(VERSIONS)
+    assert versions['1.0.1']['schema'] == VERSIONS['1.0.1']['schema']
+    assert versions['1.0.1'].get('app_readme') == '<h1>Chia</h1>'
+    assert get_versions(VERSIONS) is VERSIONS
+
+
+def remove_blob(versions_data):
+    versions_data['blobs'].popitem()
+
+
+def add_ref_key(versions_data):
+    versions_data['versions']['1.0.0']['schema']['digest'] = 'abc'
+
+
+def remove_version_key(versions_data):
+    versions_data['versions']['1.0.0'].pop('healthy')
+
+
+def invalidate_blob(versions_data):
+    versions_data['blobs'][versions_data['versions']['1.0.0']['schema']['$blob']] = {'questions': []}
+
+
+@pytest.mark.parametrize('mutate,error', [
+    (None, None),
+    (remove_blob, 'blob does not exist'),
+    (add_ref_key, 'Additional properties are not allowed'),
+    (remove_version_key, "'healthy' is a required property"),
+    (invalidate_blob, "'groups' is a required property"),
+])
+def test_validate_deduplicated_version_data(mutate, error):
+    versions_data = copy.deepcopy(deduplicate_versions(VERSIONS))
+    if mutate:
+        mutate(versions_data)
+
+    verrors = validate_catalog_item_version_data(versions_data, 'chia', ValidationErrors())
+    if error:
+        assert error in verrors.errors[0].errmsg
+    else:
+        assert not verrors.errors
+
+
+@pytest.mark.parametrize('versions_data,valid', [
+    (VERSIONS, True),
+    ({**VERSIONS, '1.0.3': {**VERSIONS['1.0.0'], 'schema': {'$blob': '0' * 64}}}, False),
+    ({'format_version': 1, 'versions': VERSIONS, 'blobs': {}}, False),
+])
+def test_validate_inline_version_data(versions_data, valid):
+    verrors = validate_catalog_item_version_data(versions_data, 'chia', ValidationErrors())
+    assert bool(verrors.errors) is not valid
+
+
+def test_validate_inline_version_data_error():
+    versions_data = copy.deepcopy(VERSIONS)
+    versions_data['1.0.0'].pop('healthy')
+    verrors = validate_catalog_item_version_data(versions_data, 'chia', ValidationErrors())
+    # Errors of inline versions must not refer to the schema of deduplicated versions
+    assert verrors.errors[0].errmsg.startswith(
+        "Invalid format specified for application versions: 'healthy' is a required property"
+    )
+    assert "schema['else']" not in verrors.errors[0].errmsg
+    assert "schema['patternProperties']" in verrors.errors[0].errmsg
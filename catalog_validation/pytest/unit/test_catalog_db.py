@@ -0,0 +1,116 @@
+import os
+import pytest
+
+from catalog_validation.items.catalog import (
+    get_items_in_category, get_items_supported_on_scale_version, get_latest_healthy_version,
+)
+from catalog_validation.items.catalog_db import CatalogDatabaseWriter, get_scale_version_key
+
+
+def get_version(healthy=True, min_scale_version=None, max_scale_version=None, required_features=None):
+    annotations = {
+        k: v for k, v in (('min_scale_version', min_scale_version), ('max_scale_version', max_scale_version)) if v
+    }
+    return {
+        'healthy': healthy,
+        'supported': healthy,
+        'healthy_error': None if healthy else 'Missing questions.yaml',
+        'human_version': '1.0.0',
+        'location': '/mnt/catalog/charts/chia',
+        'last_update': '2023-10-10 10:10:10',
+        'required_features': required_features or [],
+        'chart_metadata': {'appVersion': '1.0.0', 'annotations': annotations},
+    }
+
+
+def get_item_data(categories):
+    return {
+        'healthy': True,
+        'categories': categories,
+        'tags': ['blockchain'],
+        'title': 'Chia',
+        'latest_version': '1.0.2',
+        'home': 'https://www.chia.net',
+    }
+
+
+@pytest.fixture(params=['catalog', 'catalog?#%20'])
+def catalog(tmpdir, request):
+    location = os.path.join(tmpdir, request.param)
+    os.makedirs(location)
+    with CatalogDatabaseWriter(location) as db:
+        db.add_item('charts', 'chia', get_item_data(['storage', 'crypto']), {
+            '1.0.2': get_version(min_scale_version='24.04', required_features=['definitions/timezone']),
+            '1.0.1': get_version(max_scale_version='23.10.2'),
+            '1.0.0': get_version(),
+        })
+        db.add_item('charts', 'minio', get_item_data(['storage']), {
+            '2.0.1': get_version(healthy=False),
+            '2.0.0': get_version(min_scale_version='23.10', max_scale_version='24.04'),
+        })
+        db.add_item('community', 'plex', get_item_data(['media']), {'1.0.0': get_version(healthy=False)})
+        db.commit()
+    return location
+
+
+@pytest.mark.parametrize('version,key', [
+    ('24.04', '0024.0004'),
+    ('24.04.1', '0024.0004.0001'),
+    ('TrueNAS-SCALE-23.10-MASTER-20230810', '0023.0010'),
+    ('master', None),
+    (None, None),
+])
+def test_get_scale_version_key(version, key):
+    assert get_scale_version_key(version) == key
+
+
+def test_scale_version_keys_order():
+    versions = ['22.12', '24.04.1', '23.10.2', '24.10', '24.04']
+    assert sorted(versions, key=get_scale_version_key) == ['22.12', '23.10.2', '24.04', '24.04.1', '24.10']
+
+
+def test_catalog_db_temporary_file_removed(catalog):
+    assert os.listdir(catalog) == ['catalog.db']
+
+
+@pytest.mark.parametrize('train,item,version', [
+    ('charts', 'chia', '1.0.2'),
+    ('charts', 'minio', '2.0.0'),
+    ('community', 'plex', None),
+    ('charts', 'plex', None),
+])
+def test_get_latest_healthy_version(catalog, train, item, version):
+    result = get_latest_healthy_version(catalog, train, item)
+    assert (result['version'] if result else None) == version
+
+
+def test_get_latest_healthy_version_details(catalog):
+    result = get_latest_healthy_version(catalog, 'charts', 'chia')
+    assert result['min_scale_version'] == '24.04'
+    assert result['required_features'] == ['definitions/timezone']
+
+
+@pytest.mark.parametrize('category,items', [
+    ('storage', [('charts', 'chia'), ('charts', 'minio')]),
+    ('media', [('community', 'plex')]),
+    ('games', []),
+])
+def test_get_items_in_category(catalog, category, items):
+    assert [(i['train'], i['name']) for i in get_items_in_category(catalog, category)] == items
+
+
+@pytest.mark.parametrize('scale_version,versions', [
+    ('23.10', [('charts', 'chia', '1.0.1'), ('charts', 'minio', '2.0.0')]),
+    ('23.10.3', [('charts', 'chia', '1.0.0'), ('charts', 'minio', '2.0.0')]),
+    ('24.04', [('charts', 'chia', '1.0.2'), ('charts', 'minio', '2.0.0')]),
+    ('24.10', [('charts', 'chia', '1.0.2')]),
+])
+def test_get_items_supported_on_scale_version(catalog, scale_version, versions):
+    assert [
+        (i['train'], i['name'], i['version']) for i in get_items_supported_on_scale_version(catalog, scale_version)
+    ] == versions
+
+
+def test_get_items_supported_on_invalid_scale_version(catalog):
+    with pytest.raises(ValueError):
+        get_items_supported_on_scale_version(catalog, 'master')
@@ -0,0 +1,80 @@
+import json
+import os
+import pytest
+
+from catalog_validation.items.catalog_shards import get_catalog_manifest, load_catalog_trains
+from catalog_validation.items.catalog_writer import CatalogWriter
+
+
+CATALOG_DATA = {
+    'charts': {
+        'chia': {'name': 'chia', 'categories': ['storage'], 'healthy': True},
+        'plex': {'name': 'plex', 'app_readme': '<h1>Plex</h1>\n<p>"quoted"</p>', 'icon_url': None},
+    },
+    'test': {},
+    'community': {'minio': {'name': 'minio', 'tags': [], 'recommended': False}},
+}
+
+
+def write_catalog(location, catalog_data, shards=True):
+    with CatalogWriter(location, {train: list(items) for train, items in catalog_data.items()}, shards) as writer:
+        for train, items in catalog_data.items():
+            for item, item_data in items.items():
+                writer.add_item(train, item, item_data)
+        writer.commit()
+
+
+@pytest.mark.parametrize('trains,expected', [
+    (None, CATALOG_DATA),
+    (['community'], {'community': CATALOG_DATA['community']}),
+    (['test', 'charts'], {'charts': CATALOG_DATA['charts'], 'test': {}}),
+    (['enterprise'], {}),
+])
+@pytest.mark.parametrize('shards', [True, False])
+def test_load_catalog_trains(tmpdir, trains, expected, shards):
+    write_catalog(str(tmpdir), CATALOG_DATA, shards)
+    assert load_catalog_trains(str(tmpdir), trains) == expected
+
+
+def test_catalog_shards_written(tmpdir):
+    write_catalog(str(tmpdir), CATALOG_DATA)
+    manifest = get_catalog_manifest(str(tmpdir))
+    assert list(manifest['trains']) == list(CATALOG_DATA)
+    for train, shard in manifest['trains'].items():
+        with open(os.path.join(tmpdir, shard['path']), 'r') as f:
+            contents = f.read()
+        assert contents == json.dumps({train: CATALOG_DATA[train]}, indent=4)
+        assert shard['size'] == len(contents.encode())
+
+
+def test_load_catalog_trains_only_reads_requested_shards(tmpdir):
+    write_catalog(str(tmpdir), CATALOG_DATA)
+    os.unlink(os.path.join(tmpdir, get_catalog_manifest(str(tmpdir))['trains']['charts']['path']))
+    assert load_catalog_trains(str(tmpdir), ['community']) == {'community': CATALOG_DATA['community']}
+
+
+def test_load_catalog_trains_shard_mismatch(tmpdir):
+    write_catalog(str(tmpdir), CATALOG_DATA)
+    with open(os.path.join(tmpdir, get_catalog_manifest(str(tmpdir))['trains']['community']['path']), 'w') as f:
+        f.write(json.dumps({'community': {}}))
+
+    with pytest.raises(ValueError):
+        load_catalog_trains(str(tmpdir), ['community'])
+    assert load_catalog_trains(str(tmpdir), ['community'], verify=False) == {'community': {}}
+
+
+def test_stale_shards_removed(tmpdir):
+    write_catalog(str(tmpdir), CATALOG_DATA)
+    write_catalog(str(tmpdir), {'charts': CATALOG_DATA['charts']})
+    assert list(get_catalog_manifest(str(tmpdir))['trains']) == ['charts']
+    assert os.listdir(os.path.join(tmpdir, 'catalog_trains')) == ['charts.json']
+    assert load_catalog_trains(str(tmpdir)) == {'charts': CATALOG_DATA['charts']}
+
+
+def test_shards_removed_when_not_written(tmpdir):
+    write_catalog(str(tmpdir), CATALOG_DATA)
+    catalog_data = {**CATALOG_DATA, 'charts': {'chia': {'name': 'chia', 'healthy': False}}}
+    write_catalog(str(tmpdir), catalog_data, shards=False)
+    assert get_catalog_manifest(str(tmpdir)) is None
+    assert not os.path.exists(os.path.join(tmpdir, 'catalog_trains'))
+    assert load_catalog_trains(str(tmpdir), ['charts']) == {'charts': catalog_data['charts']}
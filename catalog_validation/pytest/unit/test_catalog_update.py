@@ -0,0 +1,74 @@
+import json
+import os
+import pytest
+import shutil
+import subprocess
+
+from datetime import datetime
+
+from catalog_validation.benchmarks.catalog_generator import CatalogOptions, generate_catalog
+from catalog_validation.scripts.catalog_update import update_catalog_file
+
+
+@pytest.fixture
+def catalog(tmpdir):
+    generate_catalog(str(tmpdir), CatalogOptions(trains=1, apps=2, versions=1, questions=2, depth=1, breadth=1))
+    return str(tmpdir)
+
+
+def test_update_catalog_file_removes_stale_outputs(catalog):
+    update_catalog_file(catalog, jobs=1, sqlite=True, shards=True)
+    assert {'catalog.json', 'catalog.db', 'catalog_manifest.json', 'catalog_trains'} <= set(os.listdir(catalog))
+
+    update_catalog_file(catalog, jobs=1)
+    files = set(os.listdir(catalog))
+    assert 'catalog.json' in files
+    assert not files & {'catalog.db', 'catalog_manifest.json', 'catalog_trains'}
+
+
+def git_commit(location, timestamp):
+    env = {
+        **os.environ, 'GIT_AUTHOR_NAME': 'test', 'GIT_AUTHOR_EMAIL': 'test@ixsystems.com',
+        'GIT_COMMITTER_NAME': 'test', 'GIT_COMMITTER_EMAIL': 'test@ixsystems.com',
+        'GIT_AUTHOR_DATE': f'{timestamp} +0000', 'GIT_COMMITTER_DATE': f'{timestamp} +0000',
+    }
+    for cmd in (['git', 'add', '-A'], ['git', 'commit', '-q', '-m', str(timestamp)]):
+        subprocess.run(cmd, cwd=location, env=env, check=True, capture_output=True)
+
+
+def read_catalog_files(location):
+    files = {}
+    for root, dirs, filenames in os.walk(location):
+        dirs[:] = [d for d in dirs if d != '.git']
+        for filename in filter(lambda f: f in ('catalog.json', 'app_versions.json'), filenames):
+            with open(os.path.join(root, filename), 'r') as f:
+                files[os.path.relpath(os.path.join(root, filename), location)] = json.loads(f.read())
+    return files
+
+
+@pytest.mark.parametrize('changed_apps', [['app0', 'app1'], []])
+def test_update_catalog_file_changed_since_matches_full_update(tmpdir, capsys, changed_apps):
+    catalog = os.path.join(tmpdir, 'catalog')
+    generate_catalog(catalog, CatalogOptions(trains=1, apps=3, versions=2, questions=2, depth=1, breadth=1))
+    update_catalog_file(catalog, jobs=1)
+    git_commit(catalog, 1700000000)
+    subprocess.run(['git', 'tag', 'published'], cwd=catalog, check=True, capture_output=True)
+    for app in changed_apps:
+        with open(os.path.join(catalog, 'charts', app, '1.0.1', 'README.md'), 'a') as f:
+            f.write('Changed\n')
+    if changed_apps:
+        git_commit(catalog, 1700086400)
+
+    update_catalog_file(catalog, changed_since='published', jobs=1)
+    full_catalog = os.path.join(tmpdir, 'full_catalog')
+    shutil.copytree(catalog, full_catalog)
+    update_catalog_file(full_catalog, jobs=1)
+    incremental_files = read_catalog_files(catalog)
+    assert incremental_files == json.loads(json.dumps(read_catalog_files(full_catalog)).replace(full_catalog, catalog))
+    assert incremental_files['catalog.json']['charts']['app2']['last_update'] == datetime.fromtimestamp(
+        1700000000
+    ).strftime('%Y-%m-%d %H:%M:%S')
+
+    capsys.readouterr()
+    update_catalog_file(catalog, changed_since='HEAD', jobs=1)
+    assert 'Catalog is already up to date' in capsys.readouterr().out
@@ -1,9 +1,11 @@
 import pytest
 
+from catalog_validation.documents import DocumentLoader
 from catalog_validation.exceptions import ValidationErrors
+from catalog_validation.items.questions_utils import normalise_questions
 from catalog_validation.utils import WANTED_FILES_IN_ITEM_VERSION
 from catalog_validation.validation import (
-    validate_train_structure, validate_questions_yaml, validate_catalog_item,
+    get_item_versions, validate_train_structure, validate_questions_yaml, validate_catalog_item,
     validate_catalog_item_version, validate_variable_uniqueness,
 )
 
@@ -196,6 +198,18 @@ def test_validate_catalog_item(mocker, catalog_item_path, test_yaml, should_work
         assert validate_catalog_item(catalog_item_path, 'charts.machinaris') is None
 
 
+@pytest.mark.parametrize('files,is_dir,versions', [
+    (['1.1.13', '1.1.14', 'item.yaml'], [True, True, False], ['1.1.13', '1.1.14']),
+    (['item.yaml', 'app_versions.json'], [False, False], []),
+])
+def test_get_item_versions(mocker, files, is_dir, versions):
+    mocker.patch('os.listdir', return_value=files)
+    mocker.patch('os.path.isdir', side_effect=is_dir)
+    assert get_item_versions('/mnt/catalog/charts/machinaris') == [
+        f'/mnt/catalog/charts/machinaris/{version}' for version in versions
+    ]
+
+
 @pytest.mark.parametrize('chart_yaml,should_work', [
     (
         '''
@@ -366,3 +380,66 @@ def test_validate_variable_uniqueness(data, schema, should_work):
     else:
         with pytest.raises(ValidationErrors):
             validate_variable_uniqueness(data, schema, verrors)
+
+
+def test_validate_questions_yaml_unhashable_variable(mocker):
+    mocker.patch('builtins.open', mocker.mock_open(read_data='''
+        groups:
+          - name: "Machinaris Configuration"
+            description: "Configure timezone for machianaris"
+        questions:
+          - variable: [timezone]
+            label: "Configure timezone"
+            group: "Machinaris Configuration"
+            schema:
+              type: string
+    '''))
+    with pytest.raises(ValidationErrors) as ve:
+        validate_questions_yaml(None, 'charts.machinaris.versions.1.1.13.questions_configuration')
+    assert ve.value.errors[0].errmsg == "'variable' value should be a 'str'"
+
+
+@pytest.mark.parametrize('data,should_work', [
+    ([{'variable': ['timezone']}, {'variable': 'timezone'}], True),
+    ([{'variable': ['timezone']}, {'variable': 'port', 'subquestions': [{'variable': ['timezone']}]}], False),
+])
+def test_validate_variable_uniqueness_unhashable(data, should_work):
+    if should_work:
+        assert validate_variable_uniqueness(data, 'app.questions', ValidationErrors()) is None
+    else:
+        with pytest.raises(ValidationErrors):
+            validate_variable_uniqueness(data, 'app.questions', ValidationErrors())
+
+
+def test_validate_questions_yaml_walk_used_for_normalisation(mocker):
+    mocker.patch('builtins.open', mocker.mock_open(read_data='''
+        groups:
+          - name: "Networking"
+            description: "Configure networking"
+        questions:
+          - variable: network
+            label: "Network"
+            group: "Networking"
+            schema:
+              type: dict
+              attrs:
+                - variable: port
+                  label: "Port"
+                  schema:
+                    type: int
+                    $ref:
+                      - "definitions/port"
+    '''))
+    documents = DocumentLoader()
+    validate_questions_yaml('questions.yaml', 'app.questions_configuration', documents)
+    walk = documents.questions_walks['questions.yaml']
+    assert walk.features == {'definitions/port'}
+
+    get_questions_walk = mocker.patch('catalog_validation.items.questions_utils.get_questions_walk')
+    version_data = {'schema': documents.load_yaml('questions.yaml')}
+    normalise_questions(version_data, {'unused_ports': [9000, 9001]}, walk=walk)
+    get_questions_walk.assert_not_called()
+    assert version_data['required_features'] == ['definitions/port']
+    assert version_data['schema']['questions'][0]['schema']['attrs'][0]['schema']['enum'] == [
+        {'value': 9000, 'description': '9000 Port'}, {'value': 9001, 'description': '9001 Port'},
+    ]
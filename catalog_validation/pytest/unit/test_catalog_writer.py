@@ -0,0 +1,40 @@
+import json
+import os
+import pytest
+
+from catalog_validation.items.catalog_writer import CatalogWriter
+
+
+@pytest.mark.parametrize('trains,items', [
+    ({}, []),
+    ({'charts': [], 'test': []}, []),
+    (
+        {'charts': ['chia', 'plex'], 'test': [], 'community': ['minio']},
+        [
+            ('community', 'minio', {'name': 'minio', 'categories': ['storage'], 'healthy': True}),
+            ('charts', 'plex', {'name': 'plex', 'tags': [], 'latest_version': '1.0.0', 'recommended': False}),
+            ('charts', 'chia', {'name': 'chia', 'app_readme': '<h1>Chia</h1>\n<p>"quoted"</p>', 'icon_url': None}),
+        ],
+    ),
+])
+def test_catalog_writer(tmpdir, trains, items):
+    for train, item, item_data in items:
+        os.makedirs(os.path.join(tmpdir, train, item))
+
+    catalog_data = {train: {} for train in trains}
+    with CatalogWriter(str(tmpdir), trains) as writer:
+        for train, item, item_data in items:
+            writer.add_item(train, item, item_data, {'1.0.0': {'healthy': True}})
+        writer.commit()
+
+    for train, train_items in trains.items():
+        catalog_data[train] = {item: next(i[2] for i in items if i[:2] == (train, item)) for item in train_items}
+
+    with open(writer.catalog_file_path, 'r') as f:
+        assert f.read() == json.dumps(catalog_data, indent=4)
+
+    for train, item, item_data in items:
+        with open(os.path.join(tmpdir, train, item, 'app_versions.json'), 'r') as f:
+            assert json.loads(f.read()) == {'1.0.0': {'healthy': True}}
+
+    assert not any(f.startswith('.catalog_update_') for f in os.listdir(tmpdir))
@@ -0,0 +1,30 @@
+import hashlib
+import pytest
+import yaml
+
+from catalog_validation.documents import DocumentLoader
+from catalog_validation.yaml_utils import safe_yaml_load
+
+
+@pytest.mark.parametrize('content,should_work', [
+    ('name: chia\nversion: 1.3.37', True),
+    ('name: chia\n version: 1.3.37\n: :', False),
+])
+def test_document_loader_parses_once(mocker, content, should_work):
+    open_file = mocker.patch('builtins.open', mocker.mock_open(read_data=content))
+    safe_load = mocker.patch('catalog_validation.documents.safe_yaml_load', side_effect=safe_yaml_load)
+    documents = DocumentLoader()
+    for i in range(2):
+        if should_work:
+            assert documents.load_yaml('/mnt/catalog/charts/chia/1.3.37/Chart.yaml') == yaml.load(
+                content, yaml.SafeLoader
+            )
+        else:
+            with pytest.raises(yaml.YAMLError):
+                documents.load_yaml('/mnt/catalog/charts/chia/1.3.37/Chart.yaml')
+
+    assert documents.get_digest('/mnt/catalog/charts/chia/1.3.37/Chart.yaml') == hashlib.sha256(
+        content.encode()
+    ).hexdigest()
+    assert open_file.call_count == 1
+    assert safe_load.call_count == 1
@@ -0,0 +1,98 @@
+import errno
+import pickle
+import pytest
+import sys
+
+from catalog_validation.exceptions import CatalogDoesNotExist, ValidationError, ValidationErrors
+
+
+def get_verrors():
+    verrors = ValidationErrors()
+    verrors.add('app.versions.1.0.0', 'Missing questions.yaml')
+    verrors.add('app.item', 'Invalid item.yaml', errno.ENOENT)
+    return verrors
+
+
+def test_validation_errors_str():
+    verrors = get_verrors()
+    child = ValidationErrors()
+    child.add('schema', 'Invalid schema')
+    verrors.add_child('app.versions.1.0.1', child)
+    assert str(verrors) == (
+        '[EINVAL] app.versions.1.0.0: Missing questions.yaml\n'
+        '[ENOENT] app.item: Invalid item.yaml\n'
+        '[EINVAL] app.versions.1.0.1.schema: Invalid schema\n'
+    )
+    assert list(verrors)[-1] == ('app.versions.1.0.1.schema', 'Invalid schema', errno.EINVAL)
+
+
+@pytest.mark.parametrize('error', [
+    get_verrors(),
+    ValidationError('app.item', 'Invalid item.yaml', errno.ENOENT),
+    CatalogDoesNotExist('/mnt/catalog'),
+])
+def test_errors_pickle(error):
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert type(unpickled) is type(error)
+    assert str(unpickled) == str(error)
+
+
+def test_validation_errors_contains():
+    verrors = get_verrors()
+    assert 'app.item' in verrors
+    assert 'app.versions.1.0.1' not in verrors
+
+    verrors.add('app.versions.1.0.1', 'Missing README.md')
+    assert 'app.versions.1.0.1' in verrors
+
+    verrors.errors.pop(0)
+    assert 'app.versions.1.0.0' not in verrors
+    assert 'app.item' in verrors
+
+    verrors.errors.pop(0)
+    verrors.add('app.versions.1.0.2', 'Missing README.md')
+    assert 'app.item' not in verrors
+    assert 'app.versions.1.0.2' in verrors
+
+
+def test_validation_errors_extend():
+    verrors = ValidationErrors()
+    verrors.add('app.chart', 'Invalid Chart.yaml')
+    assert 'app.chart' in verrors
+    other = get_verrors()
+    expected = str(verrors) + str(other)
+    records = list(other.errors)
+    verrors.extend(other)
+    assert str(verrors) == expected
+    assert 'app.item' in verrors
+    # Records are moved instead of being copied
+    assert verrors.errors[1:] == records
+    assert not other and 'app.item' not in other
+
+
+def test_validation_errors_add_child():
+    verrors = ValidationErrors()
+    verrors.add_validation_error(ValidationError('app.item', 'Invalid item.yaml', errno.ENOENT))
+    assert 'app.item' in verrors
+    child = get_verrors()
+    verrors.add_child('charts', child)
+    assert 'charts.app.item' in verrors
+    assert 'charts.app.versions.1.0.0' in verrors
+    assert not child
+
+
+def test_validation_errors_records_size():
+    verrors = ValidationErrors()
+    for index in range(1000):
+        verrors.add(f'app.versions.{index}', 'Missing questions.yaml')
+    exceptions = [ValidationError(e.attribute, e.errmsg, e.errno) for e in verrors.errors]
+
+    record = verrors.errors[0]
+    assert not hasattr(record, '__dict__')
+    assert sys.getsizeof(record) < sys.getsizeof(exceptions[0]) + sys.getsizeof(exceptions[0].__dict__)
+    # Records are pickled as tuples of their values without names of their attributes
+    pickled = pickle.dumps(verrors)
+    values = [(e.attribute, e.errmsg, e.errno) for e in verrors.errors]
+    assert b'errmsg' not in pickled
+    assert len(pickled) < len(pickle.dumps(values)) + 5 * len(values)
+    assert str(pickle.loads(pickled)) == str(verrors)
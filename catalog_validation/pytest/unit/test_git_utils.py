@@ -0,0 +1,26 @@
+import pytest
+import subprocess
+
+from catalog_validation.git_utils import get_changed_catalog_items
+
+
+@pytest.mark.parametrize('diff_output,untracked_output,changed_items', [
+    (
+        b'charts/chia/item.yaml\0charts/plex/1.7.56/questions.yaml\0community/minio/1.0.0/README.md\0',
+        b'charts/syncthing/item.yaml\0',
+        {'charts': {'chia', 'plex', 'syncthing'}, 'community': {'minio'}},
+    ),
+    (
+        b'catalog.json\0charts/chia/app_versions.json\0features_capability.json\0charts/README.md\0',
+        b'',
+        {},
+    ),
+    (b'', b'', {}),
+])
+def test_get_changed_catalog_items(mocker, diff_output, untracked_output, changed_items):
+    mocker.patch('os.path.exists', return_value=True)
+    mocker.patch('subprocess.run', side_effect=[
+        subprocess.CompletedProcess([], 0, stdout=diff_output),
+        subprocess.CompletedProcess([], 0, stdout=untracked_output),
+    ])
+    assert get_changed_catalog_items('/mnt/catalog', 'HEAD~1') == changed_items
@@ -0,0 +1,85 @@
+import os
+import pytest
+import subprocess
+
+from datetime import datetime
+
+from catalog_validation.items.utils import get_last_updated_date, get_last_updated_dates
+
+
+def git(repo, *args, timestamp=None):
+    env = {**os.environ, 'GIT_AUTHOR_NAME': 'test', 'GIT_AUTHOR_EMAIL': 'test@ixsystems.com'}
+    env.update({'GIT_COMMITTER_NAME': env['GIT_AUTHOR_NAME'], 'GIT_COMMITTER_EMAIL': env['GIT_AUTHOR_EMAIL']})
+    if timestamp:
+        env.update({'GIT_AUTHOR_DATE': f'{timestamp} +0000', 'GIT_COMMITTER_DATE': f'{timestamp} +0000'})
+    subprocess.run(['git', *args], cwd=repo, env=env, check=True, capture_output=True)
+
+
+def commit(repo, timestamp, files=None, removed=None):
+    for path, contents in (files or {}).items():
+        os.makedirs(os.path.dirname(os.path.join(repo, path)), exist_ok=True)
+        with open(os.path.join(repo, path), 'w') as f:
+            f.write(contents)
+    for path in removed or []:
+        os.unlink(os.path.join(repo, path))
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '--allow-empty', '-m', str(timestamp), timestamp=timestamp)
+
+
+@pytest.fixture
+def catalog(tmpdir):
+    repo = str(tmpdir)
+    git(repo, 'init', '-q', '-b', 'master')
+    commit(repo, 1577836800, {'charts/chia/item.yaml': '1', 'charts/chia/1.0.0/Chart.yaml': '1'})
+    commit(repo, 1580515200)
+    # Both sides of the merge change charts/chia in different files
+    git(repo, 'checkout', '-q', '-b', 'feature')
+    commit(repo, 1588291200, {'charts/chia/1.0.0/README.md': '1', 'charts/plex/1.0.0/Chart.yaml': '1'})
+    git(repo, 'checkout', '-q', 'master')
+    commit(repo, 1585699200, {'charts/chia/item.yaml': '2'})
+    git(repo, 'merge', '-q', '--no-edit', 'feature', timestamp=1590969600)
+    # Empty commit followed by a rename
+    commit(repo, 1593561600)
+    commit(repo, 1596240000, {'charts/minio/1.0.0/Chart.yaml': '1'}, ['charts/plex/1.0.0/Chart.yaml'])
+    return repo
+
+
+@pytest.mark.parametrize('directory,timestamp', [
+    ('charts', 1596240000),
+    ('charts/chia', 1590969600),
+    ('charts/chia/1.0.0', 1588291200),
+    ('charts/plex', 1596240000),
+    ('charts/minio/1.0.0', 1596240000),
+])
+def test_get_last_updated_dates(catalog, directory, timestamp):
+    assert get_last_updated_dates(catalog)[directory] == timestamp
+
+
+def test_get_last_updated_dates_match_git_log(catalog):
+    last_updated_dates = get_last_updated_dates(catalog)
+    assert set(last_updated_dates) == {
+        'charts', 'charts/chia', 'charts/chia/1.0.0', 'charts/plex', 'charts/plex/1.0.0', 'charts/minio',
+        'charts/minio/1.0.0',
+    }
+    for directory in ('charts', 'charts/chia', 'charts/chia/1.0.0', 'charts/minio', 'charts/minio/1.0.0'):
+        assert get_last_updated_date(catalog, os.path.join(catalog, directory)) == datetime.fromtimestamp(
+            last_updated_dates[directory]
+        ).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def test_get_last_updated_dates_not_a_repo(tmpdir):
+    assert get_last_updated_dates(str(tmpdir)) is None
+
+
+@pytest.mark.parametrize('directory,timestamp', [
+    ('charts/chia', 1590969600),
+    ('charts/chia/1.0.0', 1588291200),
+    ('charts/chia/1.0.1', None),
+])
+def test_get_last_updated_date_from_index(mocker, catalog, directory, timestamp):
+    last_updated_dates = get_last_updated_dates(catalog)
+    check_output = mocker.patch('subprocess.check_output')
+    assert get_last_updated_date(catalog, os.path.join(catalog, directory), last_updated_dates) == (
+        datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else None
+    )
+    check_output.assert_not_called()
@@ -0,0 +1,51 @@
+import markdown
+import os
+import pytest
+import stat
+
+from catalog_validation import markdown_utils
+from catalog_validation.markdown_utils import get_markdown_renderer, render_markdown
+
+
+@pytest.fixture(autouse=True)
+def clear_rendered_markdown():
+    markdown_utils.RENDERED_MARKDOWN.clear()
+    yield
+    markdown_utils.RENDERED_MARKDOWN.clear()
+
+
+@pytest.mark.parametrize('documents,renders', [
+    (['# Chia', '# Chia', '# Chia'], 1),
+    (['# Chia', '# Plex', '# Chia'], 2),
+    (['# Chia', '# Plex', '# Minio', '# Chia'], 4),
+])
+def test_render_markdown_lru(mocker, documents, renders):
+    rendered = [markdown.markdown(d) for d in documents]
+    mocker.patch('catalog_validation.markdown_utils.MARKDOWN_CACHE_SIZE', 2)
+    render = mocker.patch('markdown.markdown', side_effect=markdown.markdown)
+    assert [render_markdown(d) for d in documents] == rendered
+    assert render.call_count == renders
+    assert len(markdown_utils.RENDERED_MARKDOWN) <= 2
+
+
+def test_render_markdown_disk_cache(mocker, tmpdir):
+    renderer = get_markdown_renderer(str(tmpdir))
+    assert renderer is get_markdown_renderer(str(tmpdir))
+    assert renderer('# Chia\n\nChia blockchain') == markdown.markdown('# Chia\n\nChia blockchain')
+    cached = [os.path.join(tmpdir, d, f) for d in os.listdir(tmpdir) for f in os.listdir(os.path.join(tmpdir, d))]
+    assert len(cached) == 1
+    assert stat.S_IMODE(os.stat(cached[0]).st_mode) == 0o644
+
+    # A new process would have nothing in memory and should use the rendered document from disk
+    markdown_utils.RENDERED_MARKDOWN.clear()
+    render = mocker.patch('markdown.markdown')
+    assert renderer('# Chia\n\nChia blockchain') == '<h1>Chia</h1>\n<p>Chia blockchain</p>'
+    render.assert_not_called()
+
+
+@pytest.mark.parametrize('failing', ['os.replace', 'os.chmod'])
+def test_render_markdown_disk_cache_failure(mocker, tmpdir, failing):
+    mocker.patch(f'catalog_validation.markdown_utils.{failing}', side_effect=OSError)
+    # Failing to cache the rendered document must neither fail rendering nor leave temporary files behind
+    assert render_markdown('# Chia', str(tmpdir)) == markdown.markdown('# Chia')
+    assert [f for d in os.listdir(tmpdir) for f in os.listdir(os.path.join(tmpdir, d))] == []
@@ -1,4 +1,8 @@
-from catalog_validation.items.questions_utils import normalise_question
+from catalog_validation.items.questions_utils import (
+    expand_port_enum, get_context_fingerprint, get_required_features, normalise_question, normalise_question_schema,
+    normalise_questions, normalise_questions_memoised, NormalisedQuestionsCache,
+)
+import copy
 import pytest
 
 
@@ -319,3 +323,164 @@ VERSION_DATA = {
 def test_normalise_question(question, normalise_data, context):
     normalise_question(question, VERSION_DATA, context)
     assert question == normalise_data
+
+
+@pytest.mark.parametrize('question,context,enum_range', [
+    (
+        {
+            'variable': 'webPort',
+            'label': 'Web Port',
+            'schema': {
+                'type': 'int',
+                '$ref': ['definitions/port'],
+            }
+        }, {
+            'unused_ports': [p for p in range(1025, 65535) if p not in (9000, 9005, 20000)],
+        }, {
+            'start': 9000,
+            'end': 65534,
+            'exclude': [9000, 9005, 20000],
+        }
+    ),
+    (
+        {
+            'variable': 'webPort',
+            'label': 'Web Port',
+            'schema': {
+                'type': 'int',
+                'null': True,
+                'min': 1025,
+                'max': 1030,
+                '$ref': ['definitions/port'],
+            }
+        }, {
+            'unused_ports': [1026, 1029],
+        }, {
+            'start': 1025,
+            'end': 1030,
+            'exclude': [1025, 1027, 1028, 1030],
+        }
+    ),
+])
+def test_normalise_question_compact_port_enum(question, context, enum_range):
+    expanded_question = copy.deepcopy(question)
+    normalise_question(expanded_question, VERSION_DATA, context)
+    normalise_question(question, VERSION_DATA, context, {'compact_port_enum': True})
+    assert question['schema']['enum_range'] == enum_range
+    assert list(expand_port_enum(question['schema'])) == expanded_question['schema']['enum']
+
+
+@pytest.mark.parametrize('questions_data', [
+    {
+        'questions': [
+            {
+                'variable': 'timezone',
+                'schema': {'type': 'string', '$ref': ['definitions/timezone']},
+            },
+            {
+                'variable': 'storage',
+                'schema': {
+                    'type': 'dict',
+                    'attrs': [
+                        {
+                            'variable': 'volumes',
+                            'schema': {
+                                'type': 'list',
+                                'items': [{
+                                    'variable': 'volume',
+                                    'schema': {'type': 'int', '$ref': ['definitions/port', 'validations/nodePort']},
+                                }],
+                            },
+                        },
+                        {
+                            'variable': 'enabled',
+                            'schema': {
+                                'type': 'boolean',
+                                'subquestions': [{
+                                    'variable': 'interface',
+                                    'schema': {'type': 'string', '$ref': ['definitions/interface']},
+                                }],
+                            },
+                        },
+                    ],
+                },
+            },
+        ],
+    },
+    {
+        'questions': [],
+        'enableIXPortals': True,
+        'iXPortalsGroupName': 'Portal Configuration',
+    },
+    {'questions': [{'variable': 'name', 'schema': {'type': 'string'}}]},
+])
+def test_get_required_features(questions_data):
+    version_data = {'schema': copy.deepcopy(questions_data)}
+    normalise_questions(version_data, {
+        'nic_choices': [], 'timezones': {}, 'system.general.config': {'timezone': 'UTC'}, 'unused_ports': [],
+        'node_ip': '192.168.0.10',
+    })
+    assert sorted(get_required_features(questions_data)) == sorted(version_data['required_features'])
+
+
+def test_normalise_questions_memoised(mocker):
+    normalise = mocker.patch(
+        'catalog_validation.items.questions_utils.normalise_question_schema', side_effect=normalise_question_schema
+    )
+    context = {'nic_choices': [], 'unused_ports': [9000, 9001]}
+    questions = {'questions': [{'variable': 'port', 'schema': {'type': 'int', '$ref': ['definitions/port']}}]}
+    versions = [{'schema': copy.deepcopy(questions)} for i in range(3)]
+    options = {'normalised_questions_cache': NormalisedQuestionsCache()}
+    for version_data, (digest, version_context) in zip(versions, [
+        ('digest1', context), ('digest1', dict(context)), ('digest1', {**context, 'unused_ports': [9000]}),
+    ]):
+        normalise_questions_memoised(version_data, digest, version_context, options)
+
+    # Third version has a different context, so it must be normalised again
+    assert normalise.call_count == 2
+    assert versions[0] == versions[1]
+    assert versions[1]['schema'] is not versions[0]['schema']
+    assert versions[2]['schema']['questions'][0]['schema']['enum'] == [{'value': 9000, 'description': '9000 Port'}]
+
+
+def test_normalise_questions_memoised_context_fingerprint(mocker):
+    fingerprint = mocker.patch('catalog_validation.items.questions_utils.get_context_fingerprint')
+    context = {'nic_choices': [], 'unused_ports': [9000, 9001]}
+    options = {
+        'questions_context_fingerprint': get_context_fingerprint(context),
+        'normalised_questions_cache': NormalisedQuestionsCache(),
+    }
+    questions = {'questions': [{'variable': 'port', 'schema': {'type': 'int', '$ref': ['definitions/port']}}]}
+    versions = [{'schema': copy.deepcopy(questions)} for i in range(2)]
+    for version_data in versions:
+        normalise_questions_memoised(version_data, 'digest1', context, options)
+
+    fingerprint.assert_not_called()
+    assert versions[0] == versions[1]
+
+
+def test_normalise_questions_memoised_without_cache(mocker):
+    normalise = mocker.patch(
+        'catalog_validation.items.questions_utils.normalise_question_schema', side_effect=normalise_question_schema
+    )
+    questions = {'questions': [{'variable': 'port', 'schema': {'type': 'int', '$ref': ['definitions/port']}}]}
+    for i in range(2):
+        normalise_questions_memoised({'schema': copy.deepcopy(questions)}, 'digest1', {'unused_ports': [9000]})
+
+    assert normalise.call_count == 2
+
+
+def test_normalised_questions_cache_max_size():
+    cache = NormalisedQuestionsCache(max_size=10)
+    cache.add(('digest1',), b'1234', [])
+    cache.add(('digest2',), b'1234', [])
+    assert cache.get(('digest1',)) == (b'1234', [])
+    # Least recently used entry is evicted once the cache grows over its size
+    cache.add(('digest3',), b'1234', [])
+    assert cache.get(('digest2',)) is None
+    assert len(cache) == 2
+    assert cache.size == 8
+    # Entries which do not fit in the cache at all are not kept
+    cache.add(('digest4',), b'12345678901', [])
+    assert len(cache) == 0
+    assert cache.size == 0
@@ -0,0 +1,58 @@
+import pytest
+
+from catalog_validation.profiling import get_profile, profiled, start_profiling, stop_profiling, timed
+from catalog_validation.scheduling import run_tasks, Task
+
+
+@profiled('parse')
+def parse(value):
+    with timed('nested'):
+        if value is None:
+            raise ValueError('Invalid value')
+        return value * 2
+
+
+def test_timed_without_profiling():
+    assert get_profile() is None
+    assert parse(2) == 4
+    assert get_profile() is None
+
+
+@pytest.mark.parametrize('calls,counts', [
+    ([1, 2, 3], {'parse': 3, 'nested': 3}),
+    ([1, None], {'parse': 2, 'nested': 2}),
+    ([], {}),
+])
+def test_profile_phases(calls, counts):
+    profile = start_profiling()
+    try:
+        for value in calls:
+            try:
+                parse(value)
+            except ValueError:
+                pass
+    finally:
+        assert stop_profiling() is profile
+
+    assert {phase: count for phase, (elapsed, count) in profile.phases.items()} == counts
+    assert all(elapsed >= 0 for elapsed, count in profile.phases.values())
+
+
+def test_profile_worker_timings_are_aggregated():
+    tasks = [Task(i, f'item{i % 2}', 0, (i,)) for i in range(4)] + [Task(4, 'item0', 0, (None,))]
+    results = run_tasks(parse, tasks, True)
+    assert get_profile() is None
+    assert [r[0] for r in results] == [0, 1, 2, 3, 4]
+    assert isinstance(results[-1][2], ValueError)
+
+    profile = start_profiling()
+    stop_profiling()
+    for key, result, error, elapsed, phases in results:
+        assert set(phases) == {'parse', 'nested', 'pickling'}
+        profile.add_item(f'item{key % 2}', elapsed, phases)
+
+    report = profile.report(slowest=1)
+    assert report['phases']['parse']['count'] == 5
+    assert len(report['slowest_items']) == 1
+    assert report['slowest_items'][0]['name'] in ('item0', 'item1')
+    assert set(report['slowest_items'][0]['phases']) == {'parse', 'nested', 'pickling'}
@@ -0,0 +1,105 @@
+import pytest
+
+from catalog_validation.items.questions_walker import (
+    get_duplicate_variables, get_questions_walk, QuestionsVisitor, walk_question, walk_questions,
+)
+
+
+class RecordingVisitor(QuestionsVisitor):
+
+    def __init__(self, skip=None):
+        self.events = []
+        self.skip = skip or set()
+
+    def enter(self, question, path, parent):
+        self.events.append(('enter', path, parent['variable'] if parent else None))
+        return question['variable'] not in self.skip
+
+    def enter_children(self, question, path, key, children):
+        if children:
+            self.events.append(('children', f'{path}.{key}', len(children)))
+
+    def leave(self, question, path):
+        self.events.append(('leave', path))
+
+
+QUESTION = {
+    'variable': 'storage',
+    'schema': {
+        'type': 'dict',
+        'attrs': [
+            {'variable': 'path', 'schema': {'type': 'string'}},
+            {
+                'variable': 'volumes',
+                'schema': {'type': 'list', 'items': [{'variable': 'volume', 'schema': {'type': 'string'}}]},
+            },
+        ],
+        'subquestions': [{'variable': 'size', 'schema': {'type': 'int'}}],
+    },
+}
+
+
+@pytest.mark.parametrize('skip,events', [
+    (set(), [
+        ('enter', 'q', None),
+        ('children', 'q.attrs', 2),
+        ('enter', 'q.schema.attrs.0', 'storage'),
+        ('leave', 'q.schema.attrs.0'),
+        ('enter', 'q.schema.attrs.1', 'storage'),
+        ('children', 'q.schema.attrs.1.items', 1),
+        ('enter', 'q.schema.attrs.1.schema.items.0', 'volumes'),
+        ('leave', 'q.schema.attrs.1.schema.items.0'),
+        ('leave', 'q.schema.attrs.1'),
+        ('children', 'q.subquestions', 1),
+        ('enter', 'q.schema.subquestions.0', 'storage'),
+        ('leave', 'q.schema.subquestions.0'),
+        ('leave', 'q'),
+    ]),
+    ({'storage'}, [('enter', 'q', None)]),
+])
+def test_walk_question(skip, events):
+    visitor = RecordingVisitor(skip)
+    walk_question(QUESTION, 'q', [visitor])
+    assert visitor.events == events
+
+
+def test_walk_questions_children_skipped_for_all_visitors():
+    visitors = [RecordingVisitor(), RecordingVisitor({'storage', 'volumes'})]
+    walk_questions([QUESTION, {'variable': 'port', 'schema': {'type': 'int'}}], 'questions', visitors)
+    assert visitors[0].events == visitors[1].events
+    assert [e[1] for e in visitors[0].events if e[0] == 'enter'] == ['questions.0', 'questions.1']
+
+
+def test_questions_walk():
+    questions = [
+        QUESTION,
+        {'variable': 'port', 'group': 'Networking', 'schema': {'type': 'int', '$ref': ['definitions/port']}},
+        {
+            'variable': 'storage',
+            'schema': {'type': 'boolean', 'show_if': [['port', '=', 80]], 'subquestions': [{'variable': 'port'}]},
+        },
+        'invalid',
+    ]
+    walk = get_questions_walk(questions)
+    assert walk.duplicates == {
+        'questions': [('2', 'storage')],
+        'questions.0.schema.subquestions': [],
+        'questions.0.schema.attrs': [],
+        'questions.0.schema.attrs.1.schema.items': [],
+        'questions.2.schema.subquestions': [],
+    }
+    assert walk.groups == {'questions.1': 'Networking'}
+    assert walk.features == {'definitions/port'}
+    assert walk.show_if == {'questions.2': [['port', '=', 80]]}
+    # Children are left before their parents
+    assert [s['type'] for s in walk.schemas] == ['int', 'string', 'string', 'list', 'dict', 'int', 'boolean']
+
+
+@pytest.mark.parametrize('questions,duplicates', [
+    ([{'variable': 'a'}, {'variable': 'b'}], []),
+    ([{'variable': 'a'}, {'variable': 'a', 'subquestions': [{'variable': 'b'}]}, {'variable': 'b'}], [('1', 'a')]),
+    ([{'variable': 'a', 'subquestions': [{'variable': 'b'}, {'variable': 'a'}]}], [('0.subquestions.1', 'a')]),
+    ([{'variable': ['a']}, {'variable': ['a']}, 'invalid', {'label': 'a'}], [('1', ['a'])]),
+])
+def test_get_duplicate_variables(questions, duplicates):
+    assert get_duplicate_variables(questions) == duplicates
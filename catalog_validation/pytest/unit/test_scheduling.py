@@ -0,0 +1,83 @@
+import concurrent.futures
+import functools
+import os
+import pytest
+
+from catalog_validation.profiling import start_profiling, stop_profiling
+from catalog_validation.scheduling import (
+    CostTracker, estimate_item_cost, estimate_version_cost, get_process_pool, run_longest_first, Task,
+    VERSION_BASE_COST,
+)
+
+
+def get_port(ports, index):
+    return ports[index]
+
+
+def test_estimate_item_cost(tmpdir):
+    for version, questions_size in (('1.0.0', 100), ('1.0.1', 300)):
+        os.makedirs(os.path.join(tmpdir, version))
+        with open(os.path.join(tmpdir, version, 'questions.yaml'), 'w') as f:
+            f.write('a' * questions_size)
+        with open(os.path.join(tmpdir, version, 'README.md'), 'w') as f:
+            f.write('a' * 10)
+    with open(os.path.join(tmpdir, 'item.yaml'), 'w') as f:
+        f.write('a' * 20)
+
+    assert estimate_version_cost(os.path.join(tmpdir, '1.0.1')) == VERSION_BASE_COST + 310
+    assert estimate_item_cost(str(tmpdir), False) == 20
+    assert estimate_item_cost(str(tmpdir)) == 20 + 2 * VERSION_BASE_COST + 420
+
+
+@pytest.mark.parametrize('costs,chunksize,order', [
+    ([1, 5, 3, 10], 1, [3, 1, 2, 0]),
+    ([100, 1, 1, 1, 1, 2], 2, [0, 5, 1, 2, 3, 4]),
+])
+def test_run_longest_first(costs, chunksize, order):
+    executed = []
+    cost_tracker = CostTracker()
+
+    def run(index):
+        executed.append(index)
+        if index == 1:
+            raise ValueError(index)
+        return index * 2
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as exc:
+        results = {
+            key: (result, error) for key, result, error in run_longest_first(
+                exc, run, [Task(i, f'item{i}', cost, (i,)) for i, cost in enumerate(costs)], chunksize, cost_tracker,
+            )
+        }
+
+    assert executed == order
+    assert {k: v[0] for k, v in results.items()} == {i: None if i == 1 else i * 2 for i in range(len(costs))}
+    assert isinstance(results[1][1], ValueError)
+    assert {e['name']: e['estimated'] for e in cost_tracker.report()} == {
+        f'item{i}': cost for i, cost in enumerate(costs)
+    }
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+def test_run_longest_first_with_worker_func(mocker, start_method):
+    mocker.patch('catalog_validation.scheduling.multiprocessing.get_start_method', return_value=start_method)
+    ports = list(range(9000, 65535))
+    profile = start_profiling()
+    try:
+        with get_process_pool(2, functools.partial(get_port, ports)) as exc:
+            results = {
+                key: result for key, result, error in run_longest_first(
+                    exc, None, [Task(i, f'item{i}', 1, (i,)) for i in range(10)], 2,
+                )
+            }
+    finally:
+        stop_profiling()
+
+    assert results == {i: 9000 + i for i in range(10)}
+    assert profile.counters['worker_initializer_payload_size'] > len(ports)
+    # Ports are only sent once to each worker and not with every chunk of tasks, forked workers inherit them
+    if start_method == 'fork':
+        assert 'bytes_sent_to_workers_initializer' not in profile.counters
+    else:
+        assert profile.counters['bytes_sent_to_workers_initializer'] > 2 * len(ports)
+    assert profile.counters['bytes_sent_to_workers'] < len(ports)
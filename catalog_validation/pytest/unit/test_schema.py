@@ -1,6 +1,11 @@
+import importlib.metadata
 import pytest
 
-from catalog_validation.schema.schema_gen import get_schema
+from catalog_validation.schema import feature_gen, schema_gen
+from catalog_validation.schema.attrs import StringSchema
+from catalog_validation.schema.feature_gen import get_feature, register_feature
+from catalog_validation.schema.features import Feature
+from catalog_validation.schema.schema_gen import get_schema, register_schema_type
 from catalog_validation.exceptions import ValidationErrors
 from catalog_validation.validation import validate_question
 
@@ -575,3 +580,107 @@ def test_question_variable_validation(variable, should_work):
             verrors.check()
     else:
         verrors.check()
+
+
+@pytest.mark.parametrize('schema_a,schema_b,same_validator', [
+    ({'type': 'string'}, {'type': 'string', 'default': 'hello'}, True),
+    ({'type': 'string'}, {'type': 'string', 'null': True}, False),
+    ({'type': 'string'}, {'type': 'path'}, False),
+    ({'type': 'dict', 'attrs': []}, {'type': 'dict', 'attrs': [], 'additional_attrs': True}, False),
+])
+def test_schema_json_schema_validator_cache(schema_a, schema_b, same_validator):
+    validator_a = get_schema(schema_a).get_json_schema_validator()
+    validator_b = get_schema(schema_b).get_json_schema_validator()
+    assert (validator_a is validator_b) is same_validator
+
+
+@pytest.mark.parametrize('schema,attrs_index', [
+    ({'type': 'dict', 'attrs': []}, {}),
+    (
+        {
+            'type': 'dict',
+            'attrs': [
+                {'variable': 'repository', 'schema': {'type': 'string'}},
+                {'variable': 'tag', 'schema': {'type': 'string'}},
+                {'variable': 'repository', 'schema': {'type': 'int'}},
+                {'schema': {'type': 'int'}},
+            ],
+        },
+        {'repository': 0, 'tag': 1},
+    ),
+])
+def test_dict_schema_attrs_index(schema, attrs_index):
+    schema_obj = get_schema(schema)
+    assert schema_obj.attrs_index == attrs_index
+    for name, index in attrs_index.items():
+        assert schema_obj.get_attr(name) is schema_obj.attrs[index]
+    assert schema_obj.get_attr('missing') is None
+
+
+@pytest.mark.parametrize('schema,attrs', [
+    ({'type': 'string', 'default': 'hello', 'private': True}, {'default': 'hello', 'private': True, 'min': None}),
+    ({'type': 'int', 'min': 1, 'max': 10}, {'min': 1, 'max': 10, 'enum': None}),
+    ({'type': 'list', 'items': [], 'subquestions': []}, {'default': None}),
+    ({'type': 'dict', 'attrs': [], 'additional_attrs': True}, {'additional_attrs': True, 'subquestions': None}),
+])
+def test_schema_data_attrs(schema, attrs):
+    schema_obj = get_schema(schema)
+    assert not hasattr(schema_obj, '__dict__')
+    for attr, value in attrs.items():
+        assert getattr(schema_obj, attr, None) == value
+    if schema['type'] == 'list':
+        assert not hasattr(schema_obj, 'subquestions')
+
+
+class EmailSchema(StringSchema):
+    __slots__ = ()
+
+
+class EmailFeature(Feature):
+    NAME = 'validations/email'
+    VALID_SCHEMAS = [EmailSchema]
+
+
+@pytest.fixture
+def registries(mocker):
+    mocker.patch.dict(schema_gen.SCHEMA_TYPES)
+    mocker.patch.dict(feature_gen.REGISTERED_FEATURES)
+    schema_gen.get_schema_types.cache_clear()
+    feature_gen.get_features.cache_clear()
+    yield
+    schema_gen.get_schema_types.cache_clear()
+    feature_gen.get_features.cache_clear()
+
+
+@pytest.mark.parametrize('feature', [EmailFeature(), EmailFeature])
+def test_register_schema_type_and_feature(registries, feature):
+    assert get_schema({'type': 'email'}) is None
+    assert get_feature('validations/email') is None
+
+    register_schema_type('email', EmailSchema)
+    register_feature(feature)
+    assert isinstance(get_feature('validations/email'), EmailFeature)
+    assert isinstance(get_schema({'type': 'email'}), EmailSchema)
+    assert get_schema({'type': 'email', '$ref': ['validations/email']}).validate('schema') is None
+    with pytest.raises(ValidationErrors):
+        get_schema({'type': 'string', '$ref': ['validations/email']}).validate('schema')
+
+
+def test_schema_type_and_feature_entry_points(mocker, registries):
+    get_entry_points = mocker.patch('catalog_validation.utils.importlib.metadata.entry_points')
+    get_entry_points.return_value.select.side_effect = lambda group: {
+        schema_gen.SCHEMA_TYPES_ENTRY_POINT: [
+            importlib.metadata.EntryPoint('email', f'{__name__}:EmailSchema', group),
+        ],
+        feature_gen.FEATURES_ENTRY_POINT: [
+            importlib.metadata.EntryPoint('email', f'{__name__}:EmailFeature', group),
+        ],
+    }[group]
+    assert isinstance(get_schema({'type': 'email'}), EmailSchema)
+    assert isinstance(get_feature('validations/email'), EmailFeature)
+    assert get_feature('definitions/timezone').NAME == 'definitions/timezone'
+
+
+@pytest.mark.parametrize('schema', [None, {}, {'type': None}, {'type': ['string']}, {'type': 'unknown'}])
+def test_get_schema_unknown_type(schema):
+    assert get_schema(schema) is None
@@ -0,0 +1,74 @@
+import catalog_validation
+import concurrent.futures
+import os
+import pytest
+import subprocess
+import sys
+
+from multiprocessing import shared_memory
+
+from catalog_validation.items.transport import (
+    BLOB_TRANSPORT, decode, encode, PICKLE_TRANSPORT, release, run_encoded, SHARED_MEMORY_TRANSPORT, TRANSPORTS,
+)
+
+
+ITEM_DETAILS = {
+    'name': 'chia',
+    'categories': ['storage', 'crypto'],
+    'versions': {
+        '1.2.0': {
+            'healthy': True,
+            'schema': {'questions': [{'variable': 'timezone', 'schema': {'type': 'string', 'default': 'Etc/UTC'}}]},
+            'detailed_readme': '<h1>Chia</h1>\n<p>Chia blockchain</p>',
+            'required_features': set(),
+        },
+    },
+}
+
+
+def get_item_details(name):
+    return {**ITEM_DETAILS, 'name': name}
+
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_encode_decode(transport):
+    assert decode(encode(ITEM_DETAILS, transport), transport) == ITEM_DETAILS
+
+
+@pytest.mark.parametrize('transport,encoded_type', [
+    (PICKLE_TRANSPORT, dict),
+    (BLOB_TRANSPORT, bytes),
+    (SHARED_MEMORY_TRANSPORT, tuple),
+])
+def test_encoded_type(transport, encoded_type):
+    encoded = encode(ITEM_DETAILS, transport)
+    assert isinstance(encoded, encoded_type)
+    release(encoded, transport)
+
+
+def test_shared_memory_released():
+    name, size = encode(ITEM_DETAILS, SHARED_MEMORY_TRANSPORT)
+    release((name, size), SHARED_MEMORY_TRANSPORT)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_run_encoded_in_workers(transport):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as exc:
+        results = list(exc.map(run_encoded, [transport] * 3, [get_item_details] * 3, ['chia', 'plex', 'minio']))
+    assert [decode(r, transport)['name'] for r in results] == ['chia', 'plex', 'minio']
+
+
+def test_shared_memory_transport_in_workers_does_not_warn():
+    # Resource trackers of workers warn from their own process, so we check what ends up on stderr
+    process = subprocess.run([sys.executable, '-W', 'error', '-c', (
+        'import concurrent.futures\n'
+        'from catalog_validation.items.transport import decode, run_encoded, SHARED_MEMORY_TRANSPORT\n'
+        'with concurrent.futures.ProcessPoolExecutor(max_workers=2) as exc:\n'
+        '    results = list(exc.map(run_encoded, [SHARED_MEMORY_TRANSPORT] * 8, [str] * 8, range(8)))\n'
+        'print(",".join(decode(r, SHARED_MEMORY_TRANSPORT) for r in results))\n'
+    )], cwd=os.path.dirname(os.path.dirname(catalog_validation.__file__)), capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == '0,1,2,3,4,5,6,7'
+    assert process.stderr == ''
@@ -0,0 +1,39 @@
+import os
+
+from catalog_validation.validation_cache import get_version_validation_key, is_validated, mark_validated
+
+
+def create_version(version_path, files):
+    os.makedirs(version_path, exist_ok=True)
+    for file_name, content in files.items():
+        with open(os.path.join(version_path, file_name), 'w') as f:
+            f.write(content)
+
+
+def test_version_validation_key(tmp_path):
+    version_path = str(tmp_path / 'chia' / '1.3.37')
+    create_version(version_path, {'Chart.yaml': 'name: chia\nversion: 1.3.37', 'questions.yaml': 'groups: []'})
+    key = get_version_validation_key(version_path, 'chia', '1.3.37', False)
+    assert key == get_version_validation_key(version_path, 'chia', '1.3.37', False)
+    assert key != get_version_validation_key(version_path, 'chia', '1.3.37', True)
+
+    create_version(version_path, {'questions.yaml': 'groups: []\nquestions: []'})
+    updated_key = get_version_validation_key(version_path, 'chia', '1.3.37', False)
+    assert key != updated_key
+
+    os.chmod(os.path.join(version_path, 'questions.yaml'), 0o755)
+    assert updated_key != get_version_validation_key(version_path, 'chia', '1.3.37', False)
+
+
+def test_validation_cache(tmp_path):
+    version_path = str(tmp_path / 'chia' / '1.3.37')
+    cache_dir = str(tmp_path / 'cache')
+    create_version(version_path, {'Chart.yaml': 'name: chia\nversion: 1.3.37'})
+    key = get_version_validation_key(version_path, 'chia', '1.3.37', False)
+    assert is_validated(cache_dir, key) is False
+
+    mark_validated(cache_dir, key)
+    assert is_validated(cache_dir, key) is True
+
+    create_version(version_path, {'Chart.yaml': 'name: chia\nversion: 1.3.38'})
+    assert is_validated(cache_dir, get_version_validation_key(version_path, 'chia', '1.3.37', False)) is False
@@ -0,0 +1,78 @@
+import pytest
+
+from catalog_validation.workers import get_cgroup_cpu_limit, get_chunksize, get_cpu_count, get_max_workers
+
+
+@pytest.mark.parametrize('files,limit', [
+    ({'/sys/fs/cgroup/cpu.max': 'max 100000\n'}, None),
+    ({'/sys/fs/cgroup/cpu.max': '250000 100000\n'}, 3),
+    ({'/sys/fs/cgroup/cpu.max': '50000 100000\n'}, 1),
+    ({'/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '400000\n', '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n'}, 4),
+    ({'/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '-1\n', '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n'}, None),
+    ({}, None),
+    ({
+        '/proc/self/cgroup': '0::/system.slice/middlewared.service\n',
+        '/sys/fs/cgroup/cpu.max': 'max 100000\n',
+        '/sys/fs/cgroup/system.slice/middlewared.service/cpu.max': '200000 100000\n',
+    }, 2),
+    ({
+        '/proc/self/cgroup': '0::/system.slice/middlewared.service\n',
+        '/sys/fs/cgroup/system.slice/cpu.max': '100000 100000\n',
+        '/sys/fs/cgroup/system.slice/middlewared.service/cpu.max': 'max 100000\n',
+    }, 1),
+    ({
+        '/proc/self/cgroup': '0::/system.slice/middlewared.service\n',
+        '/sys/fs/cgroup/system.slice/middlewared.service/cpu.max': 'max 100000\n',
+    }, None),
+    ({
+        '/proc/self/cgroup': '2:cpu,cpuacct:/docker/abc\n1:memory:/docker/abc\n',
+        '/sys/fs/cgroup/cpu,cpuacct/docker/abc/cpu.cfs_quota_us': '300000\n',
+        '/sys/fs/cgroup/cpu,cpuacct/docker/abc/cpu.cfs_period_us': '100000\n',
+        '/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '-1\n', '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n',
+    }, 3),
+    ({
+        # Within a cgroup namespace hierarchy of the process is not available under its path
+        '/proc/self/cgroup': '2:cpu,cpuacct:/docker/abc\n',
+        '/sys/fs/cgroup/cpu/cpu.cfs_quota_us': '400000\n', '/sys/fs/cgroup/cpu/cpu.cfs_period_us': '100000\n',
+    }, 4),
+])
+def test_get_cgroup_cpu_limit(mocker, files, limit):
+    def open_file(path, *args, **kwargs):
+        if path not in files:
+            raise FileNotFoundError(path)
+        return mocker.mock_open(read_data=files[path])()
+
+    mocker.patch('builtins.open', side_effect=open_file)
+    assert get_cgroup_cpu_limit() == limit
+
+
+@pytest.mark.parametrize('affinity,cgroup_limit,cpu_count', [
+    (set(range(32)), None, 32),
+    (set(range(32)), 4, 4),
+    ({0, 1}, 4, 2),
+])
+def test_get_cpu_count(mocker, affinity, cgroup_limit, cpu_count):
+    mocker.patch('os.sched_getaffinity', return_value=affinity, create=True)
+    mocker.patch('catalog_validation.workers.get_cgroup_cpu_limit', return_value=cgroup_limit)
+    assert get_cpu_count() == cpu_count
+
+
+@pytest.mark.parametrize('total_tasks,jobs,workers', [
+    (100, None, 8),
+    (3, None, 3),
+    (0, None, 1),
+    (100, 2, 2),
+    (1, 16, 1),
+])
+def test_get_max_workers(mocker, total_tasks, jobs, workers):
+    mocker.patch('catalog_validation.workers.get_cpu_count', return_value=8)
+    assert get_max_workers(total_tasks, jobs) == workers
+
+
+@pytest.mark.parametrize('total_tasks,workers,chunksize', [
+    (300, 8, 10),
+    (10, 8, 1),
+    (0, 1, 1),
+])
+def test_get_chunksize(total_tasks, workers, chunksize):
+    assert get_chunksize(total_tasks, workers) == chunksize
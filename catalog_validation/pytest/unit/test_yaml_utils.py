@@ -0,0 +1,28 @@
+import pytest
+import yaml
+
+from catalog_validation.yaml_utils import safe_yaml_load
+
+
+@pytest.mark.parametrize('content', [
+    'name: chia\nversion: 1.3.37\nkeywords: [storage, crypto]',
+    'timestamp: 2023-01-01\nmode: 0o755\nsize: 1_000\nlimit: .inf',
+    'default: &default 1\nvalue: *default',
+    'description: "\\x85 unicode \\u00e9"',
+    '',
+])
+def test_safe_yaml_load(content):
+    assert safe_yaml_load(content) == yaml.safe_load(content)
+
+
+@pytest.mark.parametrize('content', [
+    'name: \x07',
+    'keywords: [storage',
+    'name: chia\n---\nname: plex',
+])
+def test_safe_yaml_load_errors(content):
+    with pytest.raises(yaml.YAMLError) as python_error:
+        yaml.safe_load(content)
+    with pytest.raises(yaml.YAMLError) as error:
+        safe_yaml_load(content)
+    assert type(error.value) is type(python_error.value)
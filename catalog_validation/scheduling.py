@@ -0,0 +1,176 @@
+import concurrent.futures
+import contextlib
+import multiprocessing
+import os
+import pickle
+import time
+import typing
+
+from .profiling import get_profile, start_profiling, stop_profiling, timed
+from .utils import CACHED_VERSION_FILE_NAME
+
+
+# Estimated costs are in bytes, i.e how much of yaml/markdown we are going to parse for a task. Every version
+# also has a fixed cost for all the other files we read and validate for it regardless of their size.
+VERSION_BASE_COST = 16 * 1024
+VERSION_COST_FILES = ('questions.yaml', 'README.md', 'app-readme.md')
+
+
+# Function run for tasks in worker processes of a pool created by get_process_pool(), it is installed once in each
+# worker so that data bound to it (e.g questions context) is not sent to workers along with every chunk of tasks
+WORKER_FUNC = None
+
+
+class Task(typing.NamedTuple):
+    key: typing.Any
+    name: str
+    cost: int
+    args: tuple = ()
+    kwargs: typing.Optional[dict] = None
+
+
+class CostTracker:
+
+    # Keeps track of estimated cost and actual time taken by each item so that the estimation heuristic
+    # can be tuned. Costs of multiple tasks having the same name are summed up.
+
+    def __init__(self):
+        self.costs = {}
+
+    def add(self, name: str, estimated: int, actual: float) -> None:
+        total_estimated, total_actual = self.costs.get(name, (0, 0.0))
+        self.costs[name] = (total_estimated + estimated, total_actual + actual)
+
+    def report(self) -> typing.List[dict]:
+        total_estimated = sum(estimated for estimated, actual in self.costs.values()) or 1
+        total_actual = sum(actual for estimated, actual in self.costs.values()) or 1
+        return sorted([
+            {
+                'name': name,
+                'estimated': estimated,
+                'actual': actual,
+                'estimated_share': estimated / total_estimated,
+                'actual_share': actual / total_actual,
+            } for name, (estimated, actual) in self.costs.items()
+        ], key=lambda d: d['actual'], reverse=True)
+
+    def print_report(self, limit: typing.Optional[int] = None) -> None:
+        print(f'{"Item":<50}{"Estimated":>12}{"Actual (s)":>12}{"Estimated %":>13}{"Actual %":>10}')
+        for entry in self.report()[:limit]:
+            print(
+                f'{entry["name"]:<50}{entry["estimated"]:>12}{entry["actual"]:>12.3f}'
+                f'{entry["estimated_share"] * 100:>13.2f}{entry["actual_share"] * 100:>10.2f}'
+            )
+
+
+def get_file_size(path: str) -> int:
+    with contextlib.suppress(OSError):
+        return os.stat(path).st_size
+    return 0
+
+
+def estimate_version_cost(version_path: str) -> int:
+    return VERSION_BASE_COST + sum(get_file_size(os.path.join(version_path, f)) for f in VERSION_COST_FILES)
+
+
+def estimate_item_cost(item_path: str, include_versions: bool = True) -> int:
+    # Cost of an item is dominated by its versions, so we only account for item level files we parse
+    cost = get_file_size(os.path.join(item_path, 'item.yaml')) + get_file_size(
+        os.path.join(item_path, CACHED_VERSION_FILE_NAME)
+    )
+    if not include_versions:
+        return cost
+
+    with contextlib.suppress(OSError):
+        with os.scandir(item_path) as entries:
+            for entry in filter(lambda e: e.is_dir(), entries):
+                cost += estimate_version_cost(entry.path)
+    return cost
+
+
+def init_worker(func: typing.Callable) -> None:
+    global WORKER_FUNC
+    WORKER_FUNC = func
+
+
+def run_worker_tasks(tasks: typing.List[Task], profile: bool = False) -> typing.List[tuple]:
+    return run_tasks(WORKER_FUNC, tasks, profile)
+
+
+def get_process_pool(max_workers: int, func: typing.Callable) -> concurrent.futures.ProcessPoolExecutor:
+    # Tasks submitted to the pool with run_longest_first() without specifying a function are run with func
+    profile = get_profile()
+    if profile is not None:
+        payload_size = len(pickle.dumps(func))
+        profile.add_counter('worker_initializer_payload_size', payload_size)
+        # This is only sent to workers if they are not forked, otherwise they inherit it
+        if multiprocessing.get_start_method() != 'fork':
+            profile.add_counter('bytes_sent_to_workers_initializer', payload_size * max_workers)
+    return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(func,))
+
+
+def run_tasks(func: typing.Callable, tasks: typing.List[Task], profile: bool = False) -> typing.List[tuple]:
+    # This runs in worker processes, exceptions are returned instead of being raised so that a single failing
+    # task does not lose results of the rest of the tasks in the chunk
+    results = []
+    for task in tasks:
+        if profile:
+            start_profiling()
+        start = time.perf_counter()
+        try:
+            result, error = func(*task.args, **(task.kwargs or {})), None
+        except Exception as e:
+            result, error = None, e
+        elapsed = time.perf_counter() - start
+
+        phases = None
+        if profile:
+            with timed('pickling'):
+                # Approximates the cost of sending result back to the parent process
+                pickle.dumps((result, error))
+            phases = dict(stop_profiling().phases)
+        results.append((task.key, result, error, elapsed, phases))
+    return results
+
+
+def run_longest_first(
+    exc: concurrent.futures.Executor, func: typing.Optional[typing.Callable], tasks: typing.List[Task],
+    chunksize: int = 1, cost_tracker: typing.Optional[CostTracker] = None,
+) -> typing.Iterator[typing.Tuple[typing.Any, typing.Any, typing.Optional[Exception]]]:
+    # Tasks are dispatched in the order of their estimated cost (most expensive first) and (key, result, error)
+    # is yielded for each of them as soon as it is done, so callers must not rely on the order of results
+    # Chunks are filled till they either have `chunksize` tasks or reach the cost of an average chunk, this makes
+    # sure that expensive tasks are dispatched on their own while cheap ones are still batched together
+    # If func is not specified, tasks are run with the function installed in workers by get_process_pool()
+    chunk_budget = sum(task.cost for task in tasks) * chunksize / (len(tasks) or 1)
+    # Workers profile tasks if we are being profiled and timings are aggregated back here
+    profile = get_profile()
+    futures = {}
+
+    def submit(chunk):
+        if func is None:
+            runner, args = run_worker_tasks, (chunk, profile is not None)
+        else:
+            runner, args = run_tasks, (func, chunk, profile is not None)
+        if profile is not None:
+            profile.add_counter('bytes_sent_to_workers', len(pickle.dumps(args)))
+        futures[exc.submit(runner, *args)] = {t.key: t for t in chunk}
+
+    chunk = []
+    for task in sorted(tasks, key=lambda t: t.cost, reverse=True):
+        chunk.append(task)
+        if len(chunk) >= chunksize or sum(t.cost for t in chunk) >= chunk_budget:
+            submit(chunk)
+            chunk = []
+    if chunk:
+        submit(chunk)
+
+    for future in concurrent.futures.as_completed(futures):
+        # We do not keep a reference to finished futures so that their results can be freed once consumed
+        chunk = futures.pop(future)
+        for key, result, error, elapsed, phases in future.result():
+            if cost_tracker is not None:
+                cost_tracker.add(chunk[key].name, chunk[key].cost, elapsed)
+            if profile is not None:
+                profile.add_item(chunk[key].name, elapsed, phases)
+            yield key, result, error
@@ -1,19 +1,38 @@
-from jsonschema import validate as json_schema_validate, ValidationError as JsonValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 
 from catalog_validation.exceptions import ValidationErrors
+from catalog_validation.profiling import timed
 
 from .feature_gen import get_feature
 from .variable_gen import generate_variable
 
 
+# Compiled json schema validators keyed by (schema class, null, additional_attrs) as these are the only values
+# the generated json schema of a schema class depends on. This saves us from re-generating json schema and
+# re-checking it against the meta schema for each question we validate.
+JSON_SCHEMA_VALIDATORS = {}
+
+
 class Schema:
 
+    # Big questions files generate a lot of schema objects, so they keep their attributes in slots.
+    # DATA_ATTRS are keys of schema data which are set as attributes of the schema object.
+
+    __slots__ = (
+        'required', 'null', 'show_if', 'ref', 'ui_ref', 'type', 'editable', 'hidden', 'default', 'subquestions',
+        'show_subquestions_if', '_schema_data',
+    )
+
     DEFAULT_TYPE = NotImplementedError
+    DATA_ATTRS = frozenset({
+        'required', 'null', 'show_if', 'ref', 'ui_ref', 'type', 'editable', 'hidden', 'default', 'subquestions',
+        'show_subquestions_if',
+    })
 
     def __init__(self, include_subquestions_attrs=True, data=None):
         self.required = self.null = self.show_if = self.ref = self.ui_ref = self.type =\
             self.editable = self.hidden = self.default = self._schema_data = None
-        self._skip_data_values = []
         if include_subquestions_attrs:
             self.subquestions = self.show_subquestions_if = None
         if data:
@@ -21,10 +40,8 @@ class Schema:
 
     def initialize_values(self, data):
         self._schema_data = data
-        for key, value in filter(
-            lambda k: hasattr(self, k[0]) and k[0] not in self._skip_data_values, data.items()
-        ):
-            setattr(self, key, value)
+        for key in self.DATA_ATTRS.intersection(data):
+            setattr(self, key, data[key])
 
     def get_schema_str(self, schema):
         if schema:
@@ -39,10 +56,11 @@ class Schema:
             raise Exception('Schema data must be initialized before validating schema')
 
         verrors = ValidationErrors()
-        try:
-            json_schema_validate(self._schema_data, self.json_schema())
-        except JsonValidationError as e:
-            verrors.add(schema, f'Failed to validate schema: {e}')
+        # This is what jsonschema.validate() does, we just skip building the validator each time
+        with timed('jsonschema'):
+            error = best_match(self.get_json_schema_validator().iter_errors(self._schema_data))
+        if error is not None:
+            verrors.add(schema, f'Failed to validate schema: {error}')
 
         verrors.check()
 
@@ -62,6 +80,16 @@ class Schema:
 
         verrors.check()
 
+    def get_json_schema_validator(self):
+        key = (type(self), bool(self.null), bool(getattr(self, 'additional_attrs', None)))
+        if key not in JSON_SCHEMA_VALIDATORS:
+            json_schema = self.json_schema()
+            validator_cls = validator_for(json_schema)
+            validator_cls.check_schema(json_schema)
+            JSON_SCHEMA_VALIDATORS[key] = validator_cls(json_schema)
+
+        return JSON_SCHEMA_VALIDATORS[key]
+
     def json_schema(self):
         schema = {
             'type': 'object',
@@ -126,11 +154,14 @@ class Schema:
 
 
 class BooleanSchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'boolean'
 
 
 class StringSchema(Schema):
+    __slots__ = ('min_length', 'max_length', 'enum', 'private', 'valid_chars', 'valid_chars_error')
     DEFAULT_TYPE = 'string'
+    DATA_ATTRS = Schema.DATA_ATTRS | set(__slots__)
 
     def __init__(self, data):
         self.min_length = self.max_length = self.enum = self.private = self.valid_chars = self.valid_chars_error = None
@@ -159,6 +190,8 @@ class StringSchema(Schema):
 
 
 class TextFieldSchema(StringSchema):
+    __slots__ = ()
+
     def __init__(self, data):
         super().__init__(data)
         self.max_length = 1024 * 1024
@@ -179,7 +212,9 @@ class TextFieldSchema(StringSchema):
 
 
 class IntegerSchema(Schema):
+    __slots__ = ('min', 'max', 'enum')
     DEFAULT_TYPE = 'integer'
+    DATA_ATTRS = Schema.DATA_ATTRS | set(__slots__)
 
     def __init__(self, data):
         self.min = self.max = self.enum = None
@@ -199,27 +234,34 @@ class IntegerSchema(Schema):
 
 
 class PathSchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'string'
 
 
 class HostPathSchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'string'
 
 
 class HostPathDirSchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'string'
 
 
 class HostPathFileSchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'string'
 
 
 class URISchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'string'
 
 
 class IPAddrSchema(Schema):
+    __slots__ = ('ipv4', 'ipv6', 'cidr')
     DEFAULT_TYPE = 'string'
+    DATA_ATTRS = Schema.DATA_ATTRS | set(__slots__)
 
     def __init__(self, data):
         self.ipv4 = self.ipv6 = self.cidr = None
@@ -236,21 +278,32 @@ class IPAddrSchema(Schema):
 
 
 class CronSchema(Schema):
+    __slots__ = ()
     DEFAULT_TYPE = 'object'
 
 
 class DictSchema(Schema):
+    __slots__ = ('attrs', 'attrs_index', 'additional_attrs')
     DEFAULT_TYPE = 'object'
+    DATA_ATTRS = Schema.DATA_ATTRS | {'additional_attrs'}
 
     def __init__(self, data):
         self.attrs = []
+        self.attrs_index = {}
         self.additional_attrs = None
         super().__init__(data=data)
-        self._skip_data_values = ['attrs']
 
     def initialize_values(self, data):
         super().initialize_values(data)
         self.attrs = [generate_variable(d) for d in (data.get('attrs') or [])]
+        # Index of attrs by their variable name, if a name has been used again only its first attr is indexed
+        self.attrs_index = {}
+        for index, attr in enumerate(self.attrs):
+            if isinstance(attr.name, str):
+                self.attrs_index.setdefault(attr.name, index)
+
+    def get_attr(self, name):
+        return self.attrs[self.attrs_index[name]] if name in self.attrs_index else None
 
     def json_schema(self):
         schema = super().json_schema()
@@ -264,12 +317,13 @@ class DictSchema(Schema):
 
 class ListSchema(Schema):
 
+    __slots__ = ('items',)
     DEFAULT_TYPE = 'array'
+    DATA_ATTRS = Schema.DATA_ATTRS - {'subquestions', 'show_subquestions_if'}
 
     def __init__(self, data):
         self.items = []
         super().__init__(False, data=data)
-        self._skip_data_values = ['items']
 
     def initialize_values(self, data):
         super().initialize_values(data)
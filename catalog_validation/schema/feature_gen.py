@@ -1,4 +1,35 @@
-def get_feature(feature):
+import functools
+
+from catalog_validation.utils import get_entry_points
+
+
+# External packages can add $ref features with entry points in this group, entry point should point to a
+# Feature subclass which is registered by its NAME
+FEATURES_ENTRY_POINT = 'catalog_validation.features'
+REGISTERED_FEATURES = {}
+
+
+def get_feature_obj(feature):
+    # Features can be specified either as Feature subclasses or their instances
+    return feature() if isinstance(feature, type) else feature
+
+
+def register_feature(feature):
+    feature = get_feature_obj(feature)
+    REGISTERED_FEATURES[feature.NAME] = feature
+    get_features.cache_clear()
+
+
+@functools.cache
+def get_features():
     from .features import FEATURES
-    if feature in FEATURES:
-        return FEATURES[FEATURES.index(feature)]
+    features = {feature.NAME: feature for feature in FEATURES}
+    for entry_point in get_entry_points(FEATURES_ENTRY_POINT):
+        feature = get_feature_obj(entry_point.load())
+        features[feature.NAME] = feature
+    features.update(REGISTERED_FEATURES)
+    return features
+
+
+def get_feature(feature):
+    return get_features().get(feature)
@@ -39,18 +39,19 @@ class IXVolumeFeature(Feature):
         if isinstance(schema_obj, StringSchema):
             return
 
-        attrs = schema_obj.attrs
-        if 'datasetName' not in attrs:
+        dataset_name = schema_obj.get_attr('datasetName')
+        if dataset_name is None:
             verrors.add(f'{schema_str}.attrs', 'Variable "datasetName" must be specified.')
-        elif not isinstance(attrs[attrs.index('datasetName')].schema, StringSchema):
+        elif not isinstance(dataset_name.schema, StringSchema):
             verrors.add(f'{schema_str}.attrs', 'Variable "datasetName" must be of string type.')
 
-        if 'aclEntries' in attrs and not isinstance(attrs[attrs.index('aclEntries')].schema, DictSchema):
+        acl_entries = schema_obj.get_attr('aclEntries')
+        if acl_entries is not None and not isinstance(acl_entries.schema, DictSchema):
             verrors.add(f'{schema_str}.attrs', 'Variable "aclEntries" must be of dict type.')
 
-        if 'properties' in attrs:
-            index = attrs.index('properties')
-            properties = attrs[index]
+        if 'properties' in schema_obj.attrs_index:
+            index = schema_obj.attrs_index['properties']
+            properties = schema_obj.attrs[index]
             properties_schema = properties.schema
             supported_props = {
                 'recordsize': {
@@ -130,11 +131,11 @@ class ContainerImageFeature(Feature):
     VALID_SCHEMAS = [DictSchema]
 
     def _validate(self, verrors, schema_obj, schema_str):
-        attrs = schema_obj.attrs
         for check_attr in ('repository', 'tag'):
-            if check_attr not in attrs:
+            attr = schema_obj.get_attr(check_attr)
+            if attr is None:
                 verrors.add(f'{schema_str}.attrs', f'Variable {check_attr!r} must be specified.')
-            elif not isinstance(attrs[attrs.index(check_attr)].schema, StringSchema):
+            elif not isinstance(attr.schema, StringSchema):
                 verrors.add(f'{schema_str}.attrs', f'Variable {check_attr!r} must be of string type.')
 
 
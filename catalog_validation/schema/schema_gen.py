@@ -1,43 +1,49 @@
+import functools
+
+from catalog_validation.utils import get_entry_points
+
 from .attrs import (
     BooleanSchema, StringSchema, TextFieldSchema, IntegerSchema, PathSchema, HostPathSchema, HostPathDirSchema,
     HostPathFileSchema, ListSchema, DictSchema, IPAddrSchema, CronSchema, URISchema
 )
 
 
+# External packages can add schema types with entry points in this group, name of the entry point is the type
+# which should be used in questions and it should point to the schema class
+SCHEMA_TYPES_ENTRY_POINT = 'catalog_validation.schema_types'
+SCHEMA_TYPES = {
+    'boolean': BooleanSchema,
+    'string': StringSchema,
+    'text': TextFieldSchema,
+    'int': IntegerSchema,
+    'path': PathSchema,
+    'hostpath': HostPathSchema,
+    'hostpathdirectory': HostPathDirSchema,
+    'hostpathfile': HostPathFileSchema,
+    'list': ListSchema,
+    'dict': DictSchema,
+    'ipaddr': IPAddrSchema,
+    'cron': CronSchema,
+    'uri': URISchema,
+}
+
+
+def register_schema_type(s_type, schema_cls):
+    SCHEMA_TYPES[s_type] = schema_cls
+    get_schema_types.cache_clear()
+
+
+@functools.cache
+def get_schema_types():
+    # Entry points are only resolved once, schema types registered with register_schema_type() take precedence
+    schema_types = {entry_point.name: entry_point.load() for entry_point in get_entry_points(SCHEMA_TYPES_ENTRY_POINT)}
+    schema_types.update(SCHEMA_TYPES)
+    return schema_types
+
+
 def get_schema(schema_data):
-    schema = None
-    if not isinstance(schema_data, dict):
-        return schema
-
-    s_type = schema_data.get('type')
-    if s_type == 'boolean':
-        schema = BooleanSchema
-    elif s_type == 'string':
-        schema = StringSchema
-    elif s_type == 'text':
-        schema = TextFieldSchema
-    elif s_type == 'int':
-        schema = IntegerSchema
-    elif s_type == 'path':
-        schema = PathSchema
-    elif s_type == 'hostpath':
-        schema = HostPathSchema
-    elif s_type == 'hostpathdirectory':
-        schema = HostPathDirSchema
-    elif s_type == 'hostpathfile':
-        schema = HostPathFileSchema
-    elif s_type == 'list':
-        schema = ListSchema
-    elif s_type == 'dict':
-        schema = DictSchema
-    elif s_type == 'ipaddr':
-        schema = IPAddrSchema
-    elif s_type == 'cron':
-        schema = CronSchema
-    elif s_type == 'uri':
-        schema = URISchema
-
-    if schema:
-        schema = schema(data=schema_data)
-
-    return schema
+    if not isinstance(schema_data, dict) or not isinstance(schema_data.get('type'), str):
+        return None
+
+    schema = get_schema_types().get(schema_data['type'])
+    return schema(data=schema_data) if schema else None
@@ -4,6 +4,9 @@ from .schema_gen import get_schema
 
 
 class Variable:
+
+    __slots__ = ('name', 'label', 'description', 'group', 'schema')
+
     def __init__(self, data):
         self.name = self.label = self.description = self.group = None
         self.schema = None
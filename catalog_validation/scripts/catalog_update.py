@@ -13,35 +13,19 @@ from catalog_validation.ci.utils import (
     REQUIRED_METADATA_FILES, version_has_been_bumped, get_to_keep_versions
 )
 from catalog_validation.exceptions import ValidationErrors
-from catalog_validation.items.catalog import get_items_in_trains, retrieve_train_names, retrieve_trains_data
-from catalog_validation.items.utils import get_catalog_json_schema
-from catalog_validation.utils import CACHED_CATALOG_FILE_NAME, CACHED_VERSION_FILE_NAME
+from catalog_validation.git_utils import get_changed_catalog_items
+from catalog_validation.items.catalog import get_items_in_trains, retrieve_items_data, retrieve_train_names
+from catalog_validation.items.catalog_db import CatalogDatabaseWriter, load_versions
+from catalog_validation.items.catalog_writer import CatalogWriter
+from catalog_validation.items.transport import PICKLE_TRANSPORT, TRANSPORTS
+from catalog_validation.items.utils import get_catalog_json_schema, get_last_updated_date, get_last_updated_dates
+from catalog_validation.profiling import add_profile_arguments, report_profile, start_profiling, timed
+from catalog_validation.scheduling import CostTracker
+from catalog_validation.utils import CACHED_CATALOG_FILE_NAME, CATALOG_DB_FILE_NAME, CATALOG_MANIFEST_FILE_NAME
 from catalog_validation.validation import validate_catalog_item_version_data
 from collections import defaultdict
 
 
-def get_trains(location: str) -> typing.Tuple[dict, dict]:
-    preferred_trains: list = []
-    trains_to_traverse = retrieve_train_names(location)
-    catalog_data = {}
-    versions_data = {}
-    for train_name, train_data in retrieve_trains_data(
-        get_items_in_trains(trains_to_traverse, location), location, preferred_trains, trains_to_traverse
-    )[0].items():
-        catalog_data[train_name] = {}
-        versions_data[train_name] = {}
-        for app_name, app_data in train_data.items():
-            catalog_data[train_name][app_name] = {}
-            versions_data[train_name][app_name] = {}
-            for k, v in app_data.items():
-                if k == 'versions':
-                    versions_data[train_name][app_name][k] = v
-                else:
-                    catalog_data[train_name][app_name][k] = v
-
-    return catalog_data, versions_data
-
-
 def validate_train_data(train_data):
     verrors = ValidationErrors()
     try:
@@ -128,24 +112,136 @@ def publish_updated_apps(catalog_path: str) -> None:
             )
 
 
-def update_catalog_file(location: str) -> None:
-    catalog_file_path = os.path.join(location, CACHED_CATALOG_FILE_NAME)
-    catalog_data, versions_data = get_trains(location)
-    validate_train_data(catalog_data)
-    validate_versions_data(versions_data)
-
-    with open(catalog_file_path, 'w') as f:
-        f.write(json.dumps(catalog_data, indent=4))
-
-    print(f'[\033[92mOK\x1B[0m]\tUpdated {catalog_file_path!r} successfully!')
-
-    for train_name, train_data in versions_data.items():
-        for app_name, app_data in train_data.items():
-            version_path = os.path.join(location, train_name, app_name, CACHED_VERSION_FILE_NAME)
-            with open(version_path, 'w') as f:
-                f.write(json.dumps(app_data['versions'], indent=4))
+def get_catalog_data(location: str) -> typing.Optional[dict]:
+    try:
+        with open(os.path.join(location, CACHED_CATALOG_FILE_NAME), 'r') as f:
+            catalog_data = json.loads(f.read())
+    except (OSError, json.JSONDecodeError):
+        return None
+    return catalog_data if isinstance(catalog_data, dict) else None
+
+
+def get_copied_item_data(
+    location: str, train: str, item: str, item_data: dict, last_updated_dates: typing.Optional[dict],
+) -> typing.Tuple[dict, typing.Optional[dict]]:
+    # Items which are copied over from existing catalog data still get dates of their last update from git like
+    # a complete update would, as these can change without the item changing (e.g app_versions.json having been
+    # committed). Versions are only returned if any of their dates has changed, otherwise app_versions.json is
+    # left untouched.
+    item_path = os.path.join(location, train, item)
+    item_data = {**item_data, 'last_update': get_last_updated_date(location, item_path, last_updated_dates)}
+    versions = {version: dict(version_data) for version, version_data in load_versions(location, train, item).items()}
+    versions_changed = False
+    for version, version_data in versions.items():
+        last_update = get_last_updated_date(location, os.path.join(item_path, version), last_updated_dates)
+        if version_data.get('last_update') != last_update:
+            version_data['last_update'] = last_update
+            versions_changed = True
+
+    return item_data, versions if versions_changed else None
+
+
+def update_catalog_file(
+    location: str, changed_since: typing.Optional[str] = None, jobs: typing.Optional[int] = None,
+    cost_tracker: typing.Optional[CostTracker] = None, markdown_cache_dir: typing.Optional[str] = None,
+    transport: str = PICKLE_TRANSPORT, sqlite: bool = False, shards: bool = False,
+    deduplicate_versions: bool = False,
+) -> None:
+    trains_to_traverse = retrieve_train_names(location)
+    items = get_items_in_trains(trains_to_traverse, location)
+    trains = {'charts': [], 'test': [], **{train: [] for train in trains_to_traverse}}
+    for item_key, train_name in items.items():
+        trains[train_name].append(item_key.removesuffix(f'_{train_name}'))
 
-            print(f'[\033[92mOK\x1B[0m]\tUpdated {version_path!r} successfully!')
+    catalog_data = {}
+    copied_items = {}
+    if changed_since:
+        catalog_data = get_catalog_data(location)
+        if catalog_data is None:
+            print('[\033[93mWARN\x1B[0m]\tUnable to read existing catalog data, updating complete catalog')
+            catalog_data = {}
+        else:
+            # Only items which have changed since `changed_since` or are missing from existing catalog data
+            # are rebuilt, rest of the items are copied over as is from existing catalog data
+            changed_items = get_changed_catalog_items(location, changed_since)
+            items = {
+                item_key: train_name for item_key, train_name in items.items()
+                if item_key.removesuffix(f'_{train_name}') in changed_items.get(train_name, set())
+                or item_key.removesuffix(f'_{train_name}') not in catalog_data.get(train_name, {})
+            }
+            last_updated_dates = get_last_updated_dates(location)
+            copied_items = {
+                (train_name, item): get_copied_item_data(
+                    location, train_name, item, catalog_data[train_name][item], last_updated_dates
+                ) for train_name, train_items in trains.items() for item in train_items
+                if f'{item}_{train_name}' not in items and item in catalog_data.get(train_name, {})
+            }
+            if not items and {k: list(v) for k, v in catalog_data.items()} == trains and all(
+                item_data == catalog_data[train_name][item] and versions is None
+                for (train_name, item), (item_data, versions) in copied_items.items()
+            ) and not any(
+                enabled and not os.path.exists(os.path.join(location, file_name)) for enabled, file_name in (
+                    (sqlite, CATALOG_DB_FILE_NAME), (shards, CATALOG_MANIFEST_FILE_NAME),
+                )
+            ):
+                print('[\033[92mOK\x1B[0m]\tCatalog is already up to date')
+                return
+
+    # Apps are retrieved in no particular order, so we keep errors of each app to report them in catalog order
+    app_errors = {}
+    # Each app is validated and written out as soon as we have its details, so we only ever have
+    # details of a few apps in memory instead of the complete catalog
+    with contextlib.ExitStack() as stack:
+        writer = stack.enter_context(CatalogWriter(location, trains, shards, deduplicate_versions))
+        db_writer = stack.enter_context(CatalogDatabaseWriter(location)) if sqlite else None
+        for train_name, app_name, app_data in (
+            retrieve_items_data(
+                items, location, options={'markdown_cache_dir': markdown_cache_dir}, jobs=jobs,
+                cost_tracker=cost_tracker, transport=transport,
+            ) if items else []
+        ):
+            versions = app_data.pop('versions')
+            try:
+                with timed('validate_catalog_data'):
+                    validate_train_data({train_name: {app_name: app_data}})
+                    validate_versions_data({train_name: {app_name: {'versions': versions}}})
+            except ValidationErrors as e:
+                app_errors[(train_name, app_name)] = e
+            else:
+                with timed('write_catalog'):
+                    writer.add_item(train_name, app_name, app_data, versions)
+                    if db_writer:
+                        db_writer.add_item(train_name, app_name, app_data, versions)
+
+        verrors = ValidationErrors()
+        for train_name, train_items in trains.items():
+            for app_name in filter(lambda i: (train_name, i) in app_errors, train_items):
+                verrors.extend(app_errors[(train_name, app_name)])
+        verrors.check()
+        for (train_name, app_name), (app_data, versions) in copied_items.items():
+            writer.add_item(train_name, app_name, app_data, versions)
+            if db_writer:
+                db_writer.add_item(
+                    train_name, app_name, app_data,
+                    load_versions(location, train_name, app_name) if versions is None else versions,
+                )
+
+        with timed('write_catalog'):
+            if not db_writer:
+                # catalog.db of a previous update would no longer match catalog data being written
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(os.path.join(location, CATALOG_DB_FILE_NAME))
+            writer.commit()
+            if db_writer:
+                db_writer.commit()
+
+    print(f'[\033[92mOK\x1B[0m]\tUpdated {writer.catalog_file_path!r} successfully!')
+    for version_path in writer.versions_file_paths:
+        print(f'[\033[92mOK\x1B[0m]\tUpdated {version_path!r} successfully!')
+    if shards:
+        print(f'[\033[92mOK\x1B[0m]\tUpdated {writer.manifest_file_path!r} successfully!')
+    if db_writer:
+        print(f'[\033[92mOK\x1B[0m]\tUpdated {db_writer.db_file_path!r} successfully!')
 
 
 def main():
@@ -157,12 +253,49 @@ def main():
 
     parser_setup = subparsers.add_parser('update', help='Update TrueNAS catalog')
     parser_setup.add_argument('--path', help='Specify path of TrueNAS catalog')
+    parser_setup.add_argument(
+        '--changed-since', help='Only update apps which have changed since specified git ref', default=None
+    )
+    parser_setup.add_argument(
+        '--jobs', type=int, help='Number of worker processes to use (defaults to number of available cpus)'
+    )
+    parser_setup.add_argument(
+        '--cost-report', action='store_true', help='Report estimated and actual cost of retrieving each item'
+    )
+    parser_setup.add_argument(
+        '--markdown-cache-dir', help='Specify directory to cache rendered markdown documents in across runs'
+    )
+    parser_setup.add_argument(
+        '--transport', choices=TRANSPORTS, default=PICKLE_TRANSPORT,
+        help='Specify how worker processes send details of apps back',
+    )
+    parser_setup.add_argument(
+        '--sqlite', action='store_true', help='Also write catalog.db sqlite database which can be queried for apps'
+    )
+    parser_setup.add_argument(
+        '--shards', action='store_true',
+        help='Also write catalog data of each train to its own file along with a manifest of those files',
+    )
+    parser_setup.add_argument(
+        '--deduplicate-versions', action='store_true',
+        help='Store details which are identical between versions of an app only once in app_versions.json',
+    )
+    add_profile_arguments(parser_setup)
 
     args = parser.parse_args()
     if args.action == 'publish':
         publish_updated_apps(args.path)
     elif args.action == 'update':
-        update_catalog_file(args.path)
+        cost_tracker = CostTracker() if args.cost_report else None
+        if args.profile:
+            start_profiling()
+        update_catalog_file(
+            args.path, args.changed_since, args.jobs, cost_tracker, args.markdown_cache_dir, args.transport,
+            args.sqlite, args.shards, args.deduplicate_versions,
+        )
+        if cost_tracker:
+            cost_tracker.print_report()
+        report_profile(args)
     else:
         parser.print_help()
 
@@ -2,13 +2,16 @@
 import argparse
 
 from catalog_validation.exceptions import CatalogDoesNotExist, ValidationErrors
+from catalog_validation.profiling import add_profile_arguments, report_profile, start_profiling
+from catalog_validation.scheduling import CostTracker
 from catalog_validation.validation import validate_catalog
 
 
-def validate(catalog_path):
+def validate(catalog_path, cache_dir=None, jobs=None, cost_report=False):
+    cost_tracker = CostTracker() if cost_report else None
 
     try:
-        validate_catalog(catalog_path)
+        validate_catalog(catalog_path, cache_dir, jobs, cost_tracker)
     except CatalogDoesNotExist:
         print(f'[\033[91mFAILED\x1B[0m]\tSpecified {catalog_path!r} path does not exist')
         exit(1)
@@ -19,6 +22,9 @@ def validate(catalog_path):
         exit(1)
     else:
         print('[\033[92mOK\x1B[0m]\tPASSED VALIDATION CHECKS')
+    finally:
+        if cost_tracker:
+            cost_tracker.print_report()
 
 
 def main():
@@ -27,10 +33,26 @@ def main():
 
     parser_setup = subparsers.add_parser('validate', help='Validate TrueNAS catalog')
     parser_setup.add_argument('--path', help='Specify path of TrueNAS catalog')
+    parser_setup.add_argument(
+        '--cache-dir', help='Specify directory to cache validation results in so that unchanged versions are '
+        'not validated again'
+    )
+    parser_setup.add_argument(
+        '--jobs', type=int, help='Number of worker processes to use (defaults to number of available cpus)'
+    )
+    parser_setup.add_argument(
+        '--cost-report', action='store_true', help='Report estimated and actual cost of validating each item'
+    )
+    add_profile_arguments(parser_setup)
 
     args = parser.parse_args()
     if args.action == 'validate':
-        validate(args.path)
+        if args.profile:
+            start_profiling()
+        try:
+            validate(args.path, args.cache_dir, args.jobs, args.cost_report)
+        finally:
+            report_profile(args)
     else:
         parser.print_help()
 
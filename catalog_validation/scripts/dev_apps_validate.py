@@ -16,10 +16,13 @@ def main():
     parser_setup.add_argument(
         '--base_branch', help='Specify base branch to find changed catalog items', default='master'
     )
+    parser_setup.add_argument(
+        '--jobs', type=int, help='Number of worker processes to use (defaults to number of available cpus)'
+    )
 
     args = parser.parse_args()
     if args.action == 'validate':
-        validate_dev_directory_structure(args.path, get_changed_apps(args.path, args.base_branch))
+        validate_dev_directory_structure(args.path, get_changed_apps(args.path, args.base_branch), args.jobs)
     else:
         parser.print_help()
 
@@ -1,8 +1,15 @@
+import importlib.metadata
 import re
 
 
 CACHED_CATALOG_FILE_NAME = 'catalog.json'
 CACHED_VERSION_FILE_NAME = 'app_versions.json'
+CATALOG_DB_FILE_NAME = 'catalog.db'
+CATALOG_MANIFEST_FILE_NAME = 'catalog_manifest.json'
+CATALOG_SHARDS_DIR = 'catalog_trains'
+# app_versions.json having this format_version stores large details of versions once in blobs, see
+# items/app_versions.py for details
+DEDUPLICATED_VERSIONS_FORMAT = 2
 METADATA_JSON_SCHEMA = {
     'type': 'object',
     'properties': {
@@ -47,7 +54,7 @@ METADATA_JSON_SCHEMA = {
 RE_SCALE_VERSION = re.compile(r'^(\d{2}\.\d{2}(?:\.\d)*(?:-?(?:RC|BETA)\.?\d?)?)$')  # 24.04 / 24.04.1 / 24.04-RC.1
 RE_VERSION_PATTERN = re.compile(r'(\d{2}\.\d{2}(?:\.\d)*)')  # We are only interested in XX.XX here
 VALID_TRAIN_REGEX = re.compile(r'^\w+[\w.-]*$')
-VERSION_VALIDATION_SCHEMA = {
+INLINE_VERSIONS_SCHEMA = {
     'type': 'object',
     'title': 'Versions',
     'patternProperties': {
@@ -209,6 +216,44 @@ VERSION_VALIDATION_SCHEMA = {
     },
     'additionalProperties': False
 }
+VERSION_BLOB_FIELDS = ('schema', 'chart_metadata', 'app_metadata', 'app_readme', 'detailed_readme', 'changelog')
+VERSION_BLOB_REF_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        '$blob': {'type': 'string', 'pattern': '^[0-9a-f]{64}$'},
+    },
+    'required': ['$blob'],
+    'additionalProperties': False,
+}
+NULL_SCHEMA = {'type': 'null'}
+# Contents of blobs are validated once versions referring to them have been resolved
+DEDUPLICATED_VERSIONS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'format_version': {'const': DEDUPLICATED_VERSIONS_FORMAT},
+        'versions': {
+            **INLINE_VERSIONS_SCHEMA,
+            'patternProperties': {
+                pattern: {
+                    **version_schema,
+                    'properties': {
+                        **version_schema['properties'],
+                        **{field: {'anyOf': [VERSION_BLOB_REF_SCHEMA, NULL_SCHEMA]} for field in VERSION_BLOB_FIELDS},
+                    },
+                } for pattern, version_schema in INLINE_VERSIONS_SCHEMA['patternProperties'].items()
+            },
+        },
+        'blobs': {
+            'type': 'object',
+            'patternProperties': {'^[0-9a-f]{64}$': {}},
+            'additionalProperties': False,
+        },
+    },
+    'required': ['format_version', 'versions', 'blobs'],
+    'additionalProperties': False,
+}
+# Versions of an item are validated against either schema depending on their format, see is_deduplicated()
+VERSION_VALIDATION_SCHEMA = INLINE_VERSIONS_SCHEMA
 WANTED_FILES_IN_ITEM_VERSION = {'questions.yaml', 'app-readme.md', 'Chart.yaml', 'README.md'}
 
 
@@ -223,3 +268,9 @@ def validate_key_value_types(data_to_check, mapping, verrors, schema):
             verrors.add(f'{schema}.{key}', f'Missing required {key!r} key.')
         elif key in data_to_check and not isinstance(data_to_check[key], value_type):
             verrors.add(f'{schema}.{key}', f'{key!r} value should be a {value_type.__name__!r}')
+
+
+def get_entry_points(group: str) -> list:
+    entry_points = importlib.metadata.entry_points()
+    # Selecting entry points by group is only supported from python 3.10 onwards
+    return list(entry_points.select(group=group) if hasattr(entry_points, 'select') else entry_points.get(group, []))
@@ -2,37 +2,43 @@ import concurrent.futures
 import json
 import jsonschema
 import os
-import yaml
 
 from jsonschema import validate as json_schema_validate, ValidationError as JsonValidationError
 from middlewared.validators import validate_filters
 from semantic_version import Version
 from typing import Optional
 
+from .documents import DocumentLoader
 from .exceptions import CatalogDoesNotExist, ValidationErrors
+from .items.app_versions import is_deduplicated, resolve_versions
 from .items.ix_values_utils import validate_ix_values_schema
 from .items.questions_utils import (
     CUSTOM_PORTALS_KEY, CUSTOM_PORTALS_ENABLE_KEY, CUSTOM_PORTAL_GROUP_KEY,
 )
+from .items.questions_walker import get_duplicate_variables, QuestionsVisitor, QuestionsWalk, walk_question
 from .items.utils import get_catalog_json_schema, RECOMMENDED_APPS_FILENAME, RECOMMENDED_APPS_SCHEMA, TRAIN_IGNORE_DIRS
 from .schema.migration_schema import (
     APP_MIGRATION_SCHEMA, MIGRATION_DIRS, RE_MIGRATION_NAME, RE_MIGRATION_NAME_STR, APP_MIGRATION_DIR,
 )
+from .scheduling import estimate_item_cost, estimate_version_cost, run_longest_first, Task
+from .profiling import profiled, timed
 from .schema.variable import Variable
+from .validation_cache import get_version_validation_key, is_validated, mark_validated
 from .validation_utils import validate_chart_version
 from .utils import (
-    CACHED_CATALOG_FILE_NAME, CACHED_VERSION_FILE_NAME, METADATA_JSON_SCHEMA, validate_key_value_types,
-    VALID_TRAIN_REGEX, VERSION_VALIDATION_SCHEMA, WANTED_FILES_IN_ITEM_VERSION
+    CACHED_CATALOG_FILE_NAME, CACHED_VERSION_FILE_NAME, DEDUPLICATED_VERSIONS_SCHEMA, INLINE_VERSIONS_SCHEMA,
+    METADATA_JSON_SCHEMA, validate_key_value_types, VALID_TRAIN_REGEX, WANTED_FILES_IN_ITEM_VERSION
 )
+from .workers import get_max_workers
+from .yaml_utils import safe_yaml_load, YAMLError
 
 
-def validate_catalog(catalog_path):
+def validate_catalog(catalog_path, cache_dir=None, jobs=None, cost_tracker=None):
     if not os.path.exists(catalog_path):
         raise CatalogDoesNotExist(catalog_path)
 
     verrors = ValidationErrors()
     items = []
-    item_futures = []
     cached_catalog_file_path = os.path.join(catalog_path, CACHED_CATALOG_FILE_NAME)
     if not os.path.exists(cached_catalog_file_path):
         verrors.add(
@@ -41,7 +47,7 @@ def validate_catalog(catalog_path):
         )
     else:
         try:
-            with open(cached_catalog_file_path, 'r') as f:
+            with open(cached_catalog_file_path, 'r') as f, timed('catalog_json'):
                 json_schema_validate(json.loads(f.read()), get_catalog_json_schema())
 
         except (json.JSONDecodeError, JsonValidationError) as e:
@@ -87,28 +93,53 @@ def validate_catalog(catalog_path):
             else:
                 items.extend(get_train_items(complete_path))
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=5 if len(items) > 10 else 2) as exc:
-        for item in items:
-            item_futures.append(exc.submit(validate_catalog_item, item[0], item[1]))
-
-        for future in item_futures:
-            try:
-                future.result()
-            except ValidationErrors as e:
-                verrors.extend(e)
+    # Each version of an item is validated as a separate task so that items having a lot of versions
+    # do not end up being validated by a single worker
+    tasks = []
+    with timed('scan'):
+        for item_path, item_schema in items:
+            tasks.append(Task(
+                len(tasks), item_schema, estimate_item_cost(item_path, False),
+                (validate_catalog_item, item_path, item_schema), {'validate_versions': False},
+            ))
+            for version_path in get_item_versions(item_path):
+                tasks.append(Task(
+                    len(tasks), item_schema, estimate_version_cost(version_path), (
+                        validate_catalog_item_version, version_path,
+                        f'{item_schema}.versions.{os.path.basename(version_path)}',
+                    ), {'cache_dir': cache_dir},
+                ))
+
+    # Expensive tasks are dispatched first, however errors are still reported in the order of tasks
+    task_errors = [None] * len(tasks)
+    with timed('workers'), concurrent.futures.ProcessPoolExecutor(
+        max_workers=get_max_workers(len(tasks), jobs)
+    ) as exc:
+        for index, result, error in run_longest_first(exc, run_validation, tasks, cost_tracker=cost_tracker):
+            task_errors[index] = error
+
+    for error in filter(lambda e: e is not None, task_errors):
+        if isinstance(error, ValidationErrors):
+            verrors.extend(error)
+        else:
+            raise error
 
     verrors.check()
 
 
+def run_validation(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
 def validate_recommended_apps_file(catalog_location: str) -> None:
     verrors = ValidationErrors()
     try:
         with open(os.path.join(catalog_location, RECOMMENDED_APPS_FILENAME), 'r') as f:
-            data = yaml.safe_load(f.read())
+            data = safe_yaml_load(f.read())
         json_schema_validate(data, RECOMMENDED_APPS_SCHEMA)
     except FileNotFoundError:
         return
-    except yaml.YAMLError:
+    except YAMLError:
         verrors.add(RECOMMENDED_APPS_FILENAME, 'Must be a valid yaml file')
     except JsonValidationError as e:
         verrors.add(RECOMMENDED_APPS_FILENAME, f'Invalid format specified: {e}')
@@ -158,7 +189,16 @@ def get_train_items(train_path):
     return items
 
 
-def validate_catalog_item(catalog_item_path, schema, validate_versions=True):
+def get_item_versions(catalog_item_path):
+    return [
+        complete_path for complete_path in map(
+            lambda file_dir: os.path.join(catalog_item_path, file_dir), os.listdir(catalog_item_path)
+        ) if os.path.isdir(complete_path)
+    ]
+
+
+@profiled('validate_catalog_item')
+def validate_catalog_item(catalog_item_path, schema, validate_versions=True, cache_dir=None, documents=None):
     # We should ensure that each catalog item has at least 1 version available
     # Also that we have item.yaml present
     verrors = ValidationErrors()
@@ -183,8 +223,7 @@ def validate_catalog_item(catalog_item_path, schema, validate_versions=True):
     if 'item.yaml' not in files:
         verrors.add(f'{schema}.item', 'Item configuration (item.yaml) not found')
     else:
-        with open(os.path.join(catalog_item_path, 'item.yaml'), 'r') as f:
-            item_config = yaml.safe_load(f.read())
+        item_config = (documents or DocumentLoader()).load_yaml(os.path.join(catalog_item_path, 'item.yaml'))
 
         validate_key_value_types(
             item_config, (
@@ -206,7 +245,9 @@ def validate_catalog_item(catalog_item_path, schema, validate_versions=True):
 
     for version_path in (versions if validate_versions else []):
         try:
-            validate_catalog_item_version(version_path, f'{schema}.versions.{os.path.basename(version_path)}')
+            validate_catalog_item_version(
+                version_path, f'{schema}.versions.{os.path.basename(version_path)}', cache_dir=cache_dir
+            )
         except ValidationErrors as e:
             verrors.extend(e)
 
@@ -228,19 +269,34 @@ def validate_app_migrations(verrors, version_path, schema):
 
 def validate_catalog_item_version_data(version_data: dict, schema: str, verrors: ValidationErrors) -> ValidationErrors:
     try:
-        json_schema_validate(version_data, VERSION_VALIDATION_SCHEMA)
+        if is_deduplicated(version_data):
+            json_schema_validate(version_data, DEDUPLICATED_VERSIONS_SCHEMA)
+            # Blobs are validated as part of each version which refers to them
+            json_schema_validate(resolve_versions(version_data), INLINE_VERSIONS_SCHEMA)
+        else:
+            json_schema_validate(version_data, INLINE_VERSIONS_SCHEMA)
     except JsonValidationError as e:
         verrors.add(schema, f'Invalid format specified for application versions: {e}')
+    except KeyError as e:
+        verrors.add(schema, f'Invalid format specified for application versions: {e.args[0]!r} blob does not exist')
     return verrors
 
 
+@profiled('validate_catalog_item_version')
 def validate_catalog_item_version(
     version_path: str, schema: str, version_name: Optional[str] = None, item_name: Optional[str] = None,
-    validate_values: bool = False,
+    validate_values: bool = False, cache_dir: Optional[str] = None, documents: Optional[DocumentLoader] = None,
 ):
     verrors = ValidationErrors()
     version_name = version_name or os.path.basename(version_path)
     item_name = item_name or version_path.split('/')[-2]
+    if cache_dir:
+        # Validation results only depend on the contents of version directory and these values, so if we have
+        # already validated this exact version directory successfully there is no point in doing it again
+        cache_key = get_version_validation_key(version_path, item_name, version_name, validate_values)
+        if is_validated(cache_dir, cache_key):
+            return
+
     try:
         Version(version_name)
     except ValueError:
@@ -252,13 +308,14 @@ def validate_catalog_item_version(
     if files_diff:
         verrors.add(f'{schema}.required_files', f'Missing {", ".join(files_diff)} required configuration files.')
 
+    documents = documents or DocumentLoader()
     chart_version_path = os.path.join(version_path, 'Chart.yaml')
-    validate_chart_version(verrors, chart_version_path, schema, item_name, version_name)
+    validate_chart_version(verrors, chart_version_path, schema, item_name, version_name, documents)
 
     questions_path = os.path.join(version_path, 'questions.yaml')
     if os.path.exists(questions_path):
         try:
-            validate_questions_yaml(questions_path, f'{schema}.questions_configuration')
+            validate_questions_yaml(questions_path, f'{schema}.questions_configuration', documents)
         except ValidationErrors as v:
             verrors.extend(v)
 
@@ -266,14 +323,14 @@ def validate_catalog_item_version(
         values_path = os.path.join(version_path, values_file)
         if os.path.exists(values_path):
             try:
-                validate_ix_values_yaml(values_path, f'{schema}.values_configuration')
+                validate_ix_values_yaml(values_path, f'{schema}.values_configuration', documents)
             except ValidationErrors as v:
                 verrors.extend(v)
 
     metadata_path = os.path.join(version_path, 'metadata.yaml')
     if os.path.exists(metadata_path):
         try:
-            validate_metadata_yaml(metadata_path, f'{schema}.metadata_configuration')
+            validate_metadata_yaml(metadata_path, f'{schema}.metadata_configuration', documents)
         except ValidationErrors as v:
             verrors.extend(v)
 
@@ -281,17 +338,19 @@ def validate_catalog_item_version(
 
     verrors.check()
 
+    if cache_dir:
+        mark_validated(cache_dir, cache_key)
+
 
-def validate_ix_values_yaml(ix_values_yaml_path, schema):
+def validate_ix_values_yaml(ix_values_yaml_path, schema, documents=None):
     verrors = ValidationErrors()
 
-    with open(ix_values_yaml_path, 'r') as f:
-        try:
-            ix_values = yaml.safe_load(f.read())
-        except yaml.YAMLError:
-            verrors.add(schema, 'Must be a valid yaml file')
+    try:
+        ix_values = (documents or DocumentLoader()).load_yaml(ix_values_yaml_path)
+    except YAMLError:
+        verrors.add(schema, 'Must be a valid yaml file')
 
-        verrors.check()
+    verrors.check()
 
     if isinstance(ix_values, dict):
         portals = ix_values.get(CUSTOM_PORTALS_KEY)
@@ -306,33 +365,31 @@ def validate_ix_values_yaml(ix_values_yaml_path, schema):
     verrors.check()
 
 
-def validate_metadata_yaml(metadata_yaml_path, schema):
+def validate_metadata_yaml(metadata_yaml_path, schema, documents=None):
     verrors = ValidationErrors()
-    with open(metadata_yaml_path, 'r') as f:
+    try:
+        metadata = (documents or DocumentLoader()).load_yaml(metadata_yaml_path)
+    except YAMLError:
+        verrors.add(schema, 'Must be a valid yaml file')
+    else:
         try:
-            metadata = yaml.safe_load(f.read())
-        except yaml.YAMLError:
-            verrors.add(schema, 'Must be a valid yaml file')
-        else:
-            try:
-                json_schema_validate(metadata, METADATA_JSON_SCHEMA)
-            except JsonValidationError as e:
-                verrors.add(schema, f'Invalid format specified for application metadata: {e}')
+            json_schema_validate(metadata, METADATA_JSON_SCHEMA)
+        except JsonValidationError as e:
+            verrors.add(schema, f'Invalid format specified for application metadata: {e}')
 
     verrors.check()
 
 
-def validate_questions_yaml(questions_yaml_path, schema):
+def validate_questions_yaml(questions_yaml_path, schema, documents=None):
     verrors = ValidationErrors()
 
-    with open(questions_yaml_path, 'r') as f:
-        try:
-            questions_config = yaml.safe_load(f.read())
-        except yaml.YAMLError:
-            verrors.add(schema, 'Must be a valid yaml file')
-        else:
-            if not isinstance(questions_config, dict):
-                verrors.add(schema, 'Must be a dictionary')
+    try:
+        questions_config = (documents or DocumentLoader()).load_yaml(questions_yaml_path)
+    except YAMLError:
+        verrors.add(schema, 'Must be a valid yaml file')
+    else:
+        if not isinstance(questions_config, dict):
+            verrors.add(schema, 'Must be a dictionary')
 
     verrors.check()
 
@@ -369,11 +426,17 @@ def validate_questions_yaml(questions_yaml_path, schema):
                 verrors, error_schema
             )
 
-    validate_variable_uniqueness(questions_config['questions'], f'{schema}.questions', verrors)
+    # Questions are walked once, what is collected while validating them is kept with the loaded document so that
+    # normalising them afterwards does not have to walk them again
+    walk = QuestionsWalk()
+    check_duplicate_variables(
+        walk.add_questions(questions_config['questions'], f'{schema}.questions'), f'{schema}.questions', verrors
+    )
     for index, question in enumerate(questions_config['questions']):
-        validate_question(question, f'{schema}.questions.{index}', verrors, (('group', str),))
-        if question.get('group') and question['group'] not in groups:
-            verrors.add(f'{schema}.questions.{index}.group', f'Please specify a group declared in "{schema}.groups"')
+        question_path = f'{schema}.questions.{index}'
+        validate_question(question, question_path, verrors, (('group', str),), walk)
+        if question_path in walk.groups and walk.groups[question_path] not in groups:
+            verrors.add(f'{question_path}.group', f'Please specify a group declared in "{schema}.groups"')
 
     if questions_config.get(CUSTOM_PORTALS_ENABLE_KEY):
         if not questions_config.get(CUSTOM_PORTAL_GROUP_KEY):
@@ -389,71 +452,99 @@ def validate_questions_yaml(questions_yaml_path, schema):
 
     verrors.check()
 
+    if documents:
+        documents.questions_walks[questions_yaml_path] = walk
 
-def validate_variable_uniqueness(data, schema, verrors):
-    variables = []
-    for index, question in enumerate(data):
-        if question['variable'] in variables:
-            verrors.add(
-                f'{schema}.{index}', f'Variable name {question["variable"]!r} has been used again which is not allowed'
-            )
-        else:
-            variables.append(question['variable'])
-            sub_questions = question.get('subquestions') or []
-            for sub_index, sub_question in enumerate(sub_questions):
-                if sub_question['variable'] in variables:
-                    verrors.add(
-                        f'{schema}.{index}.subquestions.{sub_index}',
-                        f'Variable name {sub_question["variable"]!r} has been used again which is not allowed'
-                    )
-                else:
-                    variables.append(sub_question['variable'])
+
+def check_duplicate_variables(duplicates, schema, verrors):
+    for path, variable in duplicates:
+        verrors.add(f'{schema}.{path}', f'Variable name {variable!r} has been used again which is not allowed')
 
     verrors.check()
 
 
-def validate_question(question_data, schema, verrors, validate_top_level_attrs=None):
-    if not isinstance(question_data, dict):
-        verrors.add(schema, 'Question must be a valid dictionary.')
-        return
+def validate_variable_uniqueness(data, schema, verrors):
+    check_duplicate_variables(get_duplicate_variables(data), schema, verrors)
 
-    validate_top_level_attrs = validate_top_level_attrs or tuple()
-    validate_key_value_types(
-        question_data, (('variable', str), ('label', str), ('schema', dict)) + validate_top_level_attrs, verrors, schema
-    )
-    if type(question_data.get('schema')) != dict:
-        return
 
-    if question_data['variable'] == CUSTOM_PORTALS_KEY:
-        verrors.add(
-            f'{schema}.variable',
-            f'{CUSTOM_PORTALS_KEY!r} is a reserved variable name and cannot be specified by app developer'
+class QuestionsValidator(QuestionsVisitor):
+
+    # Validates each question of a questions tree as it is walked after the QuestionsWalk collecting it. Children of
+    # all questions are walked, however only the ones allowed by type of a valid question (e.g items of a list) are
+    # validated. Variable of a question generates variables of all of its attrs/items, so we use them for its
+    # children instead of generating them again for each child.
+
+    def __init__(self, verrors, walk, validate_top_level_attrs=None):
+        self.verrors = verrors
+        self.walk = walk
+        self.validate_top_level_attrs = validate_top_level_attrs or tuple()
+        self.variables = {}
+        # Questions which are to be validated
+        self.validated = set()
+
+    def enter(self, question, path, parent):
+        if parent is None:
+            self.validated.add(id(question))
+        elif id(question) not in self.validated:
+            return True
+
+        if not isinstance(question, dict):
+            self.verrors.add(path, 'Question must be a valid dictionary.')
+            return False
+
+        validate_key_value_types(
+            question, (('variable', str), ('label', str), ('schema', dict)) + (
+                self.validate_top_level_attrs if parent is None else tuple()
+            ), self.verrors, path
         )
-        # No need to validate the question data etc here
-        return
+        if type(question.get('schema')) != dict:
+            return False
 
-    try:
-        Variable(question_data).validate(schema)
-    except ValidationErrors as ve:
-        verrors.extend(ve)
-        return
+        if question['variable'] == CUSTOM_PORTALS_KEY:
+            self.verrors.add(
+                f'{path}.variable',
+                f'{CUSTOM_PORTALS_KEY!r} is a reserved variable name and cannot be specified by app developer'
+            )
+            # No need to validate the question data etc here
+            return False
 
-    schema_data = question_data['schema']
-    variable_type = schema_data['type']
+        variable = self.variables.pop(id(question), None) or Variable(question)
+        try:
+            variable.validate(path)
+        except ValidationErrors as ve:
+            self.verrors.extend(ve)
+            return False
 
-    if filters := schema_data.get('show_if'):
-        validate_filters(filters)
+        if filters := self.walk.show_if.get(path):
+            validate_filters(filters)
 
-    for condition, key, schema_str in (
-        (variable_type != 'list', 'subquestions', f'{schema}.schema.subquestions'),
-        (variable_type == 'list', 'items', f'{schema}.schema.items'),
-        (variable_type == 'dict', 'attrs', f'{schema}.schema.attrs'),
-    ):
-        if not (condition and type(schema_data.get(key)) == list):
-            continue
+        schema_data = question['schema']
+        for key in ('attrs', 'items'):
+            if type(schema_data.get(key)) == list and hasattr(variable.schema, key):
+                self.variables.update(zip(map(id, schema_data[key]), getattr(variable.schema, key)))
 
+        return True
+
+    def enter_children(self, question, path, key, children):
+        if id(question) not in self.validated:
+            return
+
+        variable_type = question['schema']['type']
+        if not {
+            'subquestions': variable_type != 'list', 'items': variable_type == 'list', 'attrs': variable_type == 'dict',
+        }[key]:
+            return
+
+        self.validated.update(map(id, children))
         if variable_type == 'dict':
-            validate_variable_uniqueness(schema_data[key], f'{schema}.{schema_str}', verrors)
+            check_duplicate_variables(
+                self.walk.duplicates[f'{path}.schema.{key}'], f'{path}.{path}.schema.{key}', self.verrors
+            )
+
 
-        for index, item in enumerate(schema_data[key]):
-            validate_question(item, f'{schema_str}.{index}', verrors)
+def validate_question(question_data, schema, verrors, validate_top_level_attrs=None, walk=None):
+    # Question is collected by walk (if specified) while it is validated
+    walk = walk or QuestionsWalk()
+    walk_question(
+        question_data, schema, [walk, QuestionsValidator(verrors, walk, validate_top_level_attrs)], walk.get_children
+    )
@@ -0,0 +1,69 @@
+import contextlib
+import functools
+import hashlib
+import importlib.metadata
+import os
+
+
+def get_validator_version() -> str:
+    # Package version is not bumped on every change made to validation logic, so we also include digest
+    # of the package sources to make sure results cached by a different validator are not used
+    with contextlib.suppress(importlib.metadata.PackageNotFoundError):
+        return f'{importlib.metadata.version("catalog_validation")}-{get_validator_sources_digest()}'
+    return get_validator_sources_digest()
+
+
+@functools.cache
+def get_validator_sources_digest() -> str:
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_path):
+        dirs.sort()
+        for file_name in sorted(filter(lambda f: f.endswith('.py'), files)):
+            file_path = os.path.join(root, file_name)
+            with open(file_path, 'rb') as f:
+                digest.update(os.path.relpath(file_path, package_path).encode() + b'\0')
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def get_directory_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for dir_name in dirs:
+            digest.update(os.path.relpath(os.path.join(root, dir_name), path).encode() + b'/\0')
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            # Whether a file is executable or not is something we validate for app migrations
+            digest.update(
+                os.path.relpath(file_path, path).encode() + (b'\0x' if os.access(file_path, os.X_OK) else b'\0-')
+            )
+            with open(file_path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def get_version_validation_key(version_path: str, *validation_args) -> str:
+    digest = hashlib.sha256(get_validator_version().encode())
+    for arg in validation_args:
+        digest.update(f'\0{arg!r}'.encode())
+    digest.update(b'\0' + get_directory_digest(version_path).encode())
+    return digest.hexdigest()
+
+
+def get_validation_cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def is_validated(cache_dir: str, key: str) -> bool:
+    return os.path.exists(get_validation_cache_path(cache_dir, key))
+
+
+def mark_validated(cache_dir: str, key: str) -> None:
+    cache_path = get_validation_cache_path(cache_dir, key)
+    # We do not want to fail validation if for whatever reason we are not able to cache the result
+    with contextlib.suppress(OSError):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w'):
+            pass
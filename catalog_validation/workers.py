@@ -0,0 +1,80 @@
+import contextlib
+import math
+import os
+import typing
+
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+CGROUP_V1_CPU_DIRS = ('/sys/fs/cgroup/cpu', '/sys/fs/cgroup/cpu,cpuacct')
+PROC_CGROUP_PATH = '/proc/self/cgroup'
+
+
+def get_process_cgroups() -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    # Returns paths of cgroup v2 and cgroup v1 cpu controller hierarchies this process belongs to
+    v2_path = v1_path = None
+    with contextlib.suppress(OSError, ValueError):
+        with open(PROC_CGROUP_PATH, 'r') as f:
+            for line in f.read().splitlines():
+                hierarchy, controllers, path = line.split(':', 2)
+                if hierarchy == '0' and not controllers:
+                    v2_path = path
+                elif 'cpu' in controllers.split(','):
+                    v1_path = path
+    return v2_path, v1_path
+
+
+def get_cgroup_v2_cpu_limits(cgroup_path: str) -> typing.List[typing.Optional[int]]:
+    # Returns cpu limit of the cgroup and of each of its ancestors which have cpu controller enabled, i.e
+    # have cpu.max. Quota of any of them applies to the processes in the cgroup.
+    limits = []
+    cgroup_dir = os.path.normpath(os.path.join(CGROUP_ROOT, cgroup_path.lstrip('/')))
+    while cgroup_dir.startswith(CGROUP_ROOT):
+        with contextlib.suppress(OSError, ValueError):
+            with open(os.path.join(cgroup_dir, 'cpu.max'), 'r') as f:
+                quota, period = f.read().split()[:2]
+            limits.append(None if quota == 'max' else max(math.ceil(int(quota) / int(period)), 1))
+        cgroup_dir = os.path.dirname(cgroup_dir)
+    return limits
+
+
+def get_cgroup_cpu_limit() -> typing.Optional[int]:
+    # Returns number of cpus we are allowed to use by cgroup cpu quota, None if there is no quota.
+    # Cgroup of the process is looked up first, within a cgroup namespace (e.g containers) it is the root.
+    v2_path, v1_path = get_process_cgroups()
+    v2_limits = get_cgroup_v2_cpu_limits(v2_path or '/')
+    if v2_limits:
+        return min((limit for limit in v2_limits if limit), default=None)
+
+    cpu_dirs = CGROUP_V1_CPU_DIRS
+    if v1_path and v1_path != '/':
+        cpu_dirs = tuple(os.path.join(cpu_dir, v1_path.lstrip('/')) for cpu_dir in CGROUP_V1_CPU_DIRS) + cpu_dirs
+    for cpu_dir in cpu_dirs:
+        with contextlib.suppress(OSError, ValueError):
+            with open(os.path.join(cpu_dir, 'cpu.cfs_quota_us'), 'r') as f:
+                quota = int(f.read())
+            with open(os.path.join(cpu_dir, 'cpu.cfs_period_us'), 'r') as f:
+                period = int(f.read())
+            return None if quota <= 0 or period <= 0 else max(math.ceil(quota / period), 1)
+
+    return None
+
+
+def get_cpu_count() -> int:
+    try:
+        cpu_count = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpu_count = os.cpu_count() or 1
+
+    cgroup_limit = get_cgroup_cpu_limit()
+    return min(cpu_count, cgroup_limit) if cgroup_limit else cpu_count
+
+
+def get_max_workers(total_tasks: int, jobs: typing.Optional[int] = None) -> int:
+    # There is no point in spawning more workers than the tasks we have
+    return max(min(jobs or get_cpu_count(), total_tasks), 1)
+
+
+def get_chunksize(total_tasks: int, workers: int) -> int:
+    # Same heuristic multiprocessing.Pool.map uses, i.e each worker gets ~4 chunks so that we do not pay
+    # the IPC cost for every single task but still have a chance to balance load between workers
+    return max(math.ceil(total_tasks / (workers * 4)), 1)
@@ -0,0 +1,20 @@
+import yaml
+
+from yaml import YAMLError  # noqa
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+def get_yaml_backend() -> str:
+    return 'python' if SafeLoader is yaml.SafeLoader else 'libyaml'
+
+
+def safe_yaml_load(content):
+    if isinstance(content, str) and SafeLoader is not yaml.SafeLoader:
+        # libyaml does not reject non-printable characters like the pure python loader does, so we run the
+        # same check the pure python reader does to make sure both backends accept/reject the same files
+        yaml.reader.Reader(content)
+    return yaml.load(content, Loader=SafeLoader)